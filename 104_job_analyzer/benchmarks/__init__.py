@@ -0,0 +1,8 @@
+"""效能基準測試：104 API 模擬伺服器與負載量測工具
+
+- `benchmarks.mock_server`：重播錄製的 API 回應，可設定延遲、錯誤率與 429 行為
+- `benchmarks.target`：將設定指向模擬伺服器後執行 main.py（由量測工具以子行程啟動）
+- `benchmarks.run`：依 `--mode` 逐一量測吞吐量、延遲分位數、峰值記憶體與總耗時
+
+所有指令皆需在 104_job_analyzer 目錄下以 `python -m benchmarks.xxx` 執行。
+"""
@@ -0,0 +1,345 @@
+# benchmarks/mock_server.py
+
+"""104 API 模擬伺服器：重播 `fixtures/` 中錄製的回應
+
+模擬三個正式環境主機（各自監聽一個連接埠，讓用戶端的連線池與速率限制
+如同正式環境一樣依主機分開計算）：
+- static：職務類別表 `/category-tool/json/JobCat.json`（支援 ETag / 304）
+- guide：職務技能 `/wow/jobCard/job`、證照 `/wow/jobCard/cert`、薪資 `/api/job/seniority/{job_code}`
+- www：搜尋結果 `/jobs/search/list`、職缺詳細資訊 `/job/ajax/content/{job_id}`
+
+技能、證照與薪資的錄製樣本依職務代碼的雜湊值輪流重播，並代入被請求的職務代碼；
+搜尋結果每頁重播同一份錄製頁面，並為每筆職缺產生不重複的識別碼。
+
+可設定的行為：
+- 延遲：固定延遲加上指數分佈的隨機延遲（模擬長尾）
+- 錯誤率：隨機回傳 500/502/503
+- 限流：隨機回傳 429，或每個主機超過每秒請求上限時回傳 429，皆附 Retry-After
+
+單獨執行：
+    python -m benchmarks.mock_server --port 8900 --latency 0.05 --rate-limit 50
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+HOSTS = ('static', 'guide', 'www')
+CATEGORY_ETAG = '"mock-jobcat-v1"'
+
+
+@dataclass
+class MockSettings:
+    """模擬伺服器的行為設定"""
+
+    latency: float = 0.05  # 每個回應的固定延遲秒數
+    jitter: float = 0.02  # 額外隨機延遲的平均秒數（指數分佈），0 表示不加
+    error_rate: float = 0.0  # 隨機回傳 5xx 的機率
+    throttle_rate: float = 0.0  # 隨機回傳 429 的機率
+    rate_limit: float = 0.0  # 每個主機每秒請求上限，超過時回傳 429；0 表示不限
+    retry_after: float = 1.0  # 429 回應的 Retry-After 秒數
+    total_pages: int = 50  # 搜尋結果的總頁數
+    seed: Optional[int] = None  # 亂數種子，固定後可重現相同的錯誤序列
+
+
+def _load_fixture(name: str) -> Any:
+    """讀取錄製的回應"""
+    with open(FIXTURE_DIR / name, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _category_names(nodes: List[Dict], names: Dict[str, str]) -> Dict[str, str]:
+    """收集類別樹中所有代碼對應的名稱"""
+    for node in nodes:
+        names[node['no']] = node['des']
+        _category_names(node.get('n') or [], names)
+    return names
+
+
+class _HostLimiter:
+    """以固定視窗計算每秒請求數的簡易限流器"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._window = 0
+        self._count = 0
+
+    def allow(self) -> bool:
+        """本秒內的請求數未超過上限時回傳 True"""
+        window = int(time.monotonic())
+        if window != self._window:
+            self._window, self._count = window, 0
+        self._count += 1
+        return self._count <= self.rate
+
+
+class MockAPI:
+    """模擬 API 的請求處理與統計"""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.category_tree = _load_fixture("job_cat.json")
+        self.category_body = json.dumps(self.category_tree, ensure_ascii=False).encode('utf-8')
+        self.job_names = _category_names(self.category_tree, {})
+        self.skills = _load_fixture("job_card_job.json")
+        self.certs = _load_fixture("job_card_cert.json")
+        self.salaries = _load_fixture("seniority.json")
+        self.search_page = _load_fixture("search_list.json")
+        self.detail_payload = _load_fixture("job_detail.json")
+        self.limiters = {host: _HostLimiter(settings.rate_limit) for host in HOSTS}
+        self.stats: Counter = Counter()
+        self.started = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # 共用行為
+    # ------------------------------------------------------------------
+    async def _intercept(self, host: str, route: str) -> Optional[web.Response]:
+        """套用延遲、限流與錯誤注入；需要中斷請求時回傳錯誤回應"""
+        settings = self.settings
+        self.stats['requests'] += 1
+        self.stats[f'route:{route}'] += 1
+
+        delay = settings.latency
+        if settings.jitter > 0:
+            delay += self.random.expovariate(1 / settings.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        throttled = settings.rate_limit > 0 and not self.limiters[host].allow()
+        if throttled or self.random.random() < settings.throttle_rate:
+            self.stats['status:429'] += 1
+            return web.json_response(
+                {'error': 'Too Many Requests'}, status=429,
+                headers={'Retry-After': f"{settings.retry_after:g}"}
+            )
+        if self.random.random() < settings.error_rate:
+            status = self.random.choice((500, 502, 503))
+            self.stats[f'status:{status}'] += 1
+            return web.json_response({'error': 'Server Error'}, status=status)
+        self.stats['status:200'] += 1
+        return None
+
+    def _pick(self, samples: List[Any], key: str) -> Any:
+        """依鍵的雜湊值選擇錄製樣本，同一個鍵每次都得到相同結果"""
+        return samples[zlib.crc32(key.encode('utf-8')) % len(samples)]
+
+    # ------------------------------------------------------------------
+    # 路由
+    # ------------------------------------------------------------------
+    async def job_cat(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('static', 'job_cat')):
+            return error
+        if request.headers.get('If-None-Match') == CATEGORY_ETAG:
+            return web.Response(status=304, headers={'ETag': CATEGORY_ETAG})
+        return web.Response(body=self.category_body, content_type='application/json',
+                            headers={'ETag': CATEGORY_ETAG})
+
+    async def job_card(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('guide', 'job_card')):
+            return error
+        job_code = request.query.get('jobCode', '')
+        payload = dict(self._pick(self.skills, job_code))
+        payload['jobCode'] = job_code
+        payload['jobName'] = self.job_names.get(job_code, payload['jobName'])
+        return web.json_response(payload)
+
+    async def job_cert(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('guide', 'job_cert')):
+            return error
+        return web.json_response(self._pick(self.certs, request.query.get('jobCode', '')))
+
+    async def seniority(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('guide', 'seniority')):
+            return error
+        key = f"{request.match_info['job_code']}:{request.query.get('type', '1')}"
+        return web.json_response(self._pick(self.salaries, key))
+
+    async def search_list(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('www', 'search_list')):
+            return error
+        page = int(request.query.get('page', '1'))
+        total_pages = self.settings.total_pages
+        jobs = []
+        if 1 <= page <= total_pages:
+            for i, job in enumerate(self.search_page['data']['list']):
+                job_id = f"m{page}x{i}"
+                job = dict(job, jobNo=f"{page:05d}{i:02d}")
+                job['link'] = dict(job.get('link') or {},
+                                   job=f"//www.104.com.tw/job/{job_id}?jobsource=mock")
+                jobs.append(job)
+        data = dict(self.search_page['data'], totalPage=total_pages,
+                    totalCount=total_pages * len(self.search_page['data']['list']),
+                    list=jobs)
+        return web.json_response({'data': data})
+
+    async def job_detail(self, request: web.Request) -> web.Response:
+        if (error := await self._intercept('www', 'job_detail')):
+            return error
+        return web.json_response(self.detail_payload)
+
+    async def stats_view(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """目前的統計資料"""
+        return {
+            'settings': asdict(self.settings),
+            'uptime': time.monotonic() - self.started,
+            **dict(self.stats),
+        }
+
+
+def create_app(api: MockAPI) -> web.Application:
+    """建立包含所有模擬路由的 aiohttp 應用程式"""
+    app = web.Application()
+    app.router.add_get('/category-tool/json/JobCat.json', api.job_cat)
+    app.router.add_get('/wow/jobCard/job', api.job_card)
+    app.router.add_get('/wow/jobCard/cert', api.job_cert)
+    app.router.add_get('/api/job/seniority/{job_code}', api.seniority)
+    app.router.add_get('/jobs/search/list', api.search_list)
+    app.router.add_get('/job/ajax/content/{job_id}', api.job_detail)
+    app.router.add_get('/__stats', api.stats_view)
+    return app
+
+
+class MockServer:
+    """在背景執行緒中執行的模擬伺服器
+
+    使用範例：
+        with MockServer(MockSettings(latency=0.02)) as server:
+            print(server.base_urls['guide'])
+    """
+
+    def __init__(self, settings: MockSettings, host: str = '127.0.0.1', port: int = 0):
+        """初始化模擬伺服器
+
+        Args:
+            settings: 行為設定
+            host: 監聽位址
+            port: 第一個主機的連接埠，其餘主機依序加一；0 表示由系統分配
+        """
+        self.settings = settings
+        self.host = host
+        self.port = port
+        self.api = MockAPI(settings)
+        self.base_urls: Dict[str, str] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _start(self) -> None:
+        """建立 AppRunner 並為每個主機開啟一個監聽埠"""
+        self._runner = web.AppRunner(create_app(self.api), access_log=None)
+        await self._runner.setup()
+        for offset, name in enumerate(HOSTS):
+            site = web.TCPSite(self._runner, self.host,
+                               self.port + offset if self.port else 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.base_urls[name] = f"http://{self.host}:{port}"
+
+    def start(self) -> Dict[str, str]:
+        """啟動伺服器
+
+        Returns:
+            Dict[str, str]: 各主機的基底網址
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever,
+                                        name="mock-server", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.base_urls
+
+    def stop(self) -> None:
+        """停止伺服器"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def reset_stats(self) -> None:
+        """清除統計資料"""
+        self.api.stats.clear()
+        self.api.started = time.monotonic()
+
+    def __enter__(self) -> "MockServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser) -> None:
+    """加入模擬伺服器行為設定的命令列參數"""
+    defaults = MockSettings()
+    parser.add_argument('--latency', type=float, default=defaults.latency,
+                        help='每個回應的固定延遲秒數')
+    parser.add_argument('--jitter', type=float, default=defaults.jitter,
+                        help='額外隨機延遲的平均秒數（指數分佈）')
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate,
+                        help='隨機回傳 5xx 的機率')
+    parser.add_argument('--throttle-rate', type=float, default=defaults.throttle_rate,
+                        help='隨機回傳 429 的機率')
+    parser.add_argument('--rate-limit', type=float, default=defaults.rate_limit,
+                        help='每個主機每秒請求上限，超過時回傳 429；0 表示不限')
+    parser.add_argument('--retry-after', type=float, default=defaults.retry_after,
+                        help='429 回應的 Retry-After 秒數')
+    parser.add_argument('--pages', type=int, default=defaults.total_pages,
+                        help='搜尋結果的總頁數')
+    parser.add_argument('--seed', type=int, default=defaults.seed,
+                        help='亂數種子')
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    """由命令列參數建立 MockSettings"""
+    return MockSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after,
+        total_pages=args.pages,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='104 API 模擬伺服器')
+    parser.add_argument('--host', default='127.0.0.1', help='監聽位址')
+    parser.add_argument('--port', type=int, default=8900,
+                        help='static 主機的連接埠，guide 與 www 依序加一')
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockServer(settings_from_args(args), args.host, args.port)
+    for name, url in server.start().items():
+        print(f"{name:>6}: {url}")
+    print("按 Ctrl+C 結束")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+# benchmarks/run.py
+
+"""離線負載基準測試：以模擬伺服器量測各 `--mode` 的效能
+
+每種模式各以獨立子行程與全新的暫存目錄執行（不沿用快取與檢查點），
+量測項目：
+- 總耗時（wall time）
+- 請求數與每秒請求數（含重試）
+- 請求延遲 p50 / p95 / p99
+- 429 與 5xx 回應數
+- 峰值 RSS
+
+使用範例：
+    python -m benchmarks.run
+    python -m benchmarks.run --modes skill salary --latency 0.1 --rate-limit 40 --repeat 3
+    python -m benchmarks.run --json benchmark.json -- --format parquet
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .mock_server import MockServer, add_settings_arguments, settings_from_args
+
+MODES = ['all', 'job', 'detail', 'skill', 'salary']
+# 各模式固定加上的參數：基準測試不指定搜尋條件，detail 模式需明確允許擷取全部搜尋結果
+MODE_ARGS: Dict[str, List[str]] = {'detail': ['--all-jobs']}
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_mode(server: MockServer, mode: str, extra_args: List[str],
+             keep: Optional[Path] = None) -> Dict[str, Any]:
+    """以子行程執行單一模式並彙整量測結果
+
+    Args:
+        server: 已啟動的模擬伺服器
+        mode: 分析模式
+        extra_args: 額外傳給 main.py 的參數
+        keep: 保留輸出的目錄；未提供時使用暫存目錄並於結束後刪除
+    """
+    with tempfile.TemporaryDirectory(prefix=f"bench_{mode}_") as tmp:
+        workdir = keep / mode if keep else Path(tmp)
+        workdir.mkdir(parents=True, exist_ok=True)
+        stats_file = workdir / "stats.json"
+        command = [
+            sys.executable, '-m', 'benchmarks.target',
+            '--static', server.base_urls['static'],
+            '--guide', server.base_urls['guide'],
+            '--www', server.base_urls['www'],
+            '--workdir', str(workdir),
+            '--stats-file', str(stats_file),
+            '--', '--mode', mode, '--max-age', '0', *MODE_ARGS.get(mode, []), *extra_args,
+        ]
+        server.reset_stats()
+        proc = subprocess.run(command, cwd=PROJECT_DIR, capture_output=True, text=True)
+        (workdir / "run.log").write_text(proc.stdout + proc.stderr, encoding='utf-8')
+        if not stats_file.exists():
+            raise RuntimeError(f"{mode} 模式執行失敗:\n{proc.stderr[-2000:]}")
+        stats = json.loads(stats_file.read_text(encoding='utf-8'))
+
+    samples = stats['samples']
+    latencies = np.array([s['latency'] for s in samples]) * 1000
+    statuses = [s['status'] for s in samples]
+    p50, p95, p99 = (np.percentile(latencies, [50, 95, 99]) if len(latencies)
+                     else (float('nan'),) * 3)
+    return {
+        'mode': mode,
+        'returncode': stats['returncode'],
+        'wall': stats['wall'],
+        'requests': len(samples),
+        'rps': len(samples) / stats['wall'] if stats['wall'] else 0.0,
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'throttled': statuses.count(429),
+        'server_errors': sum(1 for s in statuses if s is not None and s >= 500),
+        'conn_errors': statuses.count(None),
+        'peak_rss_mb': stats['peak_rss_mb'],
+        'server': server.api.snapshot(),
+    }
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """將量測結果排成文字表格"""
+    header = (f"{'mode':<8}{'wall(s)':>9}{'requests':>10}{'req/s':>9}"
+              f"{'p50(ms)':>9}{'p95(ms)':>9}{'p99(ms)':>9}{'429':>6}{'5xx':>6}"
+              f"{'RSS(MB)':>9}{'rc':>4}")
+    lines = [header, '-' * len(header)]
+    for r in results:
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        lines.append(
+            f"{r['mode']:<8}{r['wall']:>9.2f}{r['requests']:>10}{r['rps']:>9.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+            f"{r['throttled']:>6}{r['server_errors']:>6}{rss:>9}{r['returncode']:>4}"
+        )
+    return '\n'.join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description='以模擬伺服器量測各分析模式的效能',
+        epilog='"--" 之後的參數會原樣傳給 main.py，例如：-- --format parquet'
+    )
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES,
+                        help='要量測的模式')
+    parser.add_argument('--repeat', type=int, default=1, help='每種模式重複執行的次數')
+    parser.add_argument('--json', type=Path, help='將完整結果寫入 JSON 檔')
+    parser.add_argument('--keep-output', type=Path,
+                        help='保留每次執行的輸出、日誌與量測資料於此目錄')
+    add_settings_arguments(parser)
+    parser.add_argument('main_args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    extra_args = args.main_args[1:] if args.main_args[:1] == ['--'] else args.main_args
+
+    settings = settings_from_args(args)
+    results = []
+    with MockServer(settings) as server:
+        for mode in args.modes:
+            for i in range(args.repeat):
+                keep = args.keep_output / f"run{i + 1}" if args.keep_output else None
+                result = run_mode(server, mode, extra_args, keep)
+                results.append(result)
+                print(f"{mode} #{i + 1}: {result['wall']:.2f}s, {result['requests']} 個請求",
+                      file=sys.stderr)
+
+    print(format_table(results))
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2),
+                             encoding='utf-8')
+    return 0 if all(r['returncode'] == 0 for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
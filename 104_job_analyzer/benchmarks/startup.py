@@ -0,0 +1,120 @@
+# benchmarks/startup.py
+
+"""啟動時間基準測試：量測命令列與各分析模組的匯入耗時
+
+每個目標各以全新的子行程重複執行，量測：
+- 總耗時（wall time）的最小值與中位數，另列出空白直譯器（`python -c pass`）作為基準
+- 以 `python -X importtime` 找出累計匯入耗時最多的套件
+
+使用範例：
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 20 --json startup.json
+    python -m benchmarks.startup --targets help salary --importtime 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# 目標名稱 → 直譯器參數
+TARGETS: Dict[str, List[str]] = {
+    'python': ['-c', 'pass'],
+    'help': ['main.py', '--help'],
+    'main': ['-c', 'import main'],
+    'job': ['-c', 'import modules.fetcher'],
+    'detail': ['-c', 'import modules.detail_analyzer'],
+    'skill': ['-c', 'import modules.skill_analyzer'],
+    'salary': ['-c', 'import modules.salary_analyzer'],
+    'queue': ['-c', 'import modules.distributed'],
+}
+
+
+def time_target(args: List[str], repeat: int) -> List[float]:
+    """以子行程重複執行並回傳每次的耗時（秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, *args], cwd=PROJECT_DIR,
+                              capture_output=True, text=True)
+        samples.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(args)} 執行失敗:\n{proc.stderr[-2000:]}")
+    return samples
+
+
+def top_imports(args: List[str], limit: int) -> List[Tuple[str, float]]:
+    """以 -X importtime 取得累計匯入耗時最多的最上層套件
+
+    Returns:
+        List[Tuple[str, float]]: (套件名稱, 累計耗時毫秒)，依耗時由高到低
+    """
+    proc = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=PROJECT_DIR,
+                          capture_output=True, text=True)
+    totals: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # 縮排只有一個空白的是直接匯入的套件，其累計耗時已含所有子模組
+        if name.startswith(' ') and not name.startswith('  '):
+            package = name.strip().split('.')[0]
+            totals[package] = totals.get(package, 0.0) + int(cumulative) / 1000
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    """將量測結果排成文字表格"""
+    baseline = next((r['median_ms'] for r in results if r['target'] == 'python'), 0.0)
+    header = f"{'target':<8}{'min(ms)':>10}{'median(ms)':>12}{'+python(ms)':>13}"
+    lines = [header, '-' * len(header)]
+    for r in results:
+        lines.append(f"{r['target']:<8}{r['min_ms']:>10.0f}{r['median_ms']:>12.0f}"
+                     f"{r['median_ms'] - baseline:>13.0f}")
+    return '\n'.join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='量測命令列與各分析模組的啟動時間')
+    parser.add_argument('--targets', nargs='+', choices=list(TARGETS), default=list(TARGETS),
+                        help='要量測的目標')
+    parser.add_argument('--repeat', type=int, default=10, help='每個目標重複執行的次數')
+    parser.add_argument('--importtime', type=int, default=0, metavar='N',
+                        help='另列出每個目標累計匯入耗時最多的 N 個套件')
+    parser.add_argument('--json', type=Path, help='將完整結果寫入 JSON 檔')
+    args = parser.parse_args()
+
+    results = []
+    for target in args.targets:
+        samples = [s * 1000 for s in time_target(TARGETS[target], args.repeat)]
+        result = {
+            'target': target,
+            'command': ' '.join(TARGETS[target]),
+            'min_ms': min(samples),
+            'median_ms': statistics.median(samples),
+            'samples_ms': samples,
+        }
+        if args.importtime:
+            result['imports'] = top_imports(TARGETS[target], args.importtime)
+        results.append(result)
+        print(f"{target}: {result['median_ms']:.0f} ms", file=sys.stderr)
+
+    print(format_table(results))
+    for result in results:
+        if result.get('imports'):
+            print(f"\n{result['target']}: " + '、'.join(
+                f"{name} {ms:.0f} ms" for name, ms in result['imports']))
+    if args.json:
+        args.json.write_text(json.dumps(results, ensure_ascii=False, indent=2),
+                             encoding='utf-8')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
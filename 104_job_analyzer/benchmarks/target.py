@@ -0,0 +1,103 @@
+# benchmarks/target.py
+
+"""將 API 網址指向模擬伺服器後執行 main.py，並記錄量測資料
+
+由 `benchmarks.run` 以子行程啟動，使每種模式的峰值記憶體互不影響：
+    python -m benchmarks.target --static URL --guide URL --www URL \
+        --workdir DIR --stats-file FILE -- --mode skill
+
+每次送出的 HTTP 請求（含重試）都會記錄狀態碼與延遲，結束時連同
+總耗時與峰值 RSS 寫入 stats-file（JSON）。
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import config
+
+
+def point_config_at(static: str, guide: str, www: str, workdir: Path) -> None:
+    """將網址與輸出目錄改為模擬伺服器與暫存目錄
+
+    必須在匯入 main 與 modules 之前呼叫，因為各模組在匯入時即讀取設定值。
+    """
+    config.URL_JOB_CAT = f"{static}/category-tool/json/JobCat.json"
+    config.URL_JOB_CARD_SKILL = f"{guide}/wow/jobCard/job?jobCode={{job_code}}"
+    config.URL_JOB_CERT_SKILL = f"{guide}/wow/jobCard/cert?jobCode={{job_code}}"
+    config.URL_SALARY = f"{guide}/api/job/seniority/{{job_code}}?type={{type_id}}"
+    config.URL_JOB_SEARCH = f"{www}/jobs/search/list?ro=0"
+    config.URL_JOB_DETAIL_BASE = f"{www}/job/ajax/content/"
+    config.OUTPUT_DIR = str(workdir / "output")
+    config.CACHE_DIR = str(workdir / "cache")
+    config.LOG_DIR = str(workdir / "logs")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """目前行程的峰值 RSS（MB）；不支援的平台回傳 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以 byte 為單位
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def instrument_engine(samples: List[Dict[str, Any]]) -> None:
+    """包裝 HttpEngine._send，記錄每次實際送出的請求"""
+    from modules.http_client import FetchError, HttpEngine
+
+    send = HttpEngine._send
+
+    async def timed_send(self, url, headers, timeout):
+        start = time.perf_counter()
+        try:
+            response = await send(self, url, headers, timeout)
+        except FetchError:
+            samples.append({'status': None, 'latency': time.perf_counter() - start})
+            raise
+        samples.append({'status': response.status, 'latency': response.elapsed})
+        return response
+
+    HttpEngine._send = timed_send
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='以模擬伺服器執行 main.py 並記錄量測資料')
+    parser.add_argument('--static', required=True, help='static 主機基底網址')
+    parser.add_argument('--guide', required=True, help='guide 主機基底網址')
+    parser.add_argument('--www', required=True, help='www 主機基底網址')
+    parser.add_argument('--workdir', type=Path, required=True, help='輸出、快取與日誌目錄')
+    parser.add_argument('--stats-file', type=Path, required=True, help='量測結果 JSON 檔')
+    parser.add_argument('main_args', nargs=argparse.REMAINDER, help='傳給 main.py 的參數')
+    args = parser.parse_args()
+    main_args = args.main_args[1:] if args.main_args[:1] == ['--'] else args.main_args
+
+    point_config_at(args.static, args.guide, args.www, args.workdir)
+    samples: List[Dict[str, Any]] = []
+    instrument_engine(samples)
+
+    import main as app
+    from modules.http_client import close_engine
+
+    sys.argv = ['main.py'] + main_args
+    start = time.perf_counter()
+    rc = app.main()
+    close_engine()
+    wall = time.perf_counter() - start
+
+    args.stats_file.write_text(json.dumps({
+        'returncode': rc,
+        'wall': wall,
+        'peak_rss_mb': peak_rss_mb(),
+        'samples': samples,
+    }), encoding='utf-8')
+    return rc
+
+
+if __name__ == '__main__':
+    sys.exit(main())
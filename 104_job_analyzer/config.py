@@ -8,6 +8,7 @@ URL_SALARY = "https://be.guide.104.com.tw/api/job/seniority/{job_code}?type={typ
 URL_JOB_SEARCH_BASE = "https://www.104.com.tw/jobs/search"
 URL_JOB_SEARCH = "https://www.104.com.tw/jobs/search/list?ro=0"
 URL_JOB_DETAIL_BASE = "https://www.104.com.tw/job/ajax/content/"
+URL_JOB_PAGE = "https://www.104.com.tw/job/{job_id}"
 
 # Salary Types
 ALL_SALARY_TYPES = {
@@ -16,16 +17,84 @@ ALL_SALARY_TYPES = {
 }
 
 # Concurrency Settings
-MAX_WORKERS_SKILL = 10
-MAX_WORKERS_SALARY = 20
-MAX_WORKERS_JOB = 10
+MAX_CONCURRENCY = 30  # 整個行程同時進行中的 HTTP 請求上限
+MAX_CONNECTIONS_PER_HOST = 30  # 每個主機的 keep-alive 連線池大小
+KEEPALIVE_TIMEOUT = 30  # 閒置連線保留秒數
+HTTP_TIMEOUT = 20  # 預設請求逾時秒數
+
+MAX_WORKERS_JOB = 10  # 搜尋結果頁同時擷取的頁數（滑動視窗大小）
+MAX_WORKERS_DETAIL = 20  # 職缺詳細資訊同時擷取的數量
+REORDER_WINDOW = 1000  # 依輸入順序產出結果時，已送出但尚未產出的請求上限（重排緩衝區大小）；需涵蓋重試退避期間的請求量，實際並發仍受 MAX_CONCURRENCY 限制
+DETAIL_BATCH_SIZE = 200  # 職缺詳細資訊每批寫入的筆數
+OUTPUT_BATCH_SIZE = 5000  # 技能/薪資紀錄每批寫入輸出檔的筆數（決定輸出階段的記憶體用量）
+
+# Rate Limiting / Retry Settings（每個主機各自計算）
+RATE_LIMIT_INITIAL = 20.0  # 初始每秒請求數
+RATE_LIMIT_MIN = 1.0  # 速率下限
+RATE_LIMIT_MAX = 200.0  # 速率上限
+RATE_LIMIT_INCREASE = 1.0  # 回應正常時每秒約增加的請求數（加法增加）
+RATE_LIMIT_DECREASE = 0.5  # 遭限流或延遲升高時速率乘上的係數（乘法減少）
+RATE_LIMIT_LATENCY_FACTOR = 3.0  # 平均延遲超過基準延遲幾倍時視為壅塞
+RATE_LIMIT_BASELINE_WINDOW = 30.0  # 基準延遲（長期平均延遲）的時間常數秒數；每次因延遲降速後重設為目前的平均延遲
+RATE_LIMIT_SLOW_START = True  # 第一次遭限流或延遲升高前，每個正常回應使速率加 1（約每秒倍增），之後改為加法增加
+MAX_RETRIES = 4  # 可重試錯誤的最大重試次數
+RETRY_BACKOFF_BASE = 0.5  # 指數退避的基準秒數
+RETRY_BACKOFF_MAX = 30.0  # 單次退避的最長秒數
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)  # 會重試的 HTTP 狀態碼
 
 # Output Settings
 OUTPUT_DIR = "output"
+OUTPUT_FORMATS = ["csv"]  # 預設輸出格式：csv、parquet，可同時指定多個
+PARQUET_COMPRESSION = "zstd"  # Parquet 壓縮方式
+SALARY_MONTHS_PER_YEAR = 12  # 薪資統計中年薪換算為月薪時除以的月數
+SALARY_HISTORY_DAYS = 366  # 薪資統計最多讀取的每日快照天數，0 表示全部
+SEARCH_RESULTS_DIR = "search_results"  # 搜尋結果資料集目錄（位於 OUTPUT_DIR 之下，依日期分割）
+SEARCH_PAGE_LIMIT = 150  # 104 搜尋最多回傳的頁數，達到此頁數的搜尋視為結果被截斷
+SEARCH_AUTO_SPLIT = True  # 搜尋結果被截斷時，自動依職務類別與地區拆分為子查詢
+# 職務類別已無子類別仍被截斷時，依這些地區代碼（各縣市）再拆分
+SEARCH_SPLIT_AREAS = [
+    '6001001000', '6001002000', '6001003000', '6001004000', '6001005000',
+    '6001006000', '6001007000', '6001008000', '6001010000', '6001011000',
+    '6001012000', '6001013000', '6001014000', '6001016000', '6001018000',
+    '6001019000', '6001020000', '6001021000', '6001022000', '6001023000',
+]
 LOG_DIR = "logs"  # 日誌檔案目錄
 LOG_FILE = "analysis.log"  # 主要日誌檔案
+RUN_SUMMARY_FILE = "run_summary.json"  # 每次執行的效能量測摘要（位於 LOG_DIR）
 SKILL_LOG = "skill_analysis.log"  # 技能分析日誌
 SALARY_LOG = "salary_analysis.log"  # 薪資分析日誌
+LOG_MAX_BYTES = 10 * 1024 * 1024  # 日誌檔超過此大小時輪替，0 表示不依大小輪替
+LOG_BACKUP_COUNT = 5  # 輪替後保留的舊日誌檔數量（analysis.log.1 ~ .N）
+LOG_ROTATE_DAILY = True  # 日期改變時輪替日誌檔
+LOG_QUEUE_SIZE = 10000  # 等待背景執行緒寫出的日誌紀錄上限，佇列滿時捨棄新紀錄而不阻塞
+LOG_DEDUP_WINDOW = 60  # 重複警告的計算區間秒數，0 表示不省略
+LOG_DEDUP_BURST = 5  # 同一位置的警告在每個區間內最多記錄的筆數，其餘省略並於之後彙總
+
+# Cache Settings
+CACHE_DIR = "cache"  # 快取檔案目錄
+CATEGORY_CACHE_TTL = 24 * 60 * 60  # 職務類別快取有效秒數，逾時後以 ETag/Last-Modified 重新驗證
+RESULT_STORE_FILE = "results.sqlite3"  # 技能/薪資擷取結果儲存檔
+SKILL_MAX_AGE = 7 * 24 * 60 * 60  # 技能資料有效秒數，未逾時的職務不重新擷取
+SALARY_MAX_AGE = 7 * 24 * 60 * 60  # 薪資資料有效秒數，未逾時的職務不重新擷取
+STORE_BATCH_SIZE = 200  # 擷取結果每累積幾筆寫入一次儲存
+CHECKPOINT_DIR = "checkpoints"  # 檢查點紀錄目錄（位於 CACHE_DIR 之下）
+SKILL_INDEX_FILE = "skill_index.npz"  # 技能反向索引檔（位於 CACHE_DIR 之下）
+POSTING_INDEX_FILE = "postings.sqlite3"  # 跨執行的職缺索引檔（位於 CACHE_DIR 之下）
+# 職缺內容指紋涵蓋的搜尋結果欄位，任一欄位改變即視為職缺已變更
+POSTING_FINGERPRINT_FIELDS = [
+    'jobName', 'appearDate', 'salaryLow', 'salaryHigh', 'salaryDesc',
+    'jobAddrNoDesc', 'periodDesc', 'optionEdu',
+]
+HTTP_CACHE_ENABLED = True  # 是否將 HTTP 回應保存於磁碟快取
+HTTP_CACHE_FILE = "http_cache.sqlite3"  # HTTP 回應快取檔（位於 CACHE_DIR 之下）
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # HTTP 快取壓縮後的總大小上限，超過時淘汰最久未使用的回應
+HTTP_CACHE_VARY_HEADERS = ('Accept', 'Accept-Language')  # 納入快取鍵的請求標頭
+SQLITE_BUSY_TIMEOUT = 30  # 多個行程同時寫入同一個 SQLite 檔時，等待鎖定的最長秒數
+WORK_QUEUE_FILE = "work_queue.sqlite3"  # 多行程擷取的工作佇列（位於 CACHE_DIR 之下）
+WORK_QUEUE_BATCH_SIZE = 200  # 工作者每次領取的工作數
+WORK_QUEUE_LEASE_SECONDS = 10 * 60  # 領取的工作超過此秒數未完成，即可由其他工作者重新領取
+WORK_QUEUE_MAX_ATTEMPTS = 3  # 同一工作的最大嘗試次數，超過即標記為失敗
+WORK_QUEUE_POLL_SECONDS = 5  # 等待其他工作者完成時的輪詢間隔秒數
 
 # HTTP Headers
 HEADERS = {
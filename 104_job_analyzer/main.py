@@ -4,20 +4,22 @@
 
 此程式為系統的進入點，負責：
 1. 解析命令列參數
-2. 協調各個分析模組的執行
+2. 協調各個分析模組的執行（依相依關係並行執行各階段）
 3. 處理執行結果
 4. 錯誤處理
 """
 
 import argparse
-from modules.common import (
-    datetime, logger,
-    Path, Optional, Dict, List
-)
-from modules.skill_analyzer import run_skill_analysis
-from modules.salary_analyzer import run_salary_analysis
-from modules.fetcher import run_job_analysis
-from config import OUTPUT_DIR, DEFAULT_PARAMS
+from pathlib import Path
+from typing import Optional
+
+# 只匯入輕量模組：pandas、aiohttp 等較重的套件由各分析模組在實際執行時才載入，
+# 使 --help、參數錯誤與短時間的排程呼叫不必等待匯入
+from modules.logger_setup import logger
+from modules.metrics import get_metrics
+from modules.scheduler import PhaseScheduler
+from modules.writers import SINKS, set_default_formats
+from config import OUTPUT_FORMATS, LOG_DIR, RUN_SUMMARY_FILE
 
 def parse_args():
     """解析命令列參數
@@ -32,14 +34,22 @@ def parse_args():
     
     parser.add_argument(
         '--mode', 
-        choices=['all', 'job', 'skill', 'salary'],
+        choices=['all', 'job', 'detail', 'skill', 'salary'],
         default='all',
-        help='分析模式：all=全部, job=職缺, skill=技能, salary=薪資'
+        help='分析模式：all=全部（職缺、技能、薪資）, job=職缺, detail=職缺詳細資訊, skill=技能, salary=薪資'
     )
     
     parser.add_argument(
         '--category',
-        help='職務類別代碼，例如：2007001000 表示資料工程師'
+        help='職務類別代碼，例如：2007001000 表示資料工程師；技能與薪資分析只處理此類別及其子類別，'
+             '可用逗號分隔多個'
+    )
+    
+    parser.add_argument(
+        '--category-depth',
+        type=int,
+        metavar='N',
+        help='技能與薪資分析只處理到 --category（未指定時為最上層類別）以下第 N 層'
     )
     
     parser.add_argument(
@@ -47,8 +57,161 @@ def parse_args():
         help='搜尋關鍵字，例如：Python, AWS, 資料分析'
     )
     
+    parser.add_argument(
+        '--queries',
+        type=Path,
+        metavar='FILE',
+        help='批次搜尋：以 CSV 查詢檔（keywords、category、選填 name 欄位）同時執行多組搜尋並去除重複職缺，取代 --category/--keywords 的單一搜尋'
+    )
+    
+    parser.add_argument(
+        '--max-age',
+        type=float,
+        metavar='HOURS',
+        help='技能/薪資儲存結果的有效小時數，未逾時的職務不重新擷取；0 表示全部重新擷取'
+    )
+    
+    parser.add_argument(
+        '--format',
+        nargs='+',
+        choices=sorted(SINKS),
+        default=OUTPUT_FORMATS,
+        help='輸出格式，可同時指定多個，例如：--format csv parquet'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='從上次中斷處繼續，沿用檢查點中已完成的項目'
+    )
+    
+    parser.add_argument(
+        '--changes-only',
+        action='store_true',
+        help='detail 模式只擷取與先前執行相比新增或變更的職缺'
+    )
+    
+    parser.add_argument(
+        '--all-jobs',
+        action='store_true',
+        help='detail 模式在未指定 --category/--keywords 且沒有今日職缺URL清單時，確認要擷取全站職缺的詳細資訊'
+    )
+    
+    parser.add_argument(
+        '--no-http-cache',
+        action='store_true',
+        help='不使用 HTTP 回應快取，所有請求都經由網路'
+    )
+    
+    parser.add_argument(
+        '--queue',
+        choices=['enqueue', 'work', 'merge'],
+        help='多行程擷取：enqueue 將 --mode 的擷取工作加入佇列；work 以工作者身分處理佇列（可同時執行多個）；'
+             'merge 等待佇列清空後合併輸出'
+    )
+    
+    parser.add_argument(
+        '--worker-id',
+        help='--queue work 的工作者識別名稱，預設為「主機名稱-PID」'
+    )
+    
+    parser.add_argument(
+        '--prometheus',
+        type=Path,
+        metavar='PATH',
+        help='另將效能量測資料以 Prometheus 文字格式寫入此檔（供 node_exporter textfile collector 讀取）'
+    )
+    
     return parser.parse_args()
 
+def load_job_categories() -> None:
+    """預先載入職務類別表，供技能與薪資分析共用
+
+    Raises:
+        RuntimeError: 無法取得職務類別表
+    """
+    from modules.category_cache import get_job_categories
+
+    if get_job_categories() is None:
+        raise RuntimeError("無法獲取職務類別資料")
+
+def build_scheduler(args: argparse.Namespace, max_age: Optional[float]) -> PhaseScheduler:
+    """依分析模式建立階段排程
+
+    職缺搜尋與職務類別載入互不相依、同時開始；技能與薪資分析
+    在職務類別載入完成後並行執行。並行只能重疊不同主機的請求：技能與薪資
+    分析都請求 guide 主機、共用該主機的速率限制器，主機速率達上限時兩者
+    並行的耗時約為兩者相加。
+
+    Args:
+        args: 命令列參數
+        max_age: 技能/薪資儲存結果的有效秒數
+
+    Returns:
+        PhaseScheduler: 尚未執行的排程
+    """
+    scheduler = PhaseScheduler()
+
+    # 職缺分析
+    if args.mode in ['all', 'job'] and args.queue == 'merge':
+        from modules.distributed import merge_search_results
+        scheduler.add('job', merge_search_results, label='合併搜尋結果')
+    elif args.mode in ['all', 'job'] and args.queries:
+        from modules.fetcher import run_batch_analysis
+        scheduler.add('job', lambda: run_batch_analysis(args.queries, args.resume),
+                      label='批次職缺分析')
+    elif args.mode in ['all', 'job']:
+        from modules.fetcher import run_job_analysis
+        scheduler.add('job', lambda: run_job_analysis(args.category, args.keywords, args.resume),
+                      label='職缺分析')
+
+    # 職缺詳細資訊分析
+    if args.mode == 'detail':
+        from modules.detail_analyzer import run_detail_analysis
+        scheduler.add('detail', lambda: run_detail_analysis(args.category, args.keywords,
+                                                          args.changes_only, args.all_jobs),
+                      label='職缺詳細資訊分析')
+
+    # 技能與薪資分析共用職務類別表
+    if args.mode in ['all', 'skill', 'salary']:
+        scheduler.add('categories', load_job_categories, label='職務類別載入')
+
+    # 技能分析
+    if args.mode in ['all', 'skill']:
+        from modules.skill_analyzer import run_skill_analysis
+        scheduler.add('skill', lambda: run_skill_analysis(max_age, args.resume,
+                                                        args.category, args.category_depth),
+                      depends=['categories'], label='技能分析')
+
+    # 薪資分析
+    if args.mode in ['all', 'salary']:
+        from modules.salary_analyzer import run_salary_analysis
+        scheduler.add('salary', lambda: run_salary_analysis(max_age, args.resume,
+                                                          args.category, args.category_depth),
+                      depends=['categories'], label='薪資分析')
+
+    return scheduler
+
+def export_metrics(prometheus_file: Optional[Path] = None) -> None:
+    """輸出本次執行的效能量測摘要
+
+    摘要一律寫入 LOG_DIR 下的 RUN_SUMMARY_FILE；指定 prometheus_file 時另輸出 Prometheus 文字格式。
+    """
+    from modules.http_client import get_engine
+
+    metrics = get_metrics()
+    for host, limiter in get_engine().limiters.items():
+        metrics.set_gauge('rate_limit_rps', host, limiter.rate)
+    try:
+        summary_file = Path(LOG_DIR) / RUN_SUMMARY_FILE
+        metrics.write_summary(summary_file)
+        logger.info(f"效能量測摘要已儲存至 {summary_file}")
+        if prometheus_file:
+            metrics.write_prometheus(prometheus_file)
+            logger.info(f"Prometheus 量測資料已儲存至 {prometheus_file}")
+    except OSError as e:
+        logger.error(f"儲存效能量測資料時發生錯誤: {str(e)}")
+
 def main() -> int:
     """主程式
     
@@ -61,30 +224,42 @@ def main() -> int:
         int: 執行狀態碼，0 表示成功，非 0 表示失敗
     """
     args = parse_args()
+    from modules.http_client import get_engine
+
+    max_age = None if args.max_age is None else args.max_age * 60 * 60
+    set_default_formats(args.format)
+    engine = get_engine()
+    if args.no_http_cache:
+        engine.cache = None
+    elif engine.cache is not None and max_age == 0:
+        # 要求全部重新擷取時，快取中的回應一律先向伺服器重新驗證
+        engine.cache.revalidate_all = True
     logger.info("===== 開始執行資料分析 =====")
     
     try:
-        # 職缺分析
-        if args.mode in ['all', 'job']:
-            logger.info("===== 開始執行職缺分析 =====")
-            run_job_analysis(args.category, args.keywords)
-            logger.info("===== 職缺分析執行完畢 =====")
-        
-        # 技能分析    
-        if args.mode in ['all', 'skill']:
-            logger.info("===== 開始執行技能分析 =====")
-            run_skill_analysis()
-            logger.info("===== 技能分析執行完畢 =====")
-        
-        # 薪資分析    
-        if args.mode in ['all', 'salary']:
-            logger.info("===== 開始執行薪資分析 =====")
-            run_salary_analysis()
-            logger.info("===== 薪資分析執行完畢 =====")
-            
+        if args.queue:
+            from modules.distributed import (
+                enqueue_work, run_worker, wait_for_queues, queues_for_mode
+            )
+        if args.queue == 'enqueue':
+            enqueue_work(args.mode, args.category, args.keywords, args.queries,
+                         args.category_depth, max_age)
+            return 0
+        if args.queue == 'work':
+            run_worker(args.mode, args.worker_id)
+            return 0
+        if args.queue == 'merge':
+            wait_for_queues(queues_for_mode(args.mode))
+        results = build_scheduler(args, max_age).run()
     except Exception as e:
         logger.error(f"執行過程中發生錯誤: {str(e)}")
         return 1
+    finally:
+        export_metrics(args.prometheus)
+
+    if any(result.status != 'ok' for result in results.values()):
+        logger.error("部分分析階段未成功完成")
+        return 1
     
     logger.info("===== 資料分析執行完畢 =====")
     return 0
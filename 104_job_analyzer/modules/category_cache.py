@@ -0,0 +1,172 @@
+# modules/category_cache.py
+
+"""職務類別快取模組：負責取得並快取扁平化後的職務類別表
+
+快取分為兩層：
+1. 行程內快取：同一次執行中的技能、薪資分析共用同一份類別表
+2. 磁碟快取：扁平化後的表格以 Parquet 欄式格式儲存，並記錄 ETag/Last-Modified；
+   在 CATEGORY_CACHE_TTL 內直接讀取，逾時後以條件式請求重新驗證
+"""
+
+import threading
+import time
+
+from .common import (
+    pd, json, logger, Path, Optional, Dict, List,
+    FetchError, get_engine
+)
+from .processor import flatten_job_categories, split_category_codes
+from config import URL_JOB_CAT, HEADERS, CACHE_DIR, CATEGORY_CACHE_TTL
+
+CATEGORY_TABLE_FILE = "job_categories.parquet"
+CATEGORY_META_FILE = "job_categories.meta.json"
+# 重複出現於多列的欄位，以 category 型別保存（每個值只存一次，各列只存代碼）
+CATEGORY_CODE_COLUMNS = ['parent_code', 'parent_name']
+
+_lock = threading.Lock()
+_categories: Optional[pd.DataFrame] = None
+
+def _cache_path(filename: str) -> Path:
+    """取得快取檔案的完整路徑"""
+    cache_path = Path(CACHE_DIR)
+    cache_path.mkdir(parents=True, exist_ok=True)
+    return cache_path / filename
+
+def _load_meta() -> Dict:
+    """讀取快取的中繼資料，不存在或損毀時回傳空字典"""
+    try:
+        with open(_cache_path(CATEGORY_META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_meta(meta: Dict) -> None:
+    """寫入快取的中繼資料"""
+    with open(_cache_path(CATEGORY_META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+def _compact(df_jobcat: pd.DataFrame) -> pd.DataFrame:
+    """將父類別代碼與名稱轉為 category 型別"""
+    return df_jobcat.astype({column: 'category' for column in CATEGORY_CODE_COLUMNS})
+
+def _build_table(categories_json) -> pd.DataFrame:
+    """將原始類別 JSON 扁平化並依 job_code 排序"""
+    df_jobcat = pd.DataFrame(flatten_job_categories(categories_json))
+    return _compact(df_jobcat.sort_values(by='job_code').reset_index(drop=True))
+
+def _load_categories(force_refresh: bool) -> Optional[pd.DataFrame]:
+    """依序嘗試磁碟快取、條件式請求與完整下載"""
+    table_file = _cache_path(CATEGORY_TABLE_FILE)
+    meta = _load_meta() if table_file.exists() else {}
+
+    # 1. 快取仍在有效期限內，不需連網
+    age = time.time() - meta.get('fetched_at', 0)
+    if meta and not force_refresh and age < CATEGORY_CACHE_TTL:
+        logger.info(f"使用職務類別快取 {table_file}")
+        return _compact(pd.read_parquet(table_file))
+
+    # 2. 以 ETag/Last-Modified 重新驗證
+    headers = HEADERS.copy()
+    headers['Accept'] = 'application/json'
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    logger.info(f"正在從 {URL_JOB_CAT} 獲取職務類別...")
+    engine = get_engine()
+    try:
+        response = engine.run(engine.request(URL_JOB_CAT, headers=headers, timeout=10))
+    except FetchError as e:
+        if meta:
+            logger.warning(f"獲取職務類別失敗，改用既有快取: {e}", extra=e.log_fields())
+            return _compact(pd.read_parquet(table_file))
+        logger.error(f"獲取職務類別失敗: {e}", extra=e.log_fields())
+        return None
+
+    if response.status == 304 and meta:
+        logger.info("職務類別未變更，沿用快取")
+        df_jobcat = _compact(pd.read_parquet(table_file))
+    else:
+        try:
+            df_jobcat = _build_table(response.json())
+        except ValueError as e:
+            logger.error(f"解析職務類別失敗: {e}")
+            return None
+        df_jobcat.to_parquet(table_file, index=False)
+        meta = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+
+    meta['fetched_at'] = time.time()
+    _save_meta(meta)
+    return df_jobcat
+
+def category_children(df_jobcat: pd.DataFrame) -> Dict[Optional[str], List[str]]:
+    """由扁平化的類別表建立父類別代碼 → 子類別代碼的對照
+
+    最上層類別（不屬於任何類別的父類別代碼）以 None 為鍵。
+    """
+    job_codes = df_jobcat['job_code'].astype(str)
+    parent_codes = df_jobcat['parent_code'].astype(str)
+    children: Dict[Optional[str], List[str]] = {}
+    for parent_code, job_code in zip(parent_codes, job_codes):
+        children.setdefault(parent_code, []).append(job_code)
+    children[None] = sorted(set(parent_codes) - set(job_codes))
+    return children
+
+def select_categories(df_jobcat: pd.DataFrame, root: Optional[str] = None,
+                      max_depth: Optional[int] = None) -> pd.DataFrame:
+    """從扁平化的類別表中選出子樹
+
+    由根節點逐層往下找出子類別；根類別本身若為類別表中的一列也會選取。
+
+    Args:
+        df_jobcat: 扁平化的職務類別表
+        root: 根類別代碼（以逗號分隔可指定多個），未提供時從最上層開始
+        max_depth: 只保留到根節點以下第幾層；根節點為第 0 層
+
+    Returns:
+        pd.DataFrame: 選取的列，保留原本的順序
+    """
+    if not root and max_depth is None:
+        return df_jobcat
+    job_codes = df_jobcat['job_code'].astype(str)
+    children = category_children(df_jobcat)
+
+    frontier = split_category_codes(root) or children[None]
+    known = set(job_codes)
+    unknown = [code for code in frontier if code not in children and code not in known]
+    if unknown:
+        logger.warning(f"職務類別表中找不到類別代碼: {', '.join(unknown)}")
+    selected = set(frontier)
+    depth = 0
+    while frontier and (max_depth is None or depth < max_depth):
+        frontier = [child for code in frontier for child in children.get(code, ())]
+        selected.update(frontier)
+        depth += 1
+    return df_jobcat[job_codes.isin(selected)].reset_index(drop=True)
+
+def get_job_categories(force_refresh: bool = False, root: Optional[str] = None,
+                       max_depth: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """取得扁平化後的職務類別表
+
+    同一行程內只會載入一次；回傳值為副本，呼叫端可自由修改。
+
+    Args:
+        force_refresh: 忽略有效期限，強制向伺服器重新驗證
+        root: 只取這些類別（以逗號分隔）本身與其下的子類別，參見 select_categories
+        max_depth: 只取到根節點以下第幾層
+
+    Returns:
+        Optional[pd.DataFrame]: 欄位為 parent_code, parent_name（category 型別）, job_code, job_name，
+            依 job_code 排序；無法取得時回傳 None
+    """
+    global _categories
+    with _lock:
+        if _categories is None or force_refresh:
+            _categories = _load_categories(force_refresh)
+        if _categories is None:
+            return None
+        return select_categories(_categories, root, max_depth).copy()
@@ -0,0 +1,81 @@
+# modules/checkpoint.py
+
+"""檢查點模組：以附加式紀錄檔保存長時間擷取的進度
+
+每完成一個項目就寫入一行 JSON（{"key": ..., "value": ...}），
+執行中斷後可透過 `--resume` 重新載入紀錄，只送出尚未完成的請求。
+整個階段順利完成後紀錄檔即被刪除。
+"""
+
+from .common import (
+    json, logger, Path, Any, Dict
+)
+from config import CACHE_DIR, CHECKPOINT_DIR
+
+def _to_key(raw: Any) -> Any:
+    """JSON 陣列還原為 tuple，使其可作為字典鍵"""
+    return tuple(raw) if isinstance(raw, list) else raw
+
+class Journal:
+    """附加式 JSON Lines 檢查點紀錄
+
+    使用範例：
+        with Journal("salaries", resume=True) as journal:
+            done = journal.entries
+            for key, value in fetch(remaining):
+                journal.append(key, value)
+            journal.complete()
+    """
+
+    def __init__(self, name: str, resume: bool = False):
+        """開啟檢查點紀錄
+
+        Args:
+            name: 紀錄名稱（同時作為檔名）
+            resume: True 時載入既有紀錄並接續寫入，否則清空重來
+        """
+        self.path = Path(CACHE_DIR) / CHECKPOINT_DIR / f"{name}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries: Dict[Any, Any] = self._load() if resume else {}
+        if self.entries:
+            logger.info(f"從檢查點 {self.path} 載入 {len(self.entries)} 筆已完成項目")
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self) -> Dict[Any, Any]:
+        """讀取既有紀錄；中斷時寫到一半的最後一行會被截除"""
+        if not self.path.exists():
+            return {}
+        entries = {}
+        valid_size = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    entries[_to_key(record['key'])] = record['value']
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid_size += len(line)
+        with open(self.path, 'r+b') as f:
+            f.truncate(valid_size)
+        return entries
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def append(self, key: Any, value: Any) -> None:
+        """寫入一筆已完成項目並立即送出至作業系統"""
+        self._file.write(json.dumps({'key': key, 'value': value}, ensure_ascii=False) + '\n')
+        self._file.flush()
+
+    def close(self) -> None:
+        """關閉紀錄檔（保留檔案供下次接續）"""
+        if not self._file.closed:
+            self._file.close()
+
+    def complete(self) -> None:
+        """階段完成：關閉並刪除紀錄檔"""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -27,7 +27,7 @@ import json
 import argparse
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Set, Optional, Any, Tuple, Union
+from typing import Dict, List, Set, Optional, Any, Tuple, Union, Iterable, Iterator, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from collections import defaultdict
 
@@ -36,8 +36,8 @@ import pandas as pd
 import numpy as np
 from tqdm import tqdm
 
-# 網路請求套件
-import requests
+# 網路請求套件（requests 已由 HTTP 引擎取代，保留供外部程式使用，取用時才匯入）
+import importlib
 import urllib.parse
 
 # 專案設定
@@ -53,6 +53,16 @@ from config import (
 )
 
 from .logger_setup import logger
+from .http_client import FetchError, get_engine
+from .metrics import get_metrics
+from .writers import open_sink, write_frame, get_default_formats
+
+def __getattr__(name: str) -> Any:
+    """延遲匯入：`requests` 在第一次取用時才匯入，不拖慢每次啟動"""
+    if name == 'requests':
+        module = globals()['requests'] = importlib.import_module('requests')
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def get_output_path(filename: str) -> Path:
     """取得輸出檔案的完整路徑
@@ -67,6 +77,24 @@ def get_output_path(filename: str) -> Path:
     output_path.mkdir(parents=True, exist_ok=True)
     return output_path / filename
 
+def save_dataframe(df: pd.DataFrame, prefix: str,
+                   formats: Optional[List[str]] = None) -> None:
+    """以指定格式儲存DataFrame
+
+    Args:
+        df: 要儲存的DataFrame
+        prefix: 檔名前綴
+        formats: 輸出格式列表（csv、parquet），未提供時使用本次執行的預設格式
+    """
+    today = datetime.now().strftime("%Y%m%d")
+    for fmt in formats or get_default_formats():
+        try:
+            output_file = get_output_path(f"{prefix}_{today}.{fmt}")
+            write_frame(df, output_file, fmt)
+            logger.info(f"資料已儲存至 {output_file}")
+        except Exception as e:
+            logger.error(f"儲存{fmt.upper()}檔案時發生錯誤: {str(e)}")
+
 def save_to_csv(df: pd.DataFrame, prefix: str) -> None:
     """儲存DataFrame到CSV檔案
     
@@ -74,14 +102,115 @@ def save_to_csv(df: pd.DataFrame, prefix: str) -> None:
         df: 要儲存的DataFrame
         prefix: 檔名前綴
     """
-    try:
+    save_dataframe(df, prefix, ['csv'])
+
+class BatchWriter:
+    """分批寫入輸出檔案
+
+    紀錄先暫存於緩衝區，累積到 batch_size 筆時才寫入磁碟，
+    記憶體用量只與批次大小有關。每種輸出格式各寫一個檔案，
+    檔案在第一批寫入時才建立，沒有任何紀錄時不會產生空檔。
+
+    使用範例：
+        with BatchWriter("104_job_details", batch_size=200) as writer:
+            for record in records:
+                writer.write(record)
+    """
+
+    def __init__(self, prefix: str, batch_size: int = 500,
+                 formats: Optional[List[str]] = None,
+                 transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None):
+        """初始化分批寫入器
+
+        Args:
+            prefix: 檔名前綴
+            batch_size: 每批寫入的筆數
+            formats: 輸出格式列表，未提供時使用本次執行的預設格式
+            transform: 寫入前套用於每批 DataFrame 的轉換（如欄位型別轉換）
+        """
         today = datetime.now().strftime("%Y%m%d")
-        output_file = get_output_path(f"{prefix}_{today}.csv")
-        
-        df.to_csv(output_file, index=False, encoding='utf-8-sig')
-        logger.info(f"資料已儲存至 {output_file}")
-    except Exception as e:
-        logger.error(f"儲存CSV檔案時發生錯誤: {str(e)}")
+        self.prefix = prefix
+        self.formats = formats or get_default_formats()
+        self.output_files = [get_output_path(f"{prefix}_{today}.{fmt}")
+                             for fmt in self.formats]
+        self.batch_size = batch_size
+        self.transform = transform
+        self.rows_written = 0
+        # 緩衝區以欄為單位保存（欄名 → 值列表），不為每筆紀錄保留一個 dict
+        self._columns: Dict[str, List[Any]] = {}
+        self._pending = 0
+        self._sinks = []
+
+    def __enter__(self) -> "BatchWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self.flush()
+        finally:
+            for sink in self._sinks:
+                sink.close()
+        if self._sinks:
+            for output_file in self.output_files:
+                logger.info(f"已寫入 {self.rows_written} 筆資料至 {output_file}")
+
+    def write(self, record: Dict) -> None:
+        """加入一筆紀錄，緩衝區滿時自動寫入
+
+        紀錄缺少的欄位以 None 補齊，欄位順序依第一次出現的順序。
+        """
+        columns = self._columns
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * self._pending
+            column.append(value)
+        self._pending += 1
+        if len(record) < len(columns):
+            for column in columns.values():
+                if len(column) < self._pending:
+                    column.append(None)
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """將緩衝區內的紀錄寫入檔案"""
+        if not self._pending:
+            return
+        if not self._sinks:
+            self._sinks = [open_sink(path, fmt)
+                           for path, fmt in zip(self.output_files, self.formats)]
+        metrics = get_metrics()
+        with metrics.span(f"normalize.{self.prefix}"):
+            df = pd.DataFrame(self._columns)
+            if self.transform is not None:
+                df = self.transform(df)
+        with metrics.span(f"write.{self.prefix}"):
+            for sink in self._sinks:
+                sink.write(df)
+        self.rows_written += self._pending
+        self._columns = {}
+        self._pending = 0
+
+def write_records(records: Iterable[Dict], prefix: str, batch_size: int = 500,
+                  formats: Optional[List[str]] = None,
+                  transform: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> int:
+    """將紀錄串流分批寫入輸出檔案
+
+    Args:
+        records: 紀錄的迭代器，逐筆取用，不會一次載入記憶體
+        prefix: 檔名前綴
+        batch_size: 每批寫入的筆數
+        formats: 輸出格式列表，未提供時使用本次執行的預設格式
+        transform: 寫入前套用於每批 DataFrame 的轉換
+
+    Returns:
+        int: 寫入的筆數
+    """
+    with BatchWriter(prefix, batch_size, formats, transform) as writer:
+        for record in records:
+            writer.write(record)
+    return writer.rows_written
 
 def fetch_json(url: str, headers: Dict = HEADERS) -> Optional[Dict]:
     """從URL獲取JSON資料
@@ -93,14 +222,40 @@ def fetch_json(url: str, headers: Dict = HEADERS) -> Optional[Dict]:
     Returns:
         Optional[Dict]: JSON回應資料，失敗時返回None
     """
+    engine = get_engine()
     try:
-        response = requests.get(url, headers=headers, timeout=20)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"獲取JSON資料時發生錯誤: {str(e)}")
+        return engine.run(engine.get_json(url, headers=headers))
+    except FetchError as e:
+        logger.error(f"獲取JSON資料時發生錯誤: {str(e)}", extra=e.log_fields())
         return None
 
+def coerce_numeric_columns(df: pd.DataFrame, columns: List[str],
+                           dtype: Optional[str] = None) -> pd.DataFrame:
+    """將指定欄位轉為可為空的數值型別
+
+    Args:
+        df: 要轉換的DataFrame（就地修改）
+        columns: 欄位名稱，不存在的欄位會被略過
+        dtype: 指定型別（'Int64' 或 'Float64'）；未提供時全為整數的欄位
+            轉為 Int64，其餘轉為 Float64。無法解析的值視為空值。
+
+    Returns:
+        pd.DataFrame: 轉換後的DataFrame
+    """
+    for column in columns:
+        if column not in df.columns:
+            continue
+        values = pd.to_numeric(df[column], errors='coerce')
+        if dtype:
+            df[column] = values.astype(dtype)
+            continue
+        non_null = values.dropna()
+        if (non_null == non_null.round()).all():
+            df[column] = values.astype('Int64')
+        else:
+            df[column] = values.astype('Float64')
+    return df
+
 def safe_get(data: Dict, *keys: str, default: Any = None) -> Any:
     """安全地從巢狀字典中獲取值
     
@@ -126,15 +281,16 @@ __all__ = [
     # 資料處理
     'pd', 'np', 'tqdm',
     # 型別提示
-    'Dict', 'List', 'Set', 'Optional', 'Any', 'Tuple', 'Union',
+    'Dict', 'List', 'Set', 'Optional', 'Any', 'Tuple', 'Union', 'Iterable', 'Iterator', 'Callable',
     # 並發處理
     'ThreadPoolExecutor', 'as_completed',
     # 集合
     'defaultdict',
     # 網路請求
-    'requests', 'urllib',
+    'requests', 'urllib', 'FetchError', 'get_engine',
     # 工具函數
-    'save_to_csv', 'fetch_json', 'get_output_path', 'safe_get',
+    'save_to_csv', 'save_dataframe', 'BatchWriter', 'write_records', 'fetch_json', 'get_output_path', 'safe_get', 'get_metrics',
+    'coerce_numeric_columns',
     # 日誌
     'logger',
     # 設定
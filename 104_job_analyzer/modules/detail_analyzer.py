@@ -0,0 +1,105 @@
+"""職缺詳細資訊分析模組：負責擷取職缺的工作內容、條件與福利"""
+
+from .common import (
+    pd, datetime, tqdm, logger, Path,
+    Optional, Dict, Tuple, Iterator,
+    BatchWriter, get_output_path, get_engine, get_metrics
+)
+from .fetcher import (
+    JobURLFetcher,
+    JobDetailFetcher,
+    build_detail_url,
+    extract_job_id
+)
+from .processor import flatten_job_detail
+from config import MAX_WORKERS_DETAIL, DETAIL_BATCH_SIZE
+
+def iter_job_urls_from_csv(csv_file: Path, chunksize: int = DETAIL_BATCH_SIZE) -> Iterator[str]:
+    """分塊讀取職缺URL清單，逐筆產生詳細資訊 API 的 URL
+
+    Args:
+        csv_file: `all_job_urls_*.csv` 檔案路徑
+        chunksize: 每次讀取的列數
+
+    Yields:
+        str: 職缺詳細資訊 URL
+    """
+    for chunk in pd.read_csv(csv_file, usecols=['url'], chunksize=chunksize):
+        for job_url in chunk['url'].dropna():
+            yield build_detail_url(job_url)
+
+def run_detail_analysis(category: Optional[str] = None, keywords: Optional[str] = None,
+                        changes_only: bool = False, all_jobs: bool = False) -> None:
+    """執行職缺詳細資訊分析
+
+    流程:
+    1. 取得職缺URL來源（有指定搜尋條件時直接串流搜尋結果，否則讀取今日的 URL 清單；
+       `changes_only=True` 時一律串流搜尋結果，只取當天新增或變更的職缺）
+    2. 以有界視窗並行擷取詳細資訊
+    3. 扁平化並分批寫入輸出檔案
+
+    整個流程以串流方式進行，記憶體用量只與並行數量及批次大小有關。
+
+    Args:
+        category: 職務類別代碼
+        keywords: 搜尋關鍵字
+        changes_only: 只擷取當天新增或變更的職缺
+        all_jobs: 沒有搜尋條件也沒有今日的 URL 清單時，允許擷取整個未篩選的搜尋結果
+
+    Raises:
+        ValueError: 沒有搜尋條件、沒有今日的 URL 清單，且未指定 all_jobs
+    """
+    today = datetime.now().strftime("%Y%m%d")
+    url_file = get_output_path(f"all_job_urls_{today}.csv")
+    if not (category or keywords or all_jobs) and (changes_only or not url_file.exists()):
+        # 未篩選的搜尋涵蓋全站職缺，可能產生數萬個詳細資訊請求
+        raise ValueError(f"未指定 --category/--keywords，且沒有今日的職缺URL清單 {url_file}；"
+                         "若確定要擷取全站職缺的詳細資訊，請加上 --all-jobs")
+
+    logger.info("===== 開始執行職缺詳細資料分析 =====")
+
+    try:
+        # 串流搜尋結果時同時寫入當日的搜尋結果資料集
+        with JobURLFetcher() as url_fetcher:
+            # 1. 取得職缺URL來源
+            if changes_only:
+                logger.info("只擷取今日新增或變更職缺的詳細資訊")
+                job_urls = url_fetcher.iter_urls(category, keywords, changes_only=True)
+            elif not (category or keywords) and url_file.exists():
+                logger.info(f"從 {url_file} 讀取職缺URL")
+                job_urls = iter_job_urls_from_csv(url_file)
+            else:
+                if not (category or keywords):
+                    logger.warning("未指定搜尋條件，將擷取全站職缺的詳細資訊（--all-jobs）")
+                logger.info("直接串流搜尋結果中的職缺URL")
+                job_urls = url_fetcher.iter_urls(category, keywords)
+
+            # 2. 並行擷取詳細資訊
+            fetcher = JobDetailFetcher()
+
+            async def fetch(job_url: str) -> Tuple[str, Optional[Dict]]:
+                return extract_job_id(job_url), await fetcher.fetch_detail_async(job_url)
+
+            metrics = get_metrics()
+            results = metrics.timed_iter(
+                get_engine().map_unordered(fetch, job_urls, MAX_WORKERS_DETAIL),
+                "fetch.job_details"
+            )
+
+            # 3. 扁平化並分批寫入
+            failed = 0
+            with BatchWriter("104_job_details", DETAIL_BATCH_SIZE) as writer:
+                for job_id, data in tqdm(results, desc="獲取職缺詳細資訊"):
+                    if data is None:
+                        failed += 1
+                        continue
+                    with metrics.span("flatten.job_details"):
+                        record = flatten_job_detail(job_id, data)
+                    writer.write(record)
+
+            logger.info(f"已處理 {writer.rows_written} 筆職缺詳細資訊，失敗 {failed} 筆")
+
+    except Exception as e:
+        logger.error(f"職缺詳細資訊分析過程中發生錯誤: {str(e)}")
+
+    logger.info("===== 職缺詳細資料分析執行完畢 =====")
@@ -0,0 +1,280 @@
+# modules/distributed.py
+
+"""分散式擷取模組：將擷取工作放入工作佇列，由多個工作者行程並行處理
+
+流程：
+1. 協調者（`--queue enqueue`）依分析模式，將搜尋頁面、技能與薪資的擷取工作
+   加入工作佇列；結果儲存中仍在有效期限內的職務不會加入
+2. 任意數量的工作者（`--queue work`）從佇列領取工作，結果寫入共用的結果儲存、
+   職缺索引與搜尋結果資料集，各工作者各自受 HTTP 引擎的並發與速率限制
+3. 協調者（`--queue merge`）等待佇列清空後，合併搜尋結果，並以一般流程輸出
+   `104_skills_*`、`104_salaries_*`；這時結果都已在結果儲存中，不會重新擷取
+
+所有行程須共用同一個 cache 與 output 目錄（同一台機器或同一個掛載磁碟區）。
+"""
+
+import os
+import socket
+import time
+
+from .common import (
+    datetime, logger, tqdm, get_engine, get_metrics,
+    Optional, Dict, List, Any, Tuple, Callable
+)
+from .category_cache import get_job_categories
+from .fetcher import (
+    JobURLFetcher, SearchQuery, load_queries,
+    fetch_single_skill_async, fetch_single_salary_async
+)
+from .processor import merge_skill_parts, superseded_skill_parts
+from .result_store import get_result_store
+from .work_queue import (
+    Task, get_work_queue, STATUS_DONE, STATUS_FAILED, STATUS_LEASED, STATUS_PENDING
+)
+from config import (
+    ALL_SALARY_TYPES,
+    MAX_CONCURRENCY,
+    SEARCH_AUTO_SPLIT,
+    SKILL_MAX_AGE,
+    SALARY_MAX_AGE,
+    WORK_QUEUE_BATCH_SIZE,
+    WORK_QUEUE_POLL_SECONDS,
+)
+
+QUEUE_SEARCH = 'search'
+QUEUE_SKILL = 'skill'
+QUEUE_SALARY = 'salary'
+
+# 每批工作的處理結果：(完成的 (鍵, 結果), 失敗的鍵)
+BatchResult = Tuple[List[Tuple[str, Any]], List[str]]
+
+def queues_for_mode(mode: str) -> List[str]:
+    """分析模式對應的工作佇列（依處理順序）"""
+    queues = []
+    if mode in ('all', 'job'):
+        queues.append(QUEUE_SEARCH)
+    if mode in ('all', 'skill'):
+        queues.append(QUEUE_SKILL)
+    if mode in ('all', 'salary'):
+        queues.append(QUEUE_SALARY)
+    return queues
+
+# ----------------------------------------------------------------------
+# 協調者：加入工作
+# ----------------------------------------------------------------------
+def _search_tasks(queries: List[SearchQuery]) -> List[Tuple[str, Dict]]:
+    """探測各搜尋的總頁數（必要時拆分），為每一頁建立一筆工作"""
+    tasks = []
+    with JobURLFetcher() as fetcher:
+        slices = fetcher.split_queries(queries) if SEARCH_AUTO_SPLIT else queries
+        for query in slices:
+            url = fetcher.build_url(query.category, query.keywords, area=query.area)
+            total_pages = fetcher.get_total_pages(url)
+            tasks.extend((f"{url}{page}", {'url': url, 'page': page,
+                                            'query': query.origin or query.name})
+                         for page in range(1, total_pages + 1))
+    return tasks
+
+def enqueue_work(mode: str, category: Optional[str] = None, keywords: Optional[str] = None,
+                 queries_file=None, category_depth: Optional[int] = None,
+                 max_age: Optional[float] = None) -> Dict[str, int]:
+    """依分析模式將擷取工作加入佇列（會先清空這些佇列中上一次的工作）
+
+    Args:
+        mode: 分析模式（all、job、skill、salary）
+        category: 搜尋與技能/薪資分析的職務類別
+        keywords: 搜尋關鍵字
+        queries_file: 批次搜尋的查詢檔，提供時取代 category/keywords 的單一搜尋
+        category_depth: 技能/薪資分析只處理到 category 以下第幾層
+        max_age: 結果儲存的有效秒數，未提供時使用 SKILL_MAX_AGE/SALARY_MAX_AGE
+
+    Returns:
+        Dict[str, int]: 各佇列加入的工作數
+
+    Raises:
+        RuntimeError: 需要職務類別表但無法取得
+    """
+    queue = get_work_queue()
+    added: Dict[str, int] = {}
+    queues = queues_for_mode(mode)
+
+    if QUEUE_SEARCH in queues:
+        queries = (load_queries(queries_file) if queries_file
+                   else [SearchQuery(f"{keywords or ''}|{category or ''}", category, keywords)])
+        queue.clear(QUEUE_SEARCH)
+        added[QUEUE_SEARCH] = queue.enqueue(QUEUE_SEARCH, _search_tasks(queries))
+
+    if QUEUE_SKILL in queues or QUEUE_SALARY in queues:
+        df_jobcat = get_job_categories(root=category, max_depth=category_depth)
+        if df_jobcat is None:
+            raise RuntimeError("無法獲取職務類別資料")
+        job_codes = df_jobcat['job_code'].astype(str).tolist()
+        store = get_result_store()
+
+        if QUEUE_SKILL in queues:
+            fresh = store.fresh_keys('skill', SKILL_MAX_AGE if max_age is None else max_age)
+            queue.clear(QUEUE_SKILL)
+            added[QUEUE_SKILL] = queue.enqueue(QUEUE_SKILL, [
+                (job_code, {'job_code': job_code})
+                for job_code in job_codes if (job_code, 0) not in fresh
+            ])
+        if QUEUE_SALARY in queues:
+            fresh = store.fresh_keys('salary', SALARY_MAX_AGE if max_age is None else max_age)
+            queue.clear(QUEUE_SALARY)
+            added[QUEUE_SALARY] = queue.enqueue(QUEUE_SALARY, [
+                (f"{job_code}:{type_id}", {'job_code': job_code, 'type_id': type_id})
+                for job_code in job_codes for type_id in ALL_SALARY_TYPES
+                if (job_code, type_id) not in fresh
+            ])
+
+    for name, count in added.items():
+        logger.info(f"已將 {count} 筆工作加入佇列 {name}")
+    return added
+
+# ----------------------------------------------------------------------
+# 工作者：領取並處理工作
+# ----------------------------------------------------------------------
+def _process_search(fetcher: JobURLFetcher, tasks: List[Task]) -> BatchResult:
+    """擷取一批搜尋頁面，寫入搜尋結果資料集與職缺索引"""
+    async def fetch(task: Task):
+        return (task, *await fetcher.fetch_page_jobs_async(task.payload['url'], task.payload['page']))
+
+    day = datetime.now().strftime("%Y-%m-%d")
+    done, failed = [], []
+    for task, page, jobs_data, fetched_at in get_engine().map_unordered(fetch, tasks, MAX_CONCURRENCY):
+        if jobs_data is None:
+            failed.append(task.key)
+            continue
+        try:
+            pairs, _ = fetcher.record_page(task.payload['url'], page, jobs_data, fetched_at, day)
+        except Exception as e:
+            logger.error(f"處理搜尋頁面 {task.key} 時發生錯誤: {str(e)}")
+            failed.append(task.key)
+            continue
+        done.append((task.key, pairs))
+    return done, failed
+
+def _process_skills(tasks: List[Task]) -> BatchResult:
+    """擷取一批職務的技能資料並寫入結果儲存；只取得一半的職務視為失敗"""
+    to_store, done, failed = [], [], []
+    keys = {task.payload['job_code']: task.key for task in tasks}
+    results = get_engine().map_unordered(fetch_single_skill_async, list(keys), MAX_CONCURRENCY)
+    for job_code, skill_json, cert_json in results:
+        record = merge_skill_parts(job_code, skill_json, cert_json)
+        if record['complete']:
+            to_store.append(((job_code, 0), record))
+            done.append((keys[job_code], None))
+        else:
+            failed.append(keys[job_code])
+    get_result_store().save_many('skill', to_store,
+                                 discard=superseded_skill_parts(jc for (jc, _), _ in to_store))
+    return done, failed
+
+def _process_salaries(tasks: List[Task]) -> BatchResult:
+    """擷取一批 (職務, 薪資類型) 的薪資資料並寫入結果儲存"""
+    to_store, done, failed = [], [], []
+    keys = {(task.payload['job_code'], task.payload['type_id']): task.key for task in tasks}
+    results = get_engine().map_unordered(lambda key: fetch_single_salary_async(*key),
+                                         list(keys), MAX_CONCURRENCY)
+    for job_code, type_id, salary_list in results:
+        if salary_list is None:
+            failed.append(keys[(job_code, type_id)])
+            continue
+        to_store.append(((job_code, type_id), salary_list))
+        done.append((keys[(job_code, type_id)], None))
+    get_result_store().save_many('salary', to_store)
+    return done, failed
+
+def run_worker(mode: str, worker_id: Optional[str] = None,
+               batch_size: int = WORK_QUEUE_BATCH_SIZE) -> Dict[str, int]:
+    """以工作者身分處理佇列中的工作，直到佇列清空
+
+    佇列中沒有可領取的工作、但仍有其他工作者處理中的工作時，每隔
+    WORK_QUEUE_POLL_SECONDS 秒重新嘗試領取，以接手租約到期（工作者中斷）的工作。
+
+    Args:
+        mode: 分析模式，決定處理哪些佇列
+        worker_id: 工作者識別名稱，未提供時為「主機名稱-PID」
+        batch_size: 每次領取的工作數
+
+    Returns:
+        Dict[str, int]: 各佇列中由本工作者完成的工作數
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = get_work_queue()
+    completed: Dict[str, int] = {}
+    logger.info(f"工作者 {worker_id} 開始處理佇列: {', '.join(queues_for_mode(mode))}")
+
+    with JobURLFetcher() as fetcher:
+        handlers: Dict[str, Callable[[List[Task]], BatchResult]] = {
+            QUEUE_SEARCH: lambda tasks: _process_search(fetcher, tasks),
+            QUEUE_SKILL: _process_skills,
+            QUEUE_SALARY: _process_salaries,
+        }
+        for name in queues_for_mode(mode):
+            completed[name] = 0
+            with tqdm(desc=f"處理佇列 {name}") as pbar:
+                while True:
+                    tasks = queue.lease(name, worker_id, batch_size)
+                    if not tasks:
+                        if queue.is_drained(name):
+                            break
+                        time.sleep(WORK_QUEUE_POLL_SECONDS)
+                        continue
+                    with get_metrics().span(f"queue.{name}"):
+                        done, failed = handlers[name](tasks)
+                    marked = queue.complete(name, worker_id, done)
+                    if failed:
+                        marked += queue.release(name, worker_id, failed)
+                    if marked < len(done) + len(failed):
+                        logger.warning(f"工作者 {worker_id} 在佇列 {name} 中有 "
+                                       f"{len(done) + len(failed) - marked} 筆工作的租約已到期並由其他工作者接手")
+                    completed[name] += len(done)
+                    pbar.update(len(tasks))
+            logger.info(f"工作者 {worker_id} 完成佇列 {name} 中的 {completed[name]} 筆工作")
+    return completed
+
+# ----------------------------------------------------------------------
+# 協調者：等待並合併
+# ----------------------------------------------------------------------
+def wait_for_queues(queues: List[str], poll_seconds: float = WORK_QUEUE_POLL_SECONDS) -> None:
+    """等待佇列中的工作全部完成或失敗"""
+    queue = get_work_queue()
+    while True:
+        counts = {name: queue.counts(name) for name in queues}
+        remaining = sum(c[STATUS_PENDING] + c[STATUS_LEASED] for c in counts.values())
+        if not remaining:
+            break
+        logger.info("等待工作者完成：" + "、".join(
+            f"{name} 剩餘 {c[STATUS_PENDING] + c[STATUS_LEASED]} 筆" for name, c in counts.items()))
+        time.sleep(poll_seconds)
+
+    for name, c in counts.items():
+        if c[STATUS_FAILED]:
+            logger.warning(f"佇列 {name} 有 {c[STATUS_FAILED]} 筆工作多次嘗試後仍失敗")
+
+def merge_search_results() -> None:
+    """合併工作者擷取的搜尋頁面
+
+    由各頁工作的結果輸出去除重複後的職缺URL清單與 `job_query_matches`，
+    並判定各搜尋範圍的下架職缺（有失敗頁面的範圍不判定）、輸出當天的異動清單。
+    搜尋結果資料集已由各工作者寫入，每個工作者各自一個檔案。
+    """
+    queue = get_work_queue()
+    day = datetime.now().strftime("%Y-%m-%d")
+    scopes: Dict[str, Tuple[str, int]] = {}  # 搜尋範圍 → (查詢名稱, 失敗頁數)
+    pairs = []
+    for _, payload, status, result in queue.iter_tasks(QUEUE_SEARCH):
+        scope = payload['url'].removesuffix("&page=")
+        name, failed_pages = scopes.get(scope, (payload['query'], 0))
+        if status != STATUS_DONE:
+            failed_pages += 1
+        scopes[scope] = (name, failed_pages)
+        pairs.extend((payload['query'], job_no, job_url) for job_no, job_url in result or ())
+
+    with JobURLFetcher() as fetcher:
+        if not fetcher.save_matches(pairs):
+            logger.error("佇列中沒有已完成的搜尋頁面")
+            return
+        fetcher.record_changes([(name, scope, failed_pages)
+                                for scope, (name, failed_pages) in scopes.items()], day)
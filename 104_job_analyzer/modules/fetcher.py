@@ -1,14 +1,27 @@
 # modules/fetcher.py
 
-"""資料擷取模組：負責從 104 人力銀行擷取資料"""
+"""資料擷取模組：負責從 104 人力銀行擷取資料
 
-from typing import Optional, Dict, List, Any, Tuple, Set
-from concurrent.futures import ThreadPoolExecutor, as_completed
+所有請求皆透過 `http_client.HttpEngine` 送出，共用連線池與全域並發上限。
+每個擷取函數同時提供非同步版本 (`*_async`) 與同步包裝。
+"""
+
+from typing import Optional, Dict, List, Any, Tuple, Set, Iterable, Iterator
+import asyncio
+import hashlib
+from dataclasses import dataclass, replace
+from functools import partial
 from pathlib import Path
 from datetime import datetime
 from .common import (
-    pd, requests, json, tqdm, logger,
-    save_to_csv, fetch_json
+    pd, json, tqdm, logger,
+    save_dataframe, get_output_path, get_metrics, coerce_numeric_columns
+)
+from .writers import ParquetSink, BackgroundWriter
+from .http_client import FetchError, get_engine
+from .checkpoint import Journal
+from .posting_index import (
+    CHANGE_NEW, CHANGE_CHANGED, CHANGE_REMOVED, get_posting_index, posting_fingerprint
 )
 from config import (
     URL_JOB_CAT,
@@ -17,58 +30,160 @@ from config import (
     URL_SALARY,
     URL_JOB_SEARCH,
     URL_JOB_DETAIL_BASE,
+    URL_JOB_PAGE,
     HEADERS,
     DEFAULT_PARAMS,
     MAX_WORKERS_JOB,
-    OUTPUT_DIR
+    OUTPUT_DIR,
+    SEARCH_RESULTS_DIR,
+    SEARCH_PAGE_LIMIT,
+    SEARCH_AUTO_SPLIT,
+    SEARCH_SPLIT_AREAS
 )
 
+# 搜尋結果中的數值欄位，寫入資料集時轉為數值型別，其餘欄位一律為字串
+SEARCH_INT_COLUMNS = ['salaryLow', 'salaryHigh', 'applyCnt']
+SEARCH_FLOAT_COLUMNS = ['lon', 'lat']
+
 def fetch_job_categories_json() -> Optional[List[Dict[str, Any]]]:
     """獲取所有職務類別的原始 JSON 資料。"""
     logger.info(f"正在從 {URL_JOB_CAT} 獲取職務類別...")
+    headers = HEADERS.copy()
+    headers['Accept'] = 'application/json'
+    engine = get_engine()
+    try:
+        return engine.run(engine.get_json(URL_JOB_CAT, headers=headers, timeout=10))
+    except FetchError as e:
+        logger.error(f"獲取職務類別失敗: {e}", extra=e.log_fields())
+        return None
+
+async def _fetch_skill_part(url: str, job_code: str, part: str) -> Optional[Dict]:
+    """獲取技能資料的其中一半；失敗時回傳 None，不影響另一半"""
     try:
-        headers = HEADERS.copy()
-        headers['Accept'] = 'application/json'
-        response = requests.get(URL_JOB_CAT, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except requests.RequestException as e:
-        logger.error(f"獲取職務類別失敗: {e}")
+        return await get_engine().get_json(url, timeout=10)
+    except FetchError as e:
+        logger.warning(f"獲取{part}失敗 for job_code={job_code}. Error: {e}",
+                       extra={'job_code': job_code, **e.log_fields()})
         return None
 
+async def _skipped() -> None:
+    """不需擷取的一半"""
+    return None
+
+async def fetch_single_skill_async(job_code: str, fetch_skill: bool = True,
+                                   fetch_cert: bool = True) -> Tuple[str, Optional[Dict], Optional[Dict]]:
+    """為單一 job_code 非同步獲取技能和證照的原始 JSON。
+
+    兩個端點同時送出請求，各自重試；其中一個失敗時另一個的結果仍會回傳。
+
+    Args:
+        job_code: 職務代碼
+        fetch_skill: 是否擷取職務技能（jobCard/job）
+        fetch_cert: 是否擷取證照與工具（jobCard/cert）
+
+    Returns:
+        Tuple[str, Optional[Dict], Optional[Dict]]: (職務代碼, 技能 JSON, 證照 JSON)，
+            失敗或未擷取的部分為 None
+    """
+    skill_json, cert_json = await asyncio.gather(
+        _fetch_skill_part(URL_JOB_CARD_SKILL.format(job_code=job_code), job_code, "技能")
+        if fetch_skill else _skipped(),
+        _fetch_skill_part(URL_JOB_CERT_SKILL.format(job_code=job_code), job_code, "證照")
+        if fetch_cert else _skipped(),
+    )
+    return job_code, skill_json, cert_json
+
 def fetch_single_skill_request(job_code: str) -> Tuple[str, Optional[Dict], Optional[Dict]]:
     """為單一 job_code 獲取技能和證照的原始 JSON。"""
-    try:
-        url_skill = URL_JOB_CARD_SKILL.format(job_code=job_code)
-        res_skill = requests.get(url_skill, timeout=10)
-        res_skill.raise_for_status()
-        
-        url_cert = URL_JOB_CERT_SKILL.format(job_code=job_code)
-        res_cert = requests.get(url_cert, timeout=10)
-        res_cert.raise_for_status()
-        
-        return job_code, res_skill.json(), res_cert.json()
-    except requests.RequestException as e:
-        logger.warning(f"獲取技能失敗 for job_code={job_code}. Error: {e}")
-        return job_code, None, None
+    return get_engine().run(fetch_single_skill_async(job_code))
 
-def fetch_single_salary_request(job_code: str, type_id: int) -> Tuple[str, int, Optional[List]]:
-    """執行單一的薪資請求操作。"""
+async def fetch_single_salary_async(job_code: str, type_id: int) -> Tuple[str, int, Optional[List]]:
+    """非同步執行單一的薪資請求操作。"""
     url = URL_SALARY.format(job_code=job_code, type_id=type_id)
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        return job_code, type_id, data.get('salaryList')
-    except requests.RequestException as e:
-        logger.warning(f"獲取薪資失敗 for job_code={job_code}, type={type_id}. Error: {e}")
+        data = await get_engine().get_json(url, timeout=10)
+    except FetchError as e:
+        logger.warning(f"獲取薪資失敗 for job_code={job_code}, type={type_id}. Error: {e}",
+                       extra={'job_code': job_code, 'type_id': type_id, **e.log_fields()})
         return job_code, type_id, None
+    if not isinstance(data, dict):
+        # null 或陣列等非物件的回應視為擷取失敗，不讓例外中斷整個擷取視窗
+        logger.warning(f"薪資回應格式不正確 for job_code={job_code}, type={type_id}",
+                       extra={'job_code': job_code, 'type_id': type_id})
+        return job_code, type_id, None
+    return job_code, type_id, data.get('salaryList')
+
+def fetch_single_salary_request(job_code: str, type_id: int) -> Tuple[str, int, Optional[List]]:
+    """執行單一的薪資請求操作。"""
+    return get_engine().run(fetch_single_salary_async(job_code, type_id))
+
+def extract_job_id(job_link: str) -> str:
+    """從職缺連結取出職缺識別碼
+
+    例如 `//www.104.com.tw/job/8pyre?jobsource=n104bank2` → `8pyre`。
+    """
+    return job_link.split('?', 1)[0].rstrip('/').rsplit('/', 1)[-1]
+
+def build_detail_url(job_link: str) -> str:
+    """由職缺連結建立詳細資訊 API 的 URL"""
+    return f"{URL_JOB_DETAIL_BASE}{extract_job_id(job_link)}"
+
+def search_results_dir(date: Optional[str] = None) -> Path:
+    """取得某一天搜尋結果資料集的目錄
+
+    Args:
+        date: 日期（YYYYMMDD），未提供時為今天
+    """
+    date = date or datetime.now().strftime("%Y%m%d")
+    return get_output_path(SEARCH_RESULTS_DIR) / f"date={date}"
+
+def load_search_results(date: Optional[str] = None) -> pd.DataFrame:
+    """一次讀取某一天所有執行的搜尋結果
+
+    Args:
+        date: 日期（YYYYMMDD），未提供時為今天
+
+    Returns:
+        pd.DataFrame: 搜尋結果，含 page 與 fetched_at 欄位；無資料時為空表
+    """
+    day_dir = search_results_dir(date)
+    if not day_dir.exists() or not any(day_dir.glob("*.parquet")):
+        return pd.DataFrame()
+    return pd.read_parquet(day_dir)
+
+def _page_frame(page: int, jobs_data: List[Dict], fetched_at: datetime) -> pd.DataFrame:
+    """將單一頁面的職缺列表轉為欄位型別固定的 DataFrame
+
+    巢狀欄位（如 link、tags）以 JSON 字串保存，使每頁的 schema 一致。
+    """
+    rows = [
+        {key: (json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list))
+               else None if value is None else str(value))
+         for key, value in job.items()}
+        for job in jobs_data
+    ]
+    df = pd.DataFrame(rows)
+    df.insert(0, 'page', page)
+    df.insert(1, 'fetched_at', pd.Timestamp(fetched_at))
+    coerce_numeric_columns(df, SEARCH_INT_COLUMNS, 'Int64')
+    return coerce_numeric_columns(df, SEARCH_FLOAT_COLUMNS, 'Float64')
+
+def _page_postings(jobs_data: List[Dict]) -> List[Tuple[str, str, str, str]]:
+    """取出單一頁面中每個職缺的 (jobNo, 職缺識別碼, 詳細資訊 URL, 內容指紋)"""
+    postings = []
+    for job in jobs_data:
+        link = (job.get('link') or {}).get('job')
+        if job.get('jobNo') and link:
+            postings.append((str(job['jobNo']), extract_job_id(link),
+                             build_detail_url(link), posting_fingerprint(job)))
+    return postings
 
-def run_job_analysis(category: Optional[str] = None, keywords: Optional[str] = None) -> None:
+def run_job_analysis(category: Optional[str] = None, keywords: Optional[str] = None,
+                     resume: bool = False) -> None:
     """執行職缺分析"""
     try:
-        fetcher = JobURLFetcher()
-        urls = fetcher.fetch_urls(category, keywords)
+        with JobURLFetcher() as fetcher:
+            urls = fetcher.fetch_urls(category, keywords, resume=resume)
         if urls:
             logger.info(f"成功獲取 {len(urls)} 個職缺URL")
         else:
@@ -76,8 +191,68 @@ def run_job_analysis(category: Optional[str] = None, keywords: Optional[str] = N
     except Exception as e:
         logger.error(f"職缺分析過程中發生錯誤: {str(e)}")
 
+@dataclass(frozen=True)
+class SearchQuery:
+    """批次搜尋中的一組搜尋條件
+
+    自動拆分產生的子查詢以 origin 記錄原始查詢的名稱。
+    """
+
+    name: str
+    category: Optional[str] = None
+    keywords: Optional[str] = None
+    area: Optional[str] = None
+    origin: Optional[str] = None
+
+def load_queries(path: Path) -> List[SearchQuery]:
+    """讀取批次搜尋的查詢檔
+
+    查詢檔為含標題列的 CSV，欄位為 keywords、category、選填的 area（皆可留空，
+    但不可同時為空）與選填的 name；未提供 name 時以「關鍵字|類別」作為查詢名稱。
+
+    Raises:
+        ValueError: 缺少欄位、條件皆為空或查詢名稱重複
+    """
+    df = pd.read_csv(path, dtype=str, skip_blank_lines=True).fillna('')
+    df.columns = [column.strip() for column in df.columns]
+    if not {'keywords', 'category'} & set(df.columns):
+        raise ValueError(f"查詢檔 {path} 至少需要 keywords 或 category 欄位")
+
+    queries: List[SearchQuery] = []
+    for row in df.to_dict('records'):
+        keywords = row.get('keywords', '').strip() or None
+        category = row.get('category', '').strip() or None
+        area = row.get('area', '').strip() or None
+        if not (keywords or category or area):
+            raise ValueError(f"查詢檔 {path} 中有搜尋條件皆為空的查詢")
+        name = row.get('name', '').strip() or f"{keywords or ''}|{category or ''}"
+        queries.append(SearchQuery(name, category, keywords, area))
+
+    names = [query.name for query in queries]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"查詢檔 {path} 中的查詢名稱重複: {', '.join(duplicates)}")
+    return queries
+
+def run_batch_analysis(query_file: Path, resume: bool = False) -> None:
+    """執行批次職缺搜尋：同一個擷取器同時執行查詢檔中的所有搜尋"""
+    try:
+        queries = load_queries(query_file)
+        logger.info(f"從 {query_file} 載入 {len(queries)} 組搜尋條件")
+        with JobURLFetcher() as fetcher:
+            matches = fetcher.fetch_batch(queries, resume=resume)
+        if not matches:
+            logger.error("無法獲取職缺列表")
+    except Exception as e:
+        logger.error(f"批次職缺搜尋過程中發生錯誤: {str(e)}")
+
 class JobURLFetcher:
-    """職缺URL擷取器：負責從104人力銀行獲取職缺URL列表"""
+    """職缺URL擷取器：負責從104人力銀行獲取職缺URL列表
+
+    每個擷取器在第一次取得頁面時於 `search_results/date=YYYYMMDD/` 下建立一個
+    Parquet 檔，之後所有頁面各寫成一個 row group，由背景執行緒負責寫入。
+    使用完畢須呼叫 close()（或以 with 陳述式使用）以完成檔案。
+    """
     
     def __init__(self):
         """初始化職缺URL擷取器"""
@@ -88,10 +263,28 @@ class JobURLFetcher:
         })
         self.output_dir = Path(OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # 總頁數探測時取得的第 1 頁回應與取得時間，以搜尋 URL 為鍵
+        self._first_pages: Dict[str, Tuple[Dict, datetime]] = {}
+        self._page_writer: Optional[BackgroundWriter] = None
+
+    def __enter__(self) -> "JobURLFetcher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """等待背景寫入完成並關閉本次執行的搜尋結果檔"""
+        if self._page_writer is not None:
+            self._page_writer.close()
+            logger.info(f"已寫入 {self._page_writer.rows_written} 筆搜尋結果"
+                        f"（{self._page_writer.batches_written} 頁）至 {self._page_writer.sink.path}")
+            self._page_writer = None
 
     def build_url(self, category: Optional[str] = None,
                 keywords: Optional[str] = None,
-                order: int = DEFAULT_PARAMS['order']) -> str:
+                order: int = DEFAULT_PARAMS['order'],
+                area: Optional[str] = None) -> str:
         """建構搜尋URL"""
         params = "ro=0"  # 必要參數
         if order:
@@ -100,76 +293,490 @@ class JobURLFetcher:
             params += f"&keyword={keywords}"
         if category:
             params += f"&jobcat={category}"
+        if area:
+            params += f"&area={area}"
         return f"{URL_JOB_SEARCH}&{params}&page="
 
     def get_total_pages(self, url: str) -> int:
-        """獲取搜尋結果的總頁數"""
+        """獲取搜尋結果的總頁數
+
+        第 1 頁的回應會暫存起來，後續擷取第 1 頁時不再重複請求。
+        """
+        return get_engine().run(self.get_total_pages_async(url))
+
+    async def get_total_pages_async(self, url: str) -> int:
+        """非同步獲取搜尋結果的總頁數（見 get_total_pages）"""
+        if url in self._first_pages:  # 已探測過，例如拆分查詢時
+            return self._first_pages[url][0]['data']['totalPage']
         try:
-            response = requests.get(url + "1", headers=self.headers, timeout=20)
-            response.raise_for_status()
-            json_data = response.json()
+            json_data = await get_engine().get_json(url + "1", headers=self.headers)
             if 'data' in json_data and 'totalPage' in json_data['data']:
+                self._first_pages[url] = (json_data, datetime.now())
                 return json_data['data']['totalPage']
             else:
                 logger.error("回應中未包含總頁數資訊")
                 return 0
-        except requests.RequestException as e:
-            logger.error(f"獲取總頁數時發生請求錯誤: {str(e)}")
-            return 0
-        except ValueError as e:
-            logger.error(f"解析總頁數時發生錯誤: {str(e)}")
+        except FetchError as e:
+            logger.error(f"獲取總頁數時發生請求錯誤: {str(e)}", extra=e.log_fields())
             return 0
 
+    async def fetch_page_jobs_async(self, url: str, page: int) -> Tuple[int, Optional[List[Dict]], datetime]:
+        """非同步獲取單一頁面的原始職缺列表
+
+        Returns:
+            Tuple[int, Optional[List[Dict]], datetime]: (頁碼, 職缺列表, 取得時間)，
+                失敗時列表為 None
+        """
+        cached = self._first_pages.pop(url, None) if page == 1 else None
+        json_data, fetched_at = cached or (None, None)
+        try:
+            if json_data is None:
+                json_data = await get_engine().get_json(url + str(page), headers=self.headers)
+                fetched_at = datetime.now()
+            return page, json_data['data']['list'], fetched_at
+        except FetchError as e:
+            logger.error(f"獲取第 {page} 頁職缺URL時發生錯誤: {str(e)}",
+                         extra={'page': page, **e.log_fields()})
+        except (KeyError, TypeError):
+            logger.error(f"第 {page} 頁回應格式不正確")
+        return page, None, datetime.now()
+
+    def _handle_page(self, page: int, jobs_data: List[Dict], fetched_at: datetime) -> Set[str]:
+        """將單一頁面排入背景寫入並回傳其中的職缺URL"""
+        if self._page_writer is None:
+            run_file = search_results_dir() / f"run_{datetime.now().strftime('%H%M%S_%f')}.parquet"
+            run_file.parent.mkdir(parents=True, exist_ok=True)
+            self._page_writer = BackgroundWriter(ParquetSink(run_file), name=SEARCH_RESULTS_DIR)
+        if jobs_data:
+            with get_metrics().span(f"normalize.{SEARCH_RESULTS_DIR}"):
+                frame = _page_frame(page, jobs_data, fetched_at)
+            self._page_writer.submit(frame)
+
+        return {build_detail_url(job['link']['job'])
+               for job in jobs_data}
+
     def fetch_page_urls(self, url: str, page: int) -> Set[str]:
         """獲取單一頁面的職缺URL"""
+        _, jobs_data, fetched_at = get_engine().run(self.fetch_page_jobs_async(url, page))
+        if jobs_data is None:
+            return set()
         try:
-            response = requests.get(url + str(page), headers=self.headers, timeout=20)
-            response.raise_for_status()
-            json_data = response.json()
-            
-            if 'data' in json_data and 'list' in json_data['data']:
-                # 儲存原始資料
-                jobs_data = json_data['data']['list']
-                today = datetime.now().strftime("%Y%m%d")
-                df = pd.DataFrame(jobs_data)
-                output_file = self.output_dir / f"jobs_page_{page}_{today}.csv"
-                df.to_csv(output_file, index=False, encoding='utf-8-sig')
-                logger.info(f"已儲存資料至 {output_file}")
-                
-                return {f"{URL_JOB_DETAIL_BASE}{job['link']['job']}"
-                       for job in jobs_data}
-            else:
-                logger.error(f"第 {page} 頁回應格式不正確")
-                return set()
-                
+            return self._handle_page(page, jobs_data, fetched_at)
         except Exception as e:
-            logger.error(f"獲取第 {page} 頁職缺URL時發生錯誤: {str(e)}")
+            logger.error(f"處理第 {page} 頁職缺資料時發生錯誤: {str(e)}")
             return set()
 
-    def fetch_urls(self, category: Optional[str] = None,
+    def iter_urls(self, category: Optional[str] = None,
                 keywords: Optional[str] = None,
-                order: int = DEFAULT_PARAMS['order']) -> Set[str]:
-        """獲取所有符合條件的職缺URL"""
+                order: int = DEFAULT_PARAMS['order'],
+                window: int = MAX_WORKERS_JOB,
+                resume: bool = False,
+                changes_only: bool = False) -> Iterator[str]:
+        """以串流方式產生所有符合條件的職缺URL
+
+        第 1 頁沿用總頁數探測的回應，其餘頁面以最多 `window` 頁同時進行的
+        滑動視窗並行擷取，先完成的頁面先產出，不必等待全部頁面完成。
+        同一次搜尋中重複的 URL 只會產出一次。搜尋達到 SEARCH_PAGE_LIMIT 頁時
+        改以 split_queries 拆分為子查詢，由 iter_batch 擷取。每頁完成時寫入檢查點紀錄，
+        `resume=True` 時會先產出上次中斷前已完成頁面的 URL，只擷取其餘頁面。
+
+        每頁的職缺同時記入職缺索引；所有頁面都成功取得時，將本次未出現的職缺
+        標記為下架，並輸出當天的異動清單 `job_changes_YYYYMMDD`。
+
+        Args:
+            category: 職務類別代碼
+            keywords: 搜尋關鍵字
+            order: 排序方式
+            window: 同時擷取的頁數上限
+            resume: 是否從上次中斷的檢查點繼續
+            changes_only: 只產出當天新增或變更的職缺URL
+
+        Yields:
+            str: 職缺詳細資訊 URL
+        """
         url = self.build_url(category, keywords, order)
         total_pages = self.get_total_pages(url)
-        
         if total_pages == 0:
+            return
+        if total_pages >= SEARCH_PAGE_LIMIT and SEARCH_AUTO_SPLIT:
+            query = SearchQuery(f"{keywords or ''}|{category or ''}", category, keywords)
+            slices = self.split_queries([query], order, window)
+            seen_jobs: Set[str] = set()
+            for _, job_no, job_url in self.iter_batch(slices, order, window, resume, changes_only):
+                if job_no not in seen_jobs:
+                    seen_jobs.add(job_no)
+                    yield job_url
+            return
+
+        journal_name = "pages_" + hashlib.md5(url.encode('utf-8')).hexdigest()[:12]
+        journal = Journal(journal_name, resume)
+        pages = [page for page in range(1, total_pages + 1)
+                 if page not in journal.entries]
+        fetch_page = partial(self.fetch_page_jobs_async, url)
+        index = get_posting_index()
+        scope = url.removesuffix("&page=")
+        day = datetime.now().strftime("%Y-%m-%d")
+        seen: Set[str] = set()
+        failed_pages = 0
+
+        try:
+            # 先產出檢查點中已完成頁面的 URL；只要異動時改為產出索引中當天的異動，
+            # 涵蓋同一天先前執行已記錄的頁面
+            if changes_only:
+                resumed = (change['url'] for change in
+                           index.iter_changes(scope, day, (CHANGE_NEW, CHANGE_CHANGED)))
+            else:
+                resumed = (job_url for page_urls in journal.entries.values()
+                           for job_url in page_urls)
+            for job_url in resumed:
+                if job_url not in seen:
+                    seen.add(job_url)
+                    yield job_url
+
+            with tqdm(total=total_pages, initial=total_pages - len(pages),
+                      desc="獲取職缺URL") as pbar:
+                results = get_metrics().timed_iter(
+                    get_engine().map_unordered(fetch_page, pages, window),
+                    f"fetch.{SEARCH_RESULTS_DIR}"
+                )
+                for page, jobs_data, fetched_at in results:
+                    pbar.update(1)
+                    if jobs_data is None:
+                        failed_pages += 1
+                        continue
+                    try:
+                        page_urls = self._handle_page(page, jobs_data, fetched_at)
+                        postings = _page_postings(jobs_data)
+                        changed = index.observe(scope, postings, day)
+                    except Exception as e:
+                        failed_pages += 1
+                        logger.error(f"處理第 {page} 頁職缺資料時發生錯誤: {str(e)}")
+                        continue
+                    journal.append(page, sorted(page_urls))
+                    if changes_only:
+                        page_urls = {job_url for job_no, _, job_url, _ in postings
+                                     if job_no in changed}
+                    for job_url in page_urls - seen:
+                        seen.add(job_url)
+                        yield job_url
+            journal.complete()
+            self._record_changes(scope, day, failed_pages)
+        finally:
+            journal.close()
+            self._first_pages.pop(url, None)
+
+    def _record_changes(self, scope: str, day: str, failed_pages: int) -> None:
+        """判定下架職缺並輸出當天的異動清單"""
+        self._save_changes(self._collect_changes(scope, day, failed_pages))
+
+    def record_changes(self, scopes: Iterable[Tuple[str, str, int]], day: str) -> None:
+        """判定多個搜尋範圍的下架職缺，合併輸出當天的異動清單（含 query 欄位）
+
+        Args:
+            scopes: (查詢名稱, 搜尋範圍, 擷取失敗的頁數) 的序列
+            day: 日期（YYYY-MM-DD）
+        """
+        changes = []
+        for name, scope, failed_pages in scopes:
+            df_changes = self._collect_changes(scope, day, failed_pages)
+            df_changes.insert(0, 'query', name)
+            changes.append(df_changes)
+        if changes:
+            self._save_changes(pd.concat(changes, ignore_index=True))
+
+    def record_page(self, url: str, page: int, jobs_data: List[Dict], fetched_at: datetime,
+                    day: str, seen: Optional[Set[str]] = None) -> Tuple[List[Tuple[str, str]], Set[str]]:
+        """將單一頁面寫入搜尋結果資料集並記入職缺索引
+
+        Args:
+            url: 不含頁碼的搜尋 URL
+            page: 頁碼
+            jobs_data: 該頁的職缺列表
+            fetched_at: 取得時間
+            day: 日期（YYYY-MM-DD）
+            seen: 已寫入過的 jobNo；提供時只寫入不在其中的職缺，並將本頁的職缺加入
+
+        Returns:
+            Tuple[List[Tuple[str, str]], Set[str]]: (本頁所有 (jobNo, 職缺URL), 當天新增或變更的 jobNo)
+        """
+        postings = _page_postings(jobs_data)
+        changed = get_posting_index().observe(url.removesuffix("&page="), postings, day)
+        if seen is not None:
+            new_jobs = {job_no for job_no, _, _, _ in postings} - seen
+            jobs_data = [job for job in jobs_data if str(job.get('jobNo')) in new_jobs]
+        self._handle_page(page, jobs_data, fetched_at)
+        if seen is not None:
+            seen.update(new_jobs)
+        return [(job_no, job_url) for job_no, _, job_url, _ in postings], changed
+
+    def _collect_changes(self, scope: str, day: str, failed_pages: int) -> pd.DataFrame:
+        """判定搜尋範圍內的下架職缺並取出當天的異動
+
+        有頁面擷取失敗時無法確定未出現的職缺是否已下架，本次不做判定。
+        """
+        index = get_posting_index()
+        if failed_pages:
+            logger.warning(f"有 {failed_pages} 頁擷取失敗，本次不判定下架職缺")
+        else:
+            index.mark_removed(scope, day)
+
+        return pd.DataFrame(index.iter_changes(scope, day),
+                            columns=['change', 'job_no', 'job_id', 'url',
+                                     'first_seen', 'last_seen'])
+
+    def _save_changes(self, df_changes: pd.DataFrame) -> None:
+        """輸出當天的異動清單 `job_changes_YYYYMMDD`"""
+        counts = df_changes['change'].value_counts()
+        logger.info(f"今日職缺異動：新增 {counts.get(CHANGE_NEW, 0)} 筆、"
+                    f"變更 {counts.get(CHANGE_CHANGED, 0)} 筆、下架 {counts.get(CHANGE_REMOVED, 0)} 筆")
+        if not df_changes.empty:
+            save_dataframe(df_changes, "job_changes")
+
+    def split_queries(self, queries: List[SearchQuery],
+                      order: int = DEFAULT_PARAMS['order'],
+                      window: int = MAX_WORKERS_JOB) -> List[SearchQuery]:
+        """將結果被截斷的搜尋遞迴拆分為子查詢
+
+        104 的搜尋最多只回傳 SEARCH_PAGE_LIMIT 頁，達到上限的搜尋依職務類別樹拆分為
+        各子類別的查詢，已無子類別時再依 SEARCH_SPLIT_AREAS 拆分為各地區，直到每個
+        子查詢都在頁數上限內。同一層的查詢並行探測總頁數，探測取得的第 1 頁保留給
+        後續擷取使用，不會重複請求。
+
+        Args:
+            queries: 搜尋條件
+            order: 排序方式
+            window: 同時探測的查詢數上限
+
+        Returns:
+            List[SearchQuery]: 不需再拆分的查詢；子查詢的 origin 為原始查詢名稱
+        """
+        from .category_cache import category_children, get_job_categories
+        from .processor import split_category_codes
+
+        engine = get_engine()
+        children: Optional[Dict[Optional[str], List[str]]] = None
+        counts: Dict[str, int] = {}
+        slices: List[SearchQuery] = []
+
+        async def probe(query: SearchQuery) -> Tuple[SearchQuery, int]:
+            url = self.build_url(query.category, query.keywords, order, query.area)
+            total_pages = await self.get_total_pages_async(url)
+            first_page = self._first_pages.get(url)
+            counts[query.name] = first_page[0]['data'].get('totalCount', 0) if first_page else 0
+            return query, total_pages
+
+        frontier = list(queries)
+        while frontier:
+            next_level: List[SearchQuery] = []
+            for query, total_pages in engine.map_unordered(probe, frontier, window):
+                if total_pages < SEARCH_PAGE_LIMIT:
+                    slices.append(query)
+                    continue
+                if children is None:
+                    df_jobcat = get_job_categories()
+                    children = category_children(df_jobcat) if df_jobcat is not None else {}
+
+                # 先依職務類別往下拆分；已是最底層類別時改依地區拆分
+                codes = split_category_codes(query.category)
+                subcategories = codes if len(codes) > 1 else children.get(codes[0] if codes else None)
+                if subcategories:
+                    parts = [replace(query, category=code) for code in subcategories]
+                elif query.area is None:
+                    parts = [replace(query, area=area) for area in SEARCH_SPLIT_AREAS]
+                else:
+                    parts = []
+                if not parts:
+                    logger.warning(f"搜尋「{query.name}」已無法再拆分，超過 {SEARCH_PAGE_LIMIT} 頁的職缺將會遺漏")
+                    slices.append(query)
+                    continue
+                # 拆分後不會再擷取原查詢，探測時保留的第 1 頁不再需要
+                self._first_pages.pop(self.build_url(query.category, query.keywords,
+                                                     order, query.area), None)
+                origin = query.origin or query.name
+                next_level.extend(
+                    replace(part, name=f"{query.name}/{part.area or part.category}", origin=origin)
+                    for part in parts
+                )
+                logger.info(f"搜尋「{query.name}」達到 {SEARCH_PAGE_LIMIT} 頁上限"
+                            f"（共 {counts[query.name]} 筆），拆分為 {len(parts)} 個子查詢")
+            frontier = next_level
+
+        # 子查詢的職缺數合計少於原始查詢時，表示有職缺不屬於任何子查詢（例如不在拆分的地區內）
+        for query in queries:
+            covered = sum(counts.get(s.name, 0) for s in slices if s.origin == query.name)
+            if covered and covered < counts.get(query.name, 0):
+                logger.warning(f"搜尋「{query.name}」拆分後的子查詢共 {covered} 筆，"
+                               f"少於原始的 {counts[query.name]} 筆")
+        return slices
+
+    def iter_batch(self, queries: List[SearchQuery],
+                   order: int = DEFAULT_PARAMS['order'],
+                   window: int = MAX_WORKERS_JOB,
+                   resume: bool = False,
+                   changes_only: bool = False) -> Iterator[Tuple[str, str, str]]:
+        """同時執行多組搜尋，並跨搜尋去除重複的職缺
+
+        先並行探測每組搜尋的總頁數，再將所有搜尋的頁面放入同一個滑動視窗擷取，
+        不同搜尋的頁面共用並發上限。每個 (搜尋, 職缺) 配對產出一次；同一職缺
+        只有第一次出現時寫入搜尋結果資料集，其後的搜尋只記錄配對。
+
+        每組搜尋各自寫入檢查點紀錄與職缺索引；全部頁面完成後，各搜尋的異動
+        合併輸出為 `job_changes_YYYYMMDD`（含 query 欄位）。
+
+        Args:
+            queries: 搜尋條件
+            order: 排序方式
+            window: 同時擷取的頁數上限（所有搜尋共用）
+            resume: 是否從上次中斷的檢查點繼續
+            changes_only: 只產出當天新增或變更的職缺
+
+        Yields:
+            Tuple[str, str, str]: (查詢名稱, jobNo, 職缺詳細資訊 URL)
+        """
+        engine = get_engine()
+
+        async def probe(query: SearchQuery) -> Tuple[SearchQuery, str, int]:
+            url = self.build_url(query.category, query.keywords, order, query.area)
+            return query, url, await self.get_total_pages_async(url)
+
+        probed = {query.name: (url, total) for query, url, total
+                  in engine.map_unordered(probe, queries, window)}
+
+        index = get_posting_index()
+        day = datetime.now().strftime("%Y-%m-%d")
+        journals: Dict[str, Journal] = {}
+        failed_pages: Dict[str, int] = {}
+        pending: List[Tuple[SearchQuery, str, int]] = []
+        seen: Set[str] = set()
+
+        try:
+            for query in queries:
+                url, total_pages = probed[query.name]
+                if total_pages == 0:
+                    logger.warning(f"搜尋「{query.name}」沒有結果或無法取得總頁數")
+                    continue
+                journal = Journal("batch_" + hashlib.md5(url.encode('utf-8')).hexdigest()[:12], resume)
+                journals[query.name] = journal
+                failed_pages[query.name] = 0
+                pending.extend((query, url, page) for page in range(1, total_pages + 1)
+                               if page not in journal.entries)
+                # 先產出檢查點中已完成頁面的配對；只要異動時改為產出索引中當天的異動
+                if changes_only:
+                    resumed = ((change['job_no'], change['url']) for change in index.iter_changes(
+                        url.removesuffix("&page="), day, (CHANGE_NEW, CHANGE_CHANGED)))
+                else:
+                    resumed = (pair for pairs in journal.entries.values() for pair in pairs)
+                for job_no, job_url in resumed:
+                    seen.add(job_no)
+                    yield query.name, job_no, job_url
+
+            async def fetch(item: Tuple[SearchQuery, str, int]):
+                query, url, page = item
+                return (query, url, *await self.fetch_page_jobs_async(url, page))
+
+            total = sum(total for _, total in probed.values())
+            with tqdm(total=total, initial=total - len(pending), desc="批次獲取職缺URL") as pbar:
+                results = get_metrics().timed_iter(
+                    engine.map_unordered(fetch, pending, window),
+                    f"fetch.{SEARCH_RESULTS_DIR}"
+                )
+                for query, url, page, jobs_data, fetched_at in results:
+                    pbar.update(1)
+                    if jobs_data is None:
+                        failed_pages[query.name] += 1
+                        continue
+                    try:
+                        pairs, changed = self.record_page(url, page, jobs_data, fetched_at, day, seen)
+                    except Exception as e:
+                        failed_pages[query.name] += 1
+                        logger.error(f"處理「{query.name}」第 {page} 頁職缺資料時發生錯誤: {str(e)}")
+                        continue
+                    journals[query.name].append(page, pairs)
+                    if changes_only:
+                        pairs = [(job_no, job_url) for job_no, job_url in pairs if job_no in changed]
+                    for job_no, job_url in pairs:
+                        yield query.name, job_no, job_url
+
+            for journal in journals.values():
+                journal.complete()
+            self.record_changes([(query.name, probed[query.name][0].removesuffix("&page="),
+                                  failed_pages[query.name])
+                                 for query in queries if query.name in journals], day)
+        finally:
+            for journal in journals.values():
+                journal.close()
+            for url, _ in probed.values():
+                self._first_pages.pop(url, None)
+
+    def fetch_batch(self, queries: List[SearchQuery],
+                    order: int = DEFAULT_PARAMS['order'],
+                    resume: bool = False) -> Dict[str, List[str]]:
+        """執行批次搜尋，輸出去除重複後的職缺URL清單與各職缺符合的搜尋
+
+        結果被截斷的搜尋先以 split_queries 拆分，子查詢的結果歸於原始搜尋。
+        `all_job_urls_YYYYMMDD.csv` 中每個職缺只出現一次，
+        `job_query_matches_YYYYMMDD` 記錄每個職缺符合哪些搜尋。
+
+        Returns:
+            Dict[str, List[str]]: jobNo → 符合的查詢名稱（依出現順序）
+        """
+        slices = self.split_queries(queries, order) if SEARCH_AUTO_SPLIT else queries
+        if len(slices) != len(queries):
+            logger.info(f"{len(queries)} 組搜尋拆分為 {len(slices)} 個子查詢")
+        origins = {query.name: query.origin or query.name for query in slices}
+        return self.save_matches((origins[name], job_no, job_url) for name, job_no, job_url
+                                 in self.iter_batch(slices, order, resume=resume))
+
+    def save_matches(self, pairs: Iterable[Tuple[str, str, str]]) -> Dict[str, List[str]]:
+        """合併 (查詢名稱, jobNo, 職缺URL) 配對並輸出
+
+        輸出去除重複後的 `all_job_urls_YYYYMMDD.csv`，以及記錄每個職缺符合
+        哪些搜尋的 `job_query_matches_YYYYMMDD`。
+
+        Returns:
+            Dict[str, List[str]]: jobNo → 符合的查詢名稱（依出現順序）；沒有配對時為空
+        """
+        matches: Dict[str, List[str]] = {}
+        urls: Dict[str, str] = {}
+        total = 0
+        for name, job_no, job_url in pairs:
+            total += 1
+            urls.setdefault(job_no, job_url)
+            names = matches.setdefault(job_no, [])
+            if name not in names:
+                names.append(name)
+        if not matches:
+            return {}
+
+        logger.info(f"搜尋共 {total} 筆結果，去除重複後為 {len(matches)} 個職缺")
+        self._save_url_list(set(urls.values()))
+        save_dataframe(pd.DataFrame({
+            'job_no': list(matches),
+            'url': [urls[job_no] for job_no in matches],
+            'query_count': [len(names) for names in matches.values()],
+            'queries': ['|'.join(names) for names in matches.values()],
+        }), "job_query_matches")
+        return matches
+
+    def fetch_urls(self, category: Optional[str] = None,
+                keywords: Optional[str] = None,
+                order: int = DEFAULT_PARAMS['order'],
+                resume: bool = False) -> Set[str]:
+        """獲取所有符合條件的職缺URL"""
+        job_url_set = set(self.iter_urls(category, keywords, order, resume=resume))
+        if not job_url_set:
             return set()
-            
-        job_url_set = set()
-        for page in tqdm(range(1, total_pages + 1),
-                       desc="獲取職缺URL"):
-            urls = self.fetch_page_urls(url, page)
-            job_url_set.update(urls)
-        
-        # 儲存所有URL
+
+        self._save_url_list(job_url_set)
+        return job_url_set
+
+    def _save_url_list(self, job_urls: Set[str]) -> None:
+        """儲存今日的職缺URL清單 `all_job_urls_YYYYMMDD.csv`"""
         today = datetime.now().strftime("%Y%m%d")
-        df = pd.DataFrame({"url": list(job_url_set)})
+        df = pd.DataFrame({"url": list(job_urls)})
         output_file = self.output_dir / f"all_job_urls_{today}.csv"
         df.to_csv(output_file, index=False, encoding='utf-8-sig')
         logger.info(f"已儲存所有職缺URL至 {output_file}")
-        
-        return job_url_set
 
 class JobDetailFetcher:
     """職缺詳細資訊擷取器"""
@@ -178,11 +785,22 @@ class JobDetailFetcher:
         """初始化職缺詳細資訊擷取器"""
         self.headers = HEADERS.copy()
         
+    async def fetch_detail_async(self, job_url: str) -> Optional[Dict]:
+        """非同步獲取職缺詳細資訊
+
+        詳細資訊 API 需要以職缺頁面作為 Referer 才會回應資料。
+        """
+        headers = self.headers.copy()
+        headers['Referer'] = URL_JOB_PAGE.format(job_id=extract_job_id(job_url))
+        try:
+            json_data = await get_engine().get_json(job_url, headers=headers)
+            return json_data['data']
+        except (FetchError, KeyError, TypeError) as e:
+            fields = e.log_fields() if isinstance(e, FetchError) else {}
+            logger.error(f"獲取職缺詳細資訊時發生錯誤: {str(e)}",
+                         extra={'job_url': job_url, **fields})
+            return None
+
     def fetch_detail(self, job_url: str) -> Optional[Dict]:
         """獲取職缺詳細資訊"""
-        try:
-            response = requests.get(job_url, headers=self.headers, timeout=20)
-            return response.json()['data']
-        except Exception as e:
-            logger.error(f"獲取職缺詳細資訊時發生錯誤: {str(e)}")
-            return None
\ No newline at end of file
+        return get_engine().run(self.fetch_detail_async(job_url))
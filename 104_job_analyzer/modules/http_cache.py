@@ -0,0 +1,277 @@
+# modules/http_cache.py
+
+"""HTTP 回應快取模組：將 GET 回應壓縮保存於 SQLite，重複執行時不必重新下載
+
+- 快取鍵為 URL 加上 HTTP_CACHE_VARY_HEADERS 中的請求標頭
+- 遵守 Cache-Control（no-store 不保存、no-cache 每次重新驗證、max-age 決定有效期限）
+  與 Expires；伺服器都未提供時不視為有效，每次都重新驗證
+- 過期的項目以 If-None-Match / If-Modified-Since 重新驗證，304 時沿用快取內容；
+  沒有有效期限也沒有 ETag/Last-Modified 的回應無法再利用，不保存
+- 查詢時的最近使用時間先記在記憶體，於下一次寫入時一併更新，不在每次查詢時提交交易
+- 內容以 zlib 壓縮，總大小超過 HTTP_CACHE_MAX_BYTES 時依最近使用時間淘汰（LRU）
+
+HTTP 引擎在每次請求前後呼叫 lookup()/store()/refresh()；呼叫端自行帶有
+條件式請求標頭時（例如職務類別快取）不經過此快取。
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from multidict import CIMultiDict
+
+from config import (
+    CACHE_DIR,
+    HTTP_CACHE_FILE,
+    HTTP_CACHE_MAX_BYTES,
+    HTTP_CACHE_VARY_HEADERS,
+    SQLITE_BUSY_TIMEOUT,
+)
+from .logger_setup import logger
+
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+# 累積多少筆未寫入的最近使用時間時，即使沒有其他寫入也先寫入資料庫
+ACCESS_FLUSH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key          TEXT    PRIMARY KEY,
+    url          TEXT    NOT NULL,
+    status       INTEGER NOT NULL,
+    headers      TEXT    NOT NULL,
+    body         BLOB    NOT NULL,
+    size         INTEGER NOT NULL,
+    stored_at    REAL    NOT NULL,
+    expires_at   REAL    NOT NULL,
+    last_access  REAL    NOT NULL
+)
+"""
+
+
+def cache_key(url: str, headers: Optional[Mapping[str, str]]) -> str:
+    """由 URL 與會影響回應內容的請求標頭計算快取鍵"""
+    request_headers = CIMultiDict(headers or {})
+    vary = [f"{name.lower()}={request_headers.get(name, '')}" for name in HTTP_CACHE_VARY_HEADERS]
+    return hashlib.sha1('\n'.join([url, *vary]).encode('utf-8')).hexdigest()
+
+
+def is_cacheable_request(headers: Optional[Mapping[str, str]]) -> bool:
+    """呼叫端已自行處理條件式請求時不經過快取"""
+    request_headers = CIMultiDict(headers or {})
+    return not any(name in request_headers for name in CONDITIONAL_HEADERS)
+
+
+def freshness_lifetime(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """依回應標頭計算有效秒數
+
+    Returns:
+        Optional[float]: 有效秒數（0 表示每次都要重新驗證）；不可保存時回傳 None
+    """
+    directives: Dict[str, Optional[str]] = {}
+    for part in headers.get('Cache-Control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+    for name in ('s-maxage', 'max-age'):
+        if directives.get(name) is not None:
+            try:
+                age = float(headers.get('Age', 0) or 0)
+                return max(float(directives[name]) - age, 0.0)
+            except ValueError:
+                return 0.0
+    if headers.get('Expires'):
+        try:
+            return max(parsedate_to_datetime(headers['Expires']).timestamp() - now, 0.0)
+        except (TypeError, ValueError):
+            return 0.0  # 無法解析的 Expires 視為已過期
+    # 沒有明確的有效期限時不自行假設（搜尋結果頁隨時會變動），一律以 ETag/Last-Modified 重新驗證
+    return 0.0
+
+
+@dataclass
+class CachedResponse:
+    """快取中的一筆回應"""
+
+    key: str
+    status: int
+    headers: CIMultiDict
+    body: bytes
+    expires_at: float
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """是否仍在有效期限內"""
+        return (now or time.time()) < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """重新驗證用的條件式請求標頭"""
+        validators = {}
+        if self.headers.get('ETag'):
+            validators['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = self.headers['Last-Modified']
+        return validators
+
+
+class HttpCache:
+    """以 SQLite 保存的 HTTP 回應快取（執行緒安全）"""
+
+    def __init__(self, db_path: Path, max_bytes: int = HTTP_CACHE_MAX_BYTES):
+        """開啟（或建立）快取資料庫
+
+        Args:
+            db_path: SQLite 檔案路徑
+            max_bytes: 壓縮後內容的總大小上限
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        # True 時所有項目一律視為過期（仍以條件式請求重新驗證）
+        self.revalidate_all = False
+        self._lock = threading.Lock()
+        # 尚未寫入資料庫的最近使用時間：快取鍵 → 時間
+        self._accessed: Dict[str, float] = {}
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False,
+                                     timeout=SQLITE_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def lookup(self, url: str, headers: Optional[Mapping[str, str]]) -> Optional[CachedResponse]:
+        """查詢快取並記錄最近使用時間（於下一次寫入時一併寫入資料庫）"""
+        key = cache_key(url, headers)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_FLUSH_SIZE:
+                self._flush_access()
+                self._conn.commit()
+        status, header_text, body, expires_at = row
+        if self.revalidate_all:
+            expires_at = 0.0
+        return CachedResponse(key, status, CIMultiDict(json.loads(header_text)),
+                              zlib.decompress(body), expires_at)
+
+    def store(self, url: str, request_headers: Optional[Mapping[str, str]], status: int,
+              headers: Mapping[str, str], body: bytes) -> bool:
+        """保存一筆回應
+
+        Returns:
+            bool: 是否已保存（Cache-Control: no-store，或沒有有效期限也無法重新驗證時不保存）
+        """
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now)
+        if lifetime is None:
+            return False
+        if lifetime == 0 and not any(headers.get(name) for name in VALIDATOR_HEADERS):
+            # 每次都要重新驗證卻沒有驗證依據，保存後也只會再完整下載一次
+            return False
+        compressed = zlib.compress(body)
+        header_text = json.dumps(list(headers.items()), ensure_ascii=False)
+        key = cache_key(url, request_headers)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, status, headers, body, size, stored_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, header_text, compressed, len(compressed),
+                 now, now + lifetime, now)
+            )
+            self._total += len(compressed) - (previous[0] if previous else 0)
+            self._accessed.pop(key, None)
+            self._flush_access()
+            if self._total > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+        return True
+
+    def refresh(self, entry: CachedResponse, headers: Mapping[str, str]) -> None:
+        """重新驗證成功（304）時，依新的回應標頭延長有效期限"""
+        now = time.time()
+        merged = CIMultiDict(entry.headers)
+        for name in ('Cache-Control', 'Expires', 'ETag', 'Last-Modified', 'Date', 'Age'):
+            if name in headers:
+                merged[name] = headers[name]
+        lifetime = freshness_lifetime(merged, now)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET headers = ?, expires_at = ?, last_access = ? WHERE key = ?",
+                (json.dumps(list(merged.items()), ensure_ascii=False),
+                 now + (lifetime or 0.0), now, entry.key)
+            )
+            self._accessed.pop(entry.key, None)
+            self._flush_access()
+            self._conn.commit()
+        entry.headers = merged
+
+    def _flush_access(self) -> None:
+        """將累積的最近使用時間寫入資料庫（呼叫端需持有鎖並負責提交）"""
+        if self._accessed:
+            self._conn.executemany("UPDATE responses SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        """依最近使用時間刪除項目，直到總大小降到上限的 90%（呼叫端需持有鎖）"""
+        target = self.max_bytes * 0.9
+        removed: List[Tuple[str]] = []
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access")
+        for key, size in cursor:
+            if self._total <= target:
+                break
+            removed.append((key,))
+            self._total -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", removed)
+        logger.debug(f"HTTP 快取已淘汰 {len(removed)} 筆回應")
+
+    def clear(self) -> None:
+        """清空快取"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._accessed.clear()
+            self._total = 0
+
+    def close(self) -> None:
+        """寫入累積的最近使用時間並關閉資料庫連線"""
+        with self._lock:
+            self._flush_access()
+            self._conn.commit()
+            self._conn.close()
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HttpCache:
+    """取得整個行程共用的 HTTP 回應快取"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(Path(CACHE_DIR) / HTTP_CACHE_FILE)
+            logger.debug(f"HTTP 快取已開啟: {_cache.db_path}")
+        return _cache
@@ -0,0 +1,440 @@
+# modules/http_client.py
+
+"""非同步 HTTP 引擎：負責所有對 104 人力銀行的網路請求
+
+設計重點：
+1. 以 aiohttp 為每個主機維持 keep-alive 連線池，避免每次請求重新進行 TCP/TLS 握手
+2. 整個行程共用一個 Semaphore，限制同時進行中的請求數量 (MAX_CONCURRENCY)
+3. 事件迴圈常駐於背景執行緒，同步程式碼可透過 submit()/run() 使用非同步請求
+4. 每個主機各有一個自適應速率限制器；連線錯誤、429 與 5xx 會以退避方式重試
+5. 每次請求的 DNS/連線/TTFB/下載耗時、狀態碼與位元組數記錄於 metrics 模組
+6. 成功的回應保存於 HTTP 快取（http_cache 模組）；仍有效的回應不經網路直接回傳，
+   過期的回應以條件式請求重新驗證
+"""
+
+import asyncio
+import atexit
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from itertools import islice
+from urllib.parse import urlsplit
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Mapping, Optional, TypeVar
+
+import aiohttp
+
+from config import (
+    HTTP_CACHE_ENABLED,
+    HTTP_TIMEOUT,
+    KEEPALIVE_TIMEOUT,
+    MAX_CONCURRENCY,
+    MAX_CONNECTIONS_PER_HOST,
+    MAX_RETRIES,
+    RETRY_BACKOFF_MAX,
+    RETRY_STATUS_CODES,
+)
+from .http_cache import CachedResponse, HttpCache, get_http_cache, is_cacheable_request
+from .logger_setup import logger
+from .metrics import endpoint_name, get_metrics
+from .rate_limit import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+T = TypeVar("T")
+
+
+class FetchError(Exception):
+    """HTTP 請求失敗：連線錯誤、逾時、非 2xx 狀態碼或無法解析的回應"""
+
+    def __init__(self, url: str, message: str,
+                 status: Optional[int] = None,
+                 headers: Optional[Mapping[str, str]] = None):
+        super().__init__(f"{message} ({url})")
+        self.url = url
+        self.status = status
+        self.headers = headers or {}
+        self.elapsed: Optional[float] = None  # 含重試的總耗時秒數，由 HttpEngine.request 設定
+
+    def log_fields(self) -> Dict[str, Any]:
+        """結構化日誌欄位（endpoint、status、latency），供 logger 的 extra 參數使用"""
+        return {
+            'endpoint': endpoint_name(self.url),
+            'status': self.status,
+            'latency': None if self.elapsed is None else round(self.elapsed, 3),
+        }
+
+
+@dataclass
+class HttpResponse:
+    """單一 HTTP 回應"""
+
+    url: str
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    elapsed: float
+
+    def json(self) -> Any:
+        """將回應內容解析為 JSON"""
+        return json.loads(self.body)
+
+
+def _timing_trace_config() -> aiohttp.TraceConfig:
+    """建立記錄 DNS 解析與建立連線時間的 TraceConfig
+
+    各回呼將時間點寫入請求時傳入的 `trace_request_ctx`（dict）。
+    """
+    trace_config = aiohttp.TraceConfig()
+
+    def mark(key: str):
+        async def callback(session, context, params) -> None:
+            if context.trace_request_ctx is not None:
+                context.trace_request_ctx[key] = time.perf_counter()
+        return callback
+
+    trace_config.on_dns_resolvehost_start.append(mark('dns_start'))
+    trace_config.on_dns_resolvehost_end.append(mark('dns_end'))
+    trace_config.on_connection_create_start.append(mark('connect_start'))
+    trace_config.on_connection_create_end.append(mark('connect_end'))
+    return trace_config
+
+
+def _stage_timings(marks: Dict[str, float], start: float,
+                   headers_at: Optional[float], end: float) -> Dict[str, float]:
+    """由時間點計算各階段耗時；建立連線的時間不含 DNS 解析"""
+    timings = {'total': end - start}
+    dns = marks.get('dns_end', 0.0) - marks.get('dns_start', 0.0)
+    if 'dns_end' in marks:
+        timings['dns'] = dns
+    if 'connect_end' in marks:
+        timings['connect'] = max(marks['connect_end'] - marks['connect_start'] - dns, 0.0)
+    if headers_at is not None:
+        timings['ttfb'] = headers_at - start
+        timings['download'] = end - headers_at
+    return timings
+
+
+class HttpEngine:
+    """非同步 HTTP 引擎：連線池 + 全域並發上限 + 同步介面"""
+
+    def __init__(self,
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 limit_per_host: int = MAX_CONNECTIONS_PER_HOST,
+                 keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+                 timeout: float = HTTP_TIMEOUT,
+                 max_retries: int = MAX_RETRIES,
+                 cache: Optional[HttpCache] = None):
+        """初始化 HTTP 引擎
+
+        Args:
+            max_concurrency: 整個行程同時進行中的請求上限
+            limit_per_host: 每個主機的連線池大小
+            keepalive_timeout: 閒置連線保留秒數
+            timeout: 預設請求逾時秒數
+            max_retries: 可重試錯誤的最大重試次數
+            cache: HTTP 回應快取，None 表示不使用快取
+        """
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        self.limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    # ------------------------------------------------------------------
+    # 生命週期
+    # ------------------------------------------------------------------
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        """啟動背景事件迴圈（僅第一次呼叫時執行）"""
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="http-engine",
+                    daemon=True
+                )
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+                self._loop = loop
+                self._thread = thread
+            return self._loop
+
+    async def _open(self) -> None:
+        """在事件迴圈內建立連線池與 Semaphore"""
+        connector = aiohttp.TCPConnector(
+            limit=0,  # 總量由 Semaphore 控制
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[_timing_trace_config()]
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def close(self) -> None:
+        """關閉連線池並停止背景事件迴圈"""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result()
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            self._session = None
+            self._semaphore = None
+
+    # ------------------------------------------------------------------
+    # 非同步介面
+    # ------------------------------------------------------------------
+    def _limiter(self, url: str) -> AdaptiveRateLimiter:
+        """取得該主機的速率限制器"""
+        host = urlsplit(url).netloc
+        if host not in self.limiters:
+            self.limiters[host] = AdaptiveRateLimiter(host)
+        return self.limiters[host]
+
+    async def _send(self, url: str, headers: Optional[Dict[str, str]],
+                    timeout: aiohttp.ClientTimeout) -> HttpResponse:
+        """在並發上限內送出單次 GET 請求（不重試、不檢查狀態碼）"""
+        metrics = get_metrics()
+        endpoint = endpoint_name(url)
+        async with self._semaphore:
+            marks: Dict[str, float] = {}
+            headers_at = None
+            status = None  # 請求完成前維持 None，連線錯誤、逾時或取消時記為錯誤
+            body = b''
+            metrics.request_started(endpoint)
+            start = time.perf_counter()
+            try:
+                async with self._session.get(url, headers=headers, timeout=timeout,
+                                             trace_request_ctx=marks) as resp:
+                    headers_at = time.perf_counter()
+                    body = await resp.read()
+                    resp_headers = resp.headers.copy()  # 不分大小寫的 CIMultiDict
+                    status = resp.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise FetchError(url, str(e) or type(e).__name__) from e
+            finally:
+                end = time.perf_counter()
+                metrics.request_finished(
+                    endpoint, status, _stage_timings(marks, start, headers_at, end), len(body)
+                )
+        return HttpResponse(url, status, resp_headers, body, end - start)
+
+    async def request(self, url: str,
+                      headers: Optional[Dict[str, str]] = None,
+                      timeout: Optional[float] = None) -> HttpResponse:
+        """送出 GET 請求
+
+        有快取且仍在有效期限內時直接回傳快取內容，不經過速率限制器與網路；
+        快取已過期時附上 If-None-Match/If-Modified-Since，收到 304 時沿用快取內容。
+
+        請求前先向該主機的速率限制器取得 token。連線錯誤、逾時與
+        RETRY_STATUS_CODES 中的狀態碼會以指數退避（含隨機抖動）重試，
+        伺服器提供 Retry-After 時以其為準。
+
+        Args:
+            url: 請求網址
+            headers: HTTP 請求標頭
+            timeout: 逾時秒數，未提供時使用引擎預設值
+
+        Returns:
+            HttpResponse: 回應內容
+
+        Raises:
+            FetchError: 重試後仍失敗，或狀態碼為不可重試的 4xx
+        """
+        cache = self.cache if self.cache is not None and is_cacheable_request(headers) else None
+        cached = None
+        send_headers = headers
+        if cache is not None:
+            cached = await asyncio.to_thread(cache.lookup, url, headers)
+            if cached is not None:
+                if cached.is_fresh():
+                    get_metrics().record_cache(endpoint_name(url), 'hit')
+                    return HttpResponse(url, cached.status, cached.headers, cached.body, 0.0)
+                send_headers = {**(headers or {}), **cached.validators()}
+
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        limiter = self._limiter(url)
+        started = time.perf_counter()
+
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            retry_after = None
+            try:
+                response = await self._send(url, send_headers, client_timeout)
+            except FetchError as e:
+                error = e
+            else:
+                status = response.status
+                if status < 400:
+                    limiter.on_success(response.elapsed)
+                    if cache is not None:
+                        response = await self._update_cache(cache, cached, headers, response)
+                    return response
+                error = FetchError(url, f"HTTP {status}", status, response.headers)
+                if status not in RETRY_STATUS_CODES:
+                    error.elapsed = time.perf_counter() - started
+                    raise error
+                if status in (429, 503):
+                    retry_after = parse_retry_after(response.headers)
+                    limiter.on_throttle(retry_after)
+
+            if attempt == self.max_retries:
+                error.elapsed = time.perf_counter() - started
+                raise error
+            get_metrics().record_retry(endpoint_name(url))
+            delay = (min(retry_after, RETRY_BACKOFF_MAX) if retry_after is not None
+                     else backoff_delay(attempt))
+            logger.debug(f"第 {attempt + 1} 次重試前等待 {delay:.2f}s: {error}",
+                         extra={**error.log_fields(), 'attempt': attempt + 1, 'delay': round(delay, 3)})
+            await asyncio.sleep(delay)
+
+    async def _update_cache(self, cache: HttpCache, cached: Optional[CachedResponse],
+                            headers: Optional[Dict[str, str]],
+                            response: HttpResponse) -> HttpResponse:
+        """依網路回應更新快取；304 時回傳快取中的內容"""
+        endpoint = endpoint_name(response.url)
+        if response.status == 304 and cached is not None:
+            await asyncio.to_thread(cache.refresh, cached, response.headers)
+            get_metrics().record_cache(endpoint, 'revalidated')
+            return HttpResponse(response.url, cached.status, cached.headers, cached.body,
+                                response.elapsed)
+        if response.status == 200:
+            await asyncio.to_thread(cache.store, response.url, headers, response.status,
+                                    response.headers, response.body)
+        get_metrics().record_cache(endpoint, 'miss')
+        return response
+
+    async def get_json(self, url: str,
+                       headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[float] = None) -> Any:
+        """送出 GET 請求並將回應解析為 JSON
+
+        Raises:
+            FetchError: 請求失敗或回應不是合法 JSON
+        """
+        response = await self.request(url, headers=headers, timeout=timeout)
+        try:
+            return response.json()
+        except ValueError as e:
+            raise FetchError(url, f"JSON 解析失敗: {e}", response.status) from e
+
+    # ------------------------------------------------------------------
+    # 同步介面
+    # ------------------------------------------------------------------
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """將協程排入背景事件迴圈，回傳 concurrent.futures.Future
+
+        可搭配 concurrent.futures.as_completed 使用。
+        """
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """同步執行協程並等待結果"""
+        return self.submit(coro).result()
+
+    def map_unordered(self, func: Callable[[Any], Awaitable[T]],
+                      items: Iterable[Any], window: int) -> Iterator[T]:
+        """以有界視窗並行執行 func(item)，依完成順序產出結果
+
+        輸入可以是任意長度的迭代器，同時最多只有 `window` 個協程存在，
+        因此記憶體用量與輸入數量無關。產生器提前關閉時會取消尚未完成的請求。
+
+        Args:
+            func: 接收單一項目並回傳協程的函數
+            items: 輸入項目
+            window: 同時進行中的協程上限
+
+        Yields:
+            T: 各協程的結果（依完成順序）
+        """
+        items = iter(items)
+        pending = {self.submit(func(item)) for item in islice(items, max(window, 1))}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                # 先補滿視窗，讓後續請求在呼叫端處理結果時持續進行
+                for item in islice(items, len(done)):
+                    pending.add(self.submit(func(item)))
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+    def map_ordered(self, func: Callable[[Any], Awaitable[T]],
+                    items: Iterable[Any], window: int) -> Iterator[T]:
+        """以有界視窗並行執行 func(item)，依輸入順序產出結果
+
+        先完成的結果留在重排緩衝區，等前面的項目完成後才產出。已送出但尚未產出的
+        協程最多 `window` 個，緩衝區大小因此有上限；`window` 大於並發上限時，
+        少數重試中的請求不會讓其餘請求停擺。產生器提前關閉時會取消尚未完成的請求。
+
+        Args:
+            func: 接收單一項目並回傳協程的函數
+            items: 輸入項目
+            window: 已送出但尚未產出的協程上限
+
+        Yields:
+            T: 各協程的結果（依輸入順序）
+        """
+        items = iter(items)
+        pending = deque(self.submit(func(item)) for item in islice(items, max(window, 1)))
+        try:
+            while pending:
+                result = pending[0].result()
+                pending.popleft()
+                for item in islice(items, 1):
+                    pending.append(self.submit(func(item)))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+_engine: Optional[HttpEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> HttpEngine:
+    """取得整個行程共用的 HTTP 引擎"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = HttpEngine(cache=get_http_cache() if HTTP_CACHE_ENABLED else None)
+            logger.debug(
+                f"HTTP 引擎已建立 (max_concurrency={_engine.max_concurrency}, "
+                f"limit_per_host={_engine.limit_per_host})"
+            )
+        return _engine
+
+
+def close_engine() -> None:
+    """關閉共用的 HTTP 引擎"""
+    global _engine
+    with _engine_lock:
+        engine, _engine = _engine, None
+    if engine is not None:
+        engine.close()
+
+
+atexit.register(close_engine)
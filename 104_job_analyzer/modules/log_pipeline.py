@@ -0,0 +1,204 @@
+# modules/log_pipeline.py
+
+"""非同步日誌管線：佇列、背景寫出、JSON lines、輪替與重複警告省略
+
+記錄日誌的執行緒只把紀錄放入佇列，由背景執行緒（QueueListener）寫出，
+擷取工作不會因為終端或磁碟寫入而被阻塞：
+- 終端輸出 INFO 以上的文字格式；日誌檔記錄 DEBUG 以上的 JSON lines，
+  每筆含時間、等級、訊息、執行緒、執行識別碼，以及呼叫端以 `extra` 提供的欄位
+  （例如 job_code、endpoint、status、latency）
+- 日誌檔以附加方式寫入，超過 LOG_MAX_BYTES 或日期改變時輪替，保留 LOG_BACKUP_COUNT 個舊檔
+- 同一位置的警告在 LOG_DEDUP_WINDOW 秒內最多記錄 LOG_DEDUP_BURST 筆，其餘省略並於之後彙總；
+  ERROR 以上的紀錄內容各不相同（例如不同的例外），一律記錄
+- 佇列滿時捨棄新紀錄，捨棄與省略的筆數在停止管線時記錄
+
+由 logger_setup 在日誌實例第一次記錄時建立，不在啟動時匯入。
+"""
+
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import (
+    LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ROTATE_DAILY, LOG_QUEUE_SIZE,
+    LOG_DEDUP_WINDOW, LOG_DEDUP_BURST
+)
+
+# 本次執行的識別碼，區分同一個日誌檔中不同執行（或不同工作者行程）的紀錄
+RUN_ID = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+# LogRecord 的標準屬性；其餘屬性即為呼叫端以 extra 提供的結構化欄位
+_RECORD_ATTRS = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime'}
+
+TEXT_FORMAT = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+class JsonFormatter(logging.Formatter):
+    """將紀錄格式化為一行 JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+            'run': RUN_ID,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RotatingLogFileHandler(logging.handlers.RotatingFileHandler):
+    """依大小或日期輪替的日誌檔；第一筆紀錄寫入時才建立目錄並開啟檔案"""
+
+    def __init__(self, filename: Path, max_bytes: int = LOG_MAX_BYTES,
+                 backup_count: int = LOG_BACKUP_COUNT, daily: bool = LOG_ROTATE_DAILY):
+        super().__init__(filename, mode='a', maxBytes=max_bytes, backupCount=backup_count,
+                         encoding='utf-8', delay=True)
+        self.daily = daily
+        self._day: Optional[date] = None  # 目前日誌檔內容的日期
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.daily:
+            day = date.fromtimestamp(record.created)
+            if self._day is None:
+                path = Path(self.baseFilename)
+                self._day = date.fromtimestamp(path.stat().st_mtime) if path.exists() else day
+            if day != self._day:
+                self._day = day
+                if os.path.isfile(self.baseFilename) and os.path.getsize(self.baseFilename):
+                    return True
+        return super().shouldRollover(record)
+
+
+class RepeatFilter(logging.Filter):
+    """同一個呼叫位置的警告（WARNING）在 window 秒內最多放行 burst 筆；ERROR 以上一律放行
+
+    超過的紀錄不會進入佇列；區間結束後該位置的下一筆警告會附上省略的筆數，
+    停止管線時仍未彙總的省略筆數由 pop_suppressed() 取出。
+    """
+
+    def __init__(self, window: float = LOG_DEDUP_WINDOW, burst: int = LOG_DEDUP_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        # (檔案, 行號) → [區間開始時間, 區間內筆數, 省略筆數, 最後一筆省略的紀錄]
+        self._sites: Dict[Tuple[str, int], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.WARNING or self.window <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            state = self._sites.get(key)
+            if state is not None and record.created - state[0] < self.window:
+                state[1] += 1
+                if state[1] > self.burst:
+                    state[2] += 1
+                    state[3] = record
+                    return False
+                return True
+            suppressed = state[2] if state else 0
+            self._sites[key] = [record.created, 1, 0, None]
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg}（前 {self.window} 秒內另有 {suppressed} 筆相同位置的紀錄已省略）"
+        return True
+
+    def pop_suppressed(self) -> List[Tuple[logging.LogRecord, int]]:
+        """取出尚未彙總的省略紀錄：(最後一筆省略的紀錄, 省略筆數)"""
+        with self._lock:
+            pending = [(state[3], state[2]) for state in self._sites.values() if state[2]]
+            self._sites.clear()
+        return pending
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """將紀錄放入有界佇列；佇列滿時捨棄紀錄並計數，不會阻塞呼叫端"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 在呼叫端展開訊息與例外，背景執行緒不需要原本的參數物件；extra 欄位原樣保留
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = TEXT_FORMAT.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """一個日誌實例的佇列 handler 與背景寫出執行緒"""
+
+    def __init__(self, log_file: str):
+        """建立並啟動管線
+
+        Args:
+            log_file: 日誌檔案名稱（位於 LOG_DIR）
+        """
+        # 終端輸出（INFO 以上，文字格式）
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setLevel(logging.INFO)
+        stream_handler.setFormatter(TEXT_FORMAT)
+
+        # 檔案輸出（DEBUG 以上，JSON lines）
+        file_handler = RotatingLogFileHandler(Path(LOG_DIR) / log_file)
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(JsonFormatter())
+
+        self.repeat_filter = RepeatFilter()
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        self.queue_handler.addFilter(self.repeat_filter)
+        self.listener = logging.handlers.QueueListener(
+            self.queue_handler.queue, stream_handler, file_handler, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self, logger: logging.Logger) -> None:
+        """寫出佇列中剩餘的紀錄並停止背景執行緒
+
+        之後 logger 的紀錄改由終端與檔案 handler 直接寫出；捨棄與省略的筆數在此時記錄。
+        """
+        self.listener.stop()
+        logger.handlers = [handler for handler in logger.handlers
+                           if handler is not self.queue_handler]
+        for handler in self.listener.handlers:
+            logger.addHandler(handler)
+        for record, count in self.repeat_filter.pop_suppressed():
+            logger.warning(f"{Path(record.pathname).name}:{record.lineno} 另有 {count} 筆"
+                           f"相同位置的紀錄已省略，最後一筆: {record.getMessage()}",
+                           extra={'suppressed': count})
+        if self.queue_handler.dropped:
+            logger.warning(f"日誌佇列已滿，捨棄了 {self.queue_handler.dropped} 筆紀錄",
+                           extra={'dropped': self.queue_handler.dropped})
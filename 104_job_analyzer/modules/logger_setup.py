@@ -1,95 +1,140 @@
 # modules/logger_setup.py
 
+"""日誌設定模組
+
+日誌實例在第一次取得時才建立，輸出管線（佇列、背景寫出執行緒、JSON lines 日誌檔與輪替，
+見 log_pipeline 模組）在第一筆紀錄時才建立；只執行 `--help` 或參數錯誤時
+不會載入管線、啟動執行緒或動到既有的日誌。
+"""
+
+import atexit
 import logging
-import sys
-from pathlib import Path
-from typing import Optional
-from config import LOG_DIR, LOG_FILE, SKILL_LOG, SALARY_LOG
+import threading
+from typing import List, Optional, Tuple
+from config import LOG_FILE, SKILL_LOG, SALARY_LOG
+
+# 專用日誌實例名稱 → 日誌檔案名稱
+_LOG_FILES = {
+    "skill_analyzer": SKILL_LOG,
+    "salary_analyzer": SALARY_LOG,
+}
+
+# 以模組屬性取用專用日誌實例時對應的名稱（見 __getattr__）
+_LAZY_LOGGERS = {
+    "skill_logger": "skill_analyzer",
+    "salary_logger": "salary_analyzer",
+}
+
+class DeferredPipelineHandler(logging.Handler):
+    """第一筆紀錄時建立輸出管線，並以管線的佇列 handler 取代自己"""
+
+    def __init__(self, logger: logging.Logger, log_file: str):
+        super().__init__()
+        self.logger = logger
+        self.log_file = log_file
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        queue_handler = LoggerManager.start_pipeline(self)
+        return queue_handler.handle(record)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.handle(record)
 
 class LoggerManager:
     """日誌管理器：負責建立和管理所有日誌實例"""
-    
+
     _loggers = {}
-    
+    _pipelines: List[Tuple[logging.Logger, "LogPipeline"]] = []
+    _lock = threading.Lock()
+
     @classmethod
     def get_logger(cls, name: str = "104_analyzer", log_file: str = LOG_FILE) -> logging.Logger:
         """取得或建立一個日誌實例
-        
+
         Args:
             name: 日誌實例名稱
             log_file: 日誌檔案名稱
-            
+
         Returns:
             logging.Logger: 設定完成的日誌實例
         """
-        if name not in cls._loggers:
-            cls._loggers[name] = cls._setup_logger(name, log_file)
-        return cls._loggers[name]
-    
+        with cls._lock:
+            if name not in cls._loggers:
+                cls._loggers[name] = cls._setup_logger(name, log_file)
+            return cls._loggers[name]
+
     @staticmethod
     def _setup_logger(name: str, log_file: str) -> logging.Logger:
         """設定一個日誌實例
-        
+
         Args:
             name: 日誌實例名稱
             log_file: 日誌檔案名稱
-            
+
         Returns:
             logging.Logger: 設定完成的日誌實例
         """
-        # 確保日誌目錄存在
-        log_path = Path(LOG_DIR)
-        log_path.mkdir(parents=True, exist_ok=True)
-        
         # 建立 logger
         logger = logging.getLogger(name)
         logger.setLevel(logging.DEBUG)
-        
+
         # 清除既有的 handlers
         if logger.hasHandlers():
             logger.handlers.clear()
-        
-        # 設定日誌格式
-        log_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        
-        # 終端輸出（INFO 以上）
-        stream_handler = logging.StreamHandler(sys.stdout)
-        stream_handler.setLevel(logging.INFO)
-        stream_handler.setFormatter(log_format)
-        logger.addHandler(stream_handler)
-        
-        # 檔案輸出（DEBUG 以上）
-        file_handler = logging.FileHandler(
-            log_path / log_file,
-            mode='w',
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(log_format)
-        logger.addHandler(file_handler)
-        
+
+        # 終端（INFO 以上）與檔案（DEBUG 以上）輸出由管線負責，第一筆紀錄時才建立
+        logger.addHandler(DeferredPipelineHandler(logger, log_file))
         return logger
 
-# 建立預設日誌實例
+    @classmethod
+    def start_pipeline(cls, placeholder: DeferredPipelineHandler) -> logging.Handler:
+        """建立日誌實例的輸出管線（多個執行緒同時記錄時只建立一次）
+
+        Returns:
+            logging.Handler: 管線的佇列 handler
+        """
+        logger = placeholder.logger
+        with cls._lock:
+            for owner, pipeline in cls._pipelines:
+                if owner is logger:
+                    return pipeline.queue_handler
+            from .log_pipeline import LogPipeline
+
+            pipeline = LogPipeline(placeholder.log_file)
+            logger.handlers = [pipeline.queue_handler if handler is placeholder else handler
+                               for handler in logger.handlers]
+            cls._pipelines.append((logger, pipeline))
+            return pipeline.queue_handler
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """寫出所有管線中剩餘的紀錄並停止背景執行緒"""
+        with cls._lock:
+            pipelines, cls._pipelines = cls._pipelines, []
+        for logger, pipeline in pipelines:
+            pipeline.stop(logger)
+
+# 建立預設日誌實例（不會建立管線或開啟日誌檔）
 logger = LoggerManager.get_logger()
 
-# 建立專用日誌實例
-skill_logger = LoggerManager.get_logger("skill_analyzer", SKILL_LOG)
-salary_logger = LoggerManager.get_logger("salary_analyzer", SALARY_LOG)
+# 其他模組的 atexit（例如關閉 HTTP 引擎）較晚註冊、先執行，其日誌仍會經由佇列寫出
+atexit.register(LoggerManager.shutdown)
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """取得一個日誌實例
-    
+
     Args:
         name: 日誌實例名稱，如果未提供則使用預設實例
-        
+
     Returns:
         logging.Logger: 日誌實例
     """
-    if name == "skill_analyzer":
-        return skill_logger
-    elif name == "salary_analyzer":
-        return salary_logger
-    return logger
\ No newline at end of file
+    if name in _LOG_FILES:
+        return LoggerManager.get_logger(name, _LOG_FILES[name])
+    return logger
+
+def __getattr__(name: str) -> logging.Logger:
+    """`skill_logger`、`salary_logger` 在第一次取用時才建立"""
+    if name in _LAZY_LOGGERS:
+        return get_logger(_LAZY_LOGGERS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
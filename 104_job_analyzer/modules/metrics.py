@@ -0,0 +1,308 @@
+# modules/metrics.py
+
+"""效能量測模組：記錄每個端點的請求時間分布與各處理階段的耗時
+
+HTTP 引擎會為每次實際送出的請求（含重試）記錄：
+- DNS 解析、建立連線、等待第一個位元組 (TTFB)、下載內容與總耗時
+- 狀態碼、連線錯誤、重試次數、傳輸位元組數
+- 同時進行中的請求數（整體與各端點的峰值）
+
+資料處理流程則以 span 記錄擷取、正規化、合併、寫入等階段的累計耗時。
+執行結束時可輸出為 JSON 摘要，或 Prometheus textfile collector 可讀取的文字格式。
+
+端點名稱由網址的主機與路徑組成，路徑中含數字的區段（職務代碼、職缺識別碼）
+會以 `{id}` 取代，例如 `be.guide.104.com.tw/api/job/seniority/{id}`。
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+
+# 延遲直方圖的區間上限（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TIMING_STAGES = ('dns', 'connect', 'ttfb', 'download', 'total')
+
+
+def endpoint_name(url: str) -> str:
+    """由網址取得端點名稱（主機 + 路徑，識別碼區段以 {id} 取代）"""
+    parts = urlsplit(url)
+    segments = ['{id}' if any(ch.isdigit() for ch in segment) else segment
+                for segment in parts.path.split('/')]
+    return parts.netloc + '/'.join(segments)
+
+
+class Histogram:
+    """固定區間的直方圖，另記錄總和與最大值"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最後一格為 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """加入一個觀測值"""
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """以區間上限估計分位數（不超過觀測到的最大值）"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """JSON 摘要用的統計值"""
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': round(self.max, 6),
+        }
+
+
+@dataclass
+class EndpointStats:
+    """單一端點的請求統計"""
+
+    requests: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    retries: int = 0
+    cache: Counter = field(default_factory=Counter)  # HTTP 快取結果：hit/revalidated/miss
+    bytes: int = 0
+    inflight: int = 0
+    peak_inflight: int = 0
+    timings: Dict[str, Histogram] = field(
+        default_factory=lambda: {stage: Histogram() for stage in TIMING_STAGES}
+    )
+
+
+class MetricsRegistry:
+    """整個行程共用的量測資料（執行緒安全）"""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, EndpointStats] = {}
+        self.spans: Dict[str, Histogram] = {}
+        self.gauges: Dict[str, Dict[str, float]] = {}
+        self.inflight = 0
+        self.peak_inflight = 0
+
+    def _endpoint(self, endpoint: str) -> EndpointStats:
+        """取得端點統計（呼叫端需持有鎖）"""
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        return stats
+
+    # ------------------------------------------------------------------
+    # HTTP 請求
+    # ------------------------------------------------------------------
+    def request_started(self, endpoint: str) -> None:
+        """一個請求開始送出"""
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.requests += 1
+            stats.inflight += 1
+            stats.peak_inflight = max(stats.peak_inflight, stats.inflight)
+            self.inflight += 1
+            self.peak_inflight = max(self.peak_inflight, self.inflight)
+
+    def request_finished(self, endpoint: str, status: Optional[int],
+                         timings: Dict[str, float], size: int = 0) -> None:
+        """一個請求結束
+
+        Args:
+            endpoint: 端點名稱
+            status: HTTP 狀態碼，連線錯誤或逾時為 None
+            timings: 各階段耗時（秒），鍵為 TIMING_STAGES 中的名稱
+            size: 回應內容位元組數
+        """
+        with self._lock:
+            stats = self._endpoint(endpoint)
+            stats.inflight -= 1
+            self.inflight -= 1
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] += 1
+            stats.bytes += size
+            for stage, value in timings.items():
+                stats.timings[stage].observe(value)
+
+    def record_retry(self, endpoint: str) -> None:
+        """一個請求將被重試"""
+        with self._lock:
+            self._endpoint(endpoint).retries += 1
+
+    def record_cache(self, endpoint: str, outcome: str) -> None:
+        """記錄一次 HTTP 快取查詢結果（hit、revalidated 或 miss）"""
+        with self._lock:
+            self._endpoint(endpoint).cache[outcome] += 1
+
+    # ------------------------------------------------------------------
+    # 處理階段
+    # ------------------------------------------------------------------
+    def observe_span(self, name: str, seconds: float) -> None:
+        """記錄一段處理耗時"""
+        with self._lock:
+            histogram = self.spans.get(name)
+            if histogram is None:
+                histogram = self.spans[name] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """以 with 陳述式記錄區塊的耗時"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_span(name, time.perf_counter() - start)
+
+    def timed_iter(self, iterable: Iterable[T], name: str) -> Iterator[T]:
+        """逐筆產出 iterable 的項目，並將等待每一筆的時間記入 span
+
+        適合包裝擷取結果的串流：記錄的是呼叫端實際等待網路結果的時間。
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.observe_span(name, time.perf_counter() - start)
+            yield item
+
+    def set_gauge(self, name: str, key: str, value: float) -> None:
+        """設定一個量測值，例如各主機目前的速率上限"""
+        with self._lock:
+            self.gauges.setdefault(name, {})[key] = value
+
+    # ------------------------------------------------------------------
+    # 輸出
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        """目前所有量測資料的摘要"""
+        with self._lock:
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'duration': round(time.perf_counter() - self._started, 3),
+                'peak_inflight': self.peak_inflight,
+                'endpoints': {
+                    endpoint: {
+                        'requests': stats.requests,
+                        'statuses': {str(code): n for code, n in sorted(stats.statuses.items())},
+                        'errors': stats.errors,
+                        'retries': stats.retries,
+                        'cache': dict(stats.cache),
+                        'bytes': stats.bytes,
+                        'peak_inflight': stats.peak_inflight,
+                        'timings': {stage: h.summary() for stage, h in stats.timings.items()},
+                    }
+                    for endpoint, stats in sorted(self.endpoints.items())
+                },
+                'spans': {name: h.summary() for name, h in sorted(self.spans.items())},
+                'gauges': {name: dict(values) for name, values in self.gauges.items()},
+            }
+
+    def write_summary(self, path: Path) -> None:
+        """將摘要寫入 JSON 檔"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.snapshot(), ensure_ascii=False, indent=2),
+                        encoding='utf-8')
+
+    def write_prometheus(self, path: Path, prefix: str = 'job_analyzer') -> None:
+        """以 Prometheus 文字格式寫入檔案（先寫暫存檔再改名，避免讀到一半的內容）"""
+        lines: List[str] = []
+
+        def emit(name: str, kind: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.extend(f"{prefix}_{sample} {value:g}" for sample, value in samples)
+
+        def histogram_samples(name: str, labels: str, h: Histogram) -> List[Tuple[str, float]]:
+            samples, cumulative = [], 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                samples.append((f'{name}_bucket{{{labels},le="{bound:g}"}}', cumulative))
+            samples.append((f'{name}_bucket{{{labels},le="+Inf"}}', h.count))
+            samples.append((f'{name}_sum{{{labels}}}', h.sum))
+            samples.append((f'{name}_count{{{labels}}}', h.count))
+            return samples
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            spans = sorted(self.spans.items())
+            emit('run_duration_seconds', 'gauge', '本次執行的總耗時',
+                 [('run_duration_seconds', time.perf_counter() - self._started)])
+            emit('http_peak_inflight', 'gauge', '同時進行中請求數的峰值',
+                 [('http_peak_inflight', self.peak_inflight)])
+            emit('http_responses_total', 'counter', '各端點依狀態碼的回應數',
+                 [(f'http_responses_total{{endpoint="{ep}",status="{code}"}}', n)
+                  for ep, stats in endpoints for code, n in sorted(stats.statuses.items())])
+            emit('http_cache_total', 'counter', '各端點的 HTTP 快取查詢結果',
+                 [(f'http_cache_total{{endpoint="{ep}",outcome="{outcome}"}}', n)
+                  for ep, stats in endpoints for outcome, n in sorted(stats.cache.items())])
+            for name, attr, help_text in (
+                ('http_requests_total', 'requests', '各端點送出的請求數（含重試）'),
+                ('http_errors_total', 'errors', '各端點的連線錯誤與逾時數'),
+                ('http_retries_total', 'retries', '各端點的重試次數'),
+                ('http_response_bytes_total', 'bytes', '各端點接收的位元組數'),
+            ):
+                emit(name, 'counter', help_text,
+                     [(f'{name}{{endpoint="{ep}"}}', getattr(stats, attr)) for ep, stats in endpoints])
+            emit('http_request_duration_seconds', 'histogram', '各端點各階段的請求耗時',
+                 [sample for ep, stats in endpoints for stage, h in stats.timings.items()
+                  for sample in histogram_samples('http_request_duration_seconds',
+                                                  f'endpoint="{ep}",stage="{stage}"', h)])
+            emit('span_duration_seconds', 'histogram', '各處理階段的耗時',
+                 [sample for name, h in spans
+                  for sample in histogram_samples('span_duration_seconds', f'span="{name}"', h)])
+            for name, values in self.gauges.items():
+                emit(name, 'gauge', name,
+                     [(f'{name}{{key="{key}"}}', value) for key, value in values.items()])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+        tmp_path.replace(path)
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """取得整個行程共用的量測資料"""
+    return _metrics
@@ -0,0 +1,181 @@
+# modules/posting_index.py
+
+"""職缺索引模組：跨執行記錄看過的職缺，找出每日新增、變更與下架的職缺
+
+每筆職缺以 (搜尋範圍, jobNo) 為鍵，記錄首次出現日、最後出現日、
+內容指紋（POSTING_FINGERPRINT_FIELDS 欄位的雜湊）與最近一次變更、下架的日期。
+搜尋範圍即不含頁碼的搜尋 URL，不同關鍵字或類別的搜尋各自比對，
+不會把其他範圍的職缺誤判為下架。
+
+日期以 YYYY-MM-DD 字串保存；同一天內重複執行或以 --resume 接續時，
+當天的異動會累積而不會遺失。
+"""
+
+import sqlite3
+import threading
+
+from .common import (
+    logger, Path, get_metrics,
+    Optional, Dict, Set, Tuple, Any, Iterable, Iterator
+)
+from .result_store import content_hash
+from config import (
+    CACHE_DIR, POSTING_INDEX_FILE, POSTING_FINGERPRINT_FIELDS, SQLITE_BUSY_TIMEOUT
+)
+
+CHANGE_NEW = 'new'
+CHANGE_CHANGED = 'changed'
+CHANGE_REMOVED = 'removed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    scope       TEXT NOT NULL,
+    job_no      TEXT NOT NULL,
+    job_id      TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    first_seen  TEXT NOT NULL,
+    last_seen   TEXT NOT NULL,
+    changed_on  TEXT,
+    removed_on  TEXT,
+    PRIMARY KEY (scope, job_no)
+)
+"""
+
+# 內容指紋不同或先前已下架的職缺視為變更；SET 中引用的 postings.* 皆為更新前的值
+_UPSERT = """
+INSERT INTO postings
+    (scope, job_no, job_id, url, fingerprint, first_seen, last_seen, changed_on, removed_on)
+VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL)
+ON CONFLICT (scope, job_no) DO UPDATE SET
+    job_id = excluded.job_id,
+    url = excluded.url,
+    last_seen = excluded.last_seen,
+    changed_on = CASE
+        WHEN postings.fingerprint != excluded.fingerprint OR postings.removed_on IS NOT NULL
+        THEN excluded.last_seen ELSE postings.changed_on END,
+    fingerprint = excluded.fingerprint,
+    removed_on = NULL
+"""
+
+def posting_fingerprint(job: Dict[str, Any]) -> str:
+    """計算搜尋結果中單一職缺的內容指紋"""
+    return content_hash({field: job.get(field) for field in POSTING_FINGERPRINT_FIELDS})
+
+class PostingIndex:
+    """跨執行的職缺索引"""
+
+    def __init__(self, db_path: Path):
+        """開啟（或建立）職缺索引
+
+        Args:
+            db_path: SQLite 檔案路徑
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False,
+                                     timeout=SQLITE_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def observe(self, scope: str, postings: Iterable[Tuple[str, str, str, str]],
+                day: str) -> Set[str]:
+        """記錄一批在搜尋結果中看到的職缺
+
+        Args:
+            scope: 搜尋範圍
+            postings: (jobNo, 職缺識別碼, 詳細資訊 URL, 內容指紋) 的序列
+            day: 執行日期（YYYY-MM-DD）
+
+        Returns:
+            Set[str]: 這批職缺中，當天為新增或變更的 jobNo
+        """
+        rows = [(scope, job_no, job_id, url, fingerprint, day, day)
+                for job_no, job_id, url, fingerprint in postings]
+        if not rows:
+            return set()
+
+        job_nos = [row[1] for row in rows]
+        placeholders = ','.join('?' * len(job_nos))
+        with self._lock, get_metrics().span("store.postings"):
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.commit()
+            changed = self._conn.execute(
+                f"SELECT job_no FROM postings WHERE scope = ? AND job_no IN ({placeholders}) "
+                "AND (first_seen = ? OR changed_on = ?)",
+                (scope, *job_nos, day, day)
+            ).fetchall()
+        return {job_no for job_no, in changed}
+
+    def mark_removed(self, scope: str, day: str) -> int:
+        """將搜尋範圍內當天未再出現的職缺標記為下架
+
+        只應在搜尋結果的所有頁面都成功取得後呼叫。
+
+        Returns:
+            int: 新標記為下架的筆數
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE postings SET removed_on = ? "
+                "WHERE scope = ? AND last_seen < ? AND removed_on IS NULL",
+                (day, scope, day)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def iter_changes(self, scope: str, day: str,
+                     kinds: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+        """逐筆產出搜尋範圍內當天的異動
+
+        Args:
+            scope: 搜尋範圍
+            day: 日期（YYYY-MM-DD）
+            kinds: 只產出指定的異動種類（new、changed、removed），未提供時全部產出
+
+        Yields:
+            Dict[str, Any]: 含 change、job_no、job_id、url、first_seen、last_seen 的紀錄
+        """
+        kinds = set(kinds or (CHANGE_NEW, CHANGE_CHANGED, CHANGE_REMOVED))
+        conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_BUSY_TIMEOUT)
+        try:
+            cursor = conn.execute(
+                "SELECT CASE WHEN removed_on = ? THEN 'removed' "
+                "            WHEN first_seen = ? THEN 'new' ELSE 'changed' END, "
+                "       job_no, job_id, url, first_seen, last_seen "
+                "FROM postings WHERE scope = ? "
+                "AND (first_seen = ? OR changed_on = ? OR removed_on = ?) "
+                "ORDER BY job_no",
+                (day, day, scope, day, day, day)
+            )
+            for change, job_no, job_id, url, first_seen, last_seen in cursor:
+                if change in kinds:
+                    yield {
+                        'change': change,
+                        'job_no': job_no,
+                        'job_id': job_id,
+                        'url': url,
+                        'first_seen': first_seen,
+                        'last_seen': last_seen,
+                    }
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+_index: Optional[PostingIndex] = None
+_index_lock = threading.Lock()
+
+def get_posting_index() -> PostingIndex:
+    """取得整個行程共用的職缺索引"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PostingIndex(Path(CACHE_DIR) / POSTING_INDEX_FILE)
+            logger.debug(f"職缺索引已開啟: {_index.db_path}")
+        return _index
@@ -2,113 +2,394 @@
 
 """資料處理模組：負責處理和轉換原始資料"""
 
+import heapq
+import sys
 from collections import defaultdict
+from dataclasses import dataclass
 from .common import (
     pd, tqdm, logger,
-    List, Dict, Optional, Any,
-    ThreadPoolExecutor, as_completed
+    List, Dict, Optional, Any, Iterator, Iterable, Tuple,
+    get_engine, get_metrics, safe_get, coerce_numeric_columns
 )
 from .fetcher import (
-    fetch_single_skill_request,
-    fetch_single_salary_request
+    fetch_single_skill_async,
+    fetch_single_salary_async
 )
+from .result_store import ResultKey, get_result_store
+from .checkpoint import Journal
 from config import (
-    MAX_WORKERS_SKILL,
-    MAX_WORKERS_SALARY,
-    ALL_SALARY_TYPES
+    ALL_SALARY_TYPES,
+    REORDER_WINDOW,
+    SKILL_MAX_AGE,
+    SALARY_MAX_AGE,
+    STORE_BATCH_SIZE
 )
 
-def flatten_job_categories(node_list: List[Dict], parent_name: str = None, parent_code: str = None) -> List[Dict]:
-    """遞迴地將樹狀職務類別扁平化
+# 薪資 API 中的數值欄位；輸出時轉為可為空的數值型別，而非字串或浮點數。
+# 型別固定而非依資料推斷，使分批寫入的每一批都有相同的 schema。
+# 平均薪資與各分位數帶有小數，其餘皆為整數。
+SALARY_INT_COLUMNS = [
+    'salaryThousand50', 'salaryThousand',
+    'sampleCount', 'originSampleCount', 'originTotalSampleCount',
+    'analyzeCode', 'jobCount',
+]
+SALARY_FLOAT_COLUMNS = ['salary', 'salary25', 'salary50', 'salary75']
+
+# 技能列表的欄位；其中每項為 {'id', 'name'}
+SKILL_LIST_FIELDS = ('hardToolList', 'hardSkillList', 'hardCertList')
+
+# 技能資料由兩個端點組成。只取得其中一半時，該半以 'skill_part' 種類存入結果儲存
+# （type_id 區分是哪一半），下次執行只需擷取缺少的另一半；完整紀錄寫入時一併刪除
+SKILL_PART_JOB = 1   # jobCard/job：職務說明與技能
+SKILL_PART_CERT = 2  # jobCard/cert：工具、技能與證照列表
+
+def superseded_skill_parts(job_codes: Iterable[str]) -> List[Tuple[str, ResultKey]]:
+    """取得被完整技能紀錄取代的部分資料鍵，供 ResultStore.save_many 的 discard 參數使用"""
+    return [('skill_part', (job_code, part)) for job_code in job_codes
+            for part in (SKILL_PART_JOB, SKILL_PART_CERT)]
+
+def intern_str(value: Any) -> Any:
+    """將字串 intern，使重複出現的代碼與名稱共用同一個物件；非字串原樣回傳"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+@dataclass(frozen=True, slots=True)
+class JobCategory:
+    """扁平化職務類別表中的一列
+
+    代碼與名稱皆已 intern：同一父類別底下的各列共用同一個父類別代碼與名稱物件。
+    """
+
+    parent_code: str
+    parent_name: str
+    job_code: str
+    job_name: str
+
+def split_category_codes(category: Optional[str]) -> List[str]:
+    """將以逗號分隔的職務類別代碼（與 --category 相同格式）拆成列表"""
+    return [code.strip() for code in (category or '').split(',') if code.strip()]
+
+def iter_job_categories(node_list: List[Dict]) -> Iterator[JobCategory]:
+    """以堆疊逐一走訪職務類別樹，逐筆產出扁平化的職務類別
+
+    產出順序與遞迴的前序走訪相同；不建立中間列表，樹的深度也不受遞迴上限限制。
+    選取子樹（--category、--category-depth）由 category_cache.select_categories 處理。
+
+    Args:
+        node_list: 職務類別節點列表
+
+    Yields:
+        JobCategory: 有父層的職務類別
+    """
+    # 堆疊項目：(節點, 父類別代碼, 父類別名稱)
+    stack = [(node, None, None) for node in reversed(node_list)]
+    while stack:
+        node, parent_code, parent_name = stack.pop()
+        job_code, job_name = intern_str(node.get('no')), intern_str(node.get('des'))
+        if parent_code:  # 只產出有父層的節點
+            yield JobCategory(parent_code, parent_name, job_code, job_name)
+        children = node.get('n')
+        if children:
+            stack.extend((child, job_code, job_name) for child in reversed(children))
+
+def flatten_job_categories(node_list: List[Dict]) -> List[JobCategory]:
+    """將樹狀職務類別扁平化
     
     Args:
         node_list: 職務類別節點列表
-        parent_name: 父類別名稱
-        parent_code: 父類別代碼
         
     Returns:
-        List[Dict]: 扁平化後的職務類別列表
+        List[JobCategory]: 扁平化後的職務類別列表
     """
-    items = []
-    for node in node_list:
-        if parent_code:  # 只加入有父層的節點
-            items.append({
-                'parent_code': parent_code,
-                'parent_name': parent_name,
-                'job_code': node.get('no'),
-                'job_name': node.get('des')
-            })
-        if 'n' in node and node['n']:
-            items.extend(flatten_job_categories(
-                node['n'],
-                node.get('des'),
-                node.get('no')
-            ))
-    return items
-
-def process_all_skills(job_codes: List[str]) -> pd.DataFrame:
-    """並行處理 job_code 列表以獲取技能資料。"""
-    logger.info(f"準備並行獲取 {len(job_codes)} 個職務的技能資料...")
-    processed_data = []
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS_SKILL) as executor:
-        # 建立未來對象到職務代碼的映射
-        futures = {
-            executor.submit(fetch_single_skill_request, jc): jc 
-            for jc in job_codes
-        }
-        
-        # 使用進度條追蹤完成情況
-        for future in tqdm(as_completed(futures),
-                         total=len(job_codes),
-                         desc="獲取技能資料"):
-            job_code, skill_json, cert_json = future.result()
-            
-            # 合併技能和證照資料
-            if skill_json and cert_json:
-                skill_json.update({
-                    'hardToolList': cert_json.get('hardToolList', []),
-                    'hardSkillList': cert_json.get('hardSkillList', []),
-                    'hardCertList': cert_json.get('hardCertList', [])
-                })
-                processed_data.append(skill_json)
-
-    if not processed_data:
-        logger.warning("未能獲取任何技能資料")
-        return pd.DataFrame()
-
-    return pd.DataFrame(processed_data)
-
-def process_all_salaries(job_codes: List[str]) -> Optional[pd.DataFrame]:
-    """並行處理多個職務的薪資資料。"""
-    logger.info(f"準備並行獲取 {len(job_codes)} 個職務的薪資資料...")
-    salary_data = []
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS_SALARY) as executor:
-        futures = []
-        # 為每個職務和薪資類型建立請求
-        for job_code in job_codes:
-            for type_id in ALL_SALARY_TYPES:
-                futures.append(
-                    executor.submit(fetch_single_salary_request,
-                                 job_code,
-                                 type_id)
-                )
-
-        # 使用進度條追蹤完成情況
-        for future in tqdm(as_completed(futures),
-                         total=len(futures),
-                         desc="獲取薪資資料"):
-            job_code, type_id, salary_list = future.result()
-            if salary_list:
-                for salary in salary_list:
-                    salary['job_code'] = job_code
-                    salary['salary_type'] = ALL_SALARY_TYPES[type_id]
-                    salary_data.append(salary)
-
-    if not salary_data:
-        logger.warning("未能獲取任何薪資資料")
-        return None
-
-    df = pd.DataFrame(salary_data)
-    return df
\ No newline at end of file
+    return list(iter_job_categories(node_list))
+
+def merge_skill_parts(job_code: str, skill_json: Optional[Dict],
+                      cert_json: Optional[Dict]) -> Dict:
+    """合併技能與證照兩個端點的資料
+
+    缺少任一半時仍回傳可用的部分，並以 `complete` 欄位標示是否完整。
+
+    Args:
+        job_code: 職務代碼
+        skill_json: jobCard/job 的回應，失敗時為 None
+        cert_json: jobCard/cert 的回應，失敗時為 None
+
+    Returns:
+        Dict: 合併後的技能紀錄
+    """
+    record = dict(skill_json) if skill_json else {'jobCode': job_code}
+    record.update({field: (cert_json or {}).get(field, []) for field in SKILL_LIST_FIELDS})
+    record['complete'] = skill_json is not None and cert_json is not None
+    return record
+
+def compact_skill_record(skill_json: Dict) -> Dict:
+    """將技能資料中重複出現於各職務的技能 id 與名稱 intern（原地修改並回傳）"""
+    for field in SKILL_LIST_FIELDS:
+        for item in skill_json.get(field) or ():
+            for key in ('id', 'name'):
+                if key in item:
+                    item[key] = intern_str(item[key])
+    return skill_json
+
+def _merge_in_order(keys: List[Any], *streams: Iterable[Tuple[Any, Any]]) -> Iterator[Tuple[Any, Any]]:
+    """合併各自依 keys 順序產出的 (key, value) 串流，結果依 keys 的順序產出
+
+    每個串流只保留目前的一筆，不會一次載入全部內容。
+    """
+    positions = {key: i for i, key in enumerate(keys)}
+    return heapq.merge(*streams, key=lambda item: positions[item[0]])
+
+def iter_skill_records(job_codes: List[str], max_age: float = SKILL_MAX_AGE,
+                       resume: bool = False) -> Iterator[Dict]:
+    """以串流方式產出 job_code 列表的技能資料
+
+    仍在有效期限內的職務直接取用結果儲存中的資料，只擷取過期或缺少的職務，
+    新取得的結果會分批寫回儲存。每筆結果完成時即寫入檢查點紀錄，
+    `resume=True` 時會沿用上次中斷前已完成的職務。
+    擷取以有界視窗進行，記憶體用量與職務數量無關。
+    不論來源為儲存結果、檢查點或新擷取，紀錄一律依 job_codes 的順序產出。
+
+    技能與證照兩個端點同時請求、各自重試；只取得其中一半時仍會產出紀錄
+    （`complete=False`），取得的一半另外保存，下次執行只擷取缺少的部分。
+
+    Args:
+        job_codes: 職務代碼列表
+        max_age: 儲存結果的有效秒數，0 表示全部重新擷取
+        resume: 是否從上次中斷的檢查點繼續
+
+    Yields:
+        Dict: 合併技能與證照資料後的單一職務紀錄，含 complete 欄位
+    """
+    store = get_result_store()
+    job_codes = list(dict.fromkeys(job_codes))
+    fresh = store.fresh_keys('skill', max_age)
+    cached_codes = [jc for jc in job_codes if (jc, 0) in fresh]
+
+    with Journal('skills', resume) as journal:
+        resumed = [(jc, journal.entries[jc]) for jc in job_codes
+                   if (jc, 0) not in fresh and jc in journal.entries]
+        store.save_many('skill', [((jc, 0), skill_json) for jc, skill_json in resumed],
+                        discard=superseded_skill_parts(jc for jc, _ in resumed))
+        pending_codes = [jc for jc in job_codes
+                         if (jc, 0) not in fresh and jc not in journal.entries]
+        logger.info(f"準備並行獲取 {len(pending_codes)} 個職務的技能資料"
+                    f"（{len(cached_codes)} 個沿用儲存結果，{len(resumed)} 個沿用檢查點）...")
+
+        # 上次只取得一半的職務，只擷取缺少的另一半
+        parts = store.load_fresh('skill_part', [(jc, part) for jc in pending_codes
+                                                for part in (SKILL_PART_JOB, SKILL_PART_CERT)],
+                                 max_age)
+
+        def fetch(job_code: str):
+            return fetch_single_skill_async(job_code,
+                                            fetch_skill=(job_code, SKILL_PART_JOB) not in parts,
+                                            fetch_cert=(job_code, SKILL_PART_CERT) not in parts)
+
+        changed = 0
+        failed = 0
+        incomplete = 0
+
+        def fetched() -> Iterator[Tuple[str, Dict]]:
+            nonlocal changed, failed, incomplete
+            to_store = []
+            try:
+                # 所有請求共用 HTTP 引擎的連線池與並發上限；每個職務的兩個端點同時請求
+                results = get_metrics().timed_iter(get_engine().map_ordered(
+                    fetch, pending_codes, REORDER_WINDOW
+                ), "fetch.skills")
+                for job_code, skill_json, cert_json in tqdm(results,
+                                                            total=len(pending_codes),
+                                                            desc="獲取技能資料"):
+                    new_parts = [((job_code, part), data) for part, data in
+                                 ((SKILL_PART_JOB, skill_json), (SKILL_PART_CERT, cert_json))
+                                 if data is not None]
+                    if skill_json is None:
+                        skill_json = parts.get((job_code, SKILL_PART_JOB))
+                    if cert_json is None:
+                        cert_json = parts.get((job_code, SKILL_PART_CERT))
+                    if skill_json is None and cert_json is None:
+                        failed += 1
+                        continue
+
+                    # 合併技能和證照資料；只有完整的紀錄寫入儲存與檢查點，並刪除其部分資料
+                    record = merge_skill_parts(job_code, skill_json, cert_json)
+                    if record['complete']:
+                        journal.append(job_code, record)
+                        to_store.append(((job_code, 0), record))
+                        if len(to_store) >= STORE_BATCH_SIZE:
+                            changed += store.save_many(
+                                'skill', to_store,
+                                discard=superseded_skill_parts(jc for (jc, _), _ in to_store))
+                            to_store.clear()
+                    else:
+                        incomplete += 1
+                        store.save_many('skill_part', new_parts)
+                    yield job_code, record
+            finally:
+                changed += store.save_many(
+                    'skill', to_store,
+                    discard=superseded_skill_parts(jc for (jc, _), _ in to_store))
+
+        # 儲存與檢查點中只有完整的紀錄
+        cached = ((jc, skill_json) for (jc, _), skill_json
+                  in store.iter_fresh('skill', [(jc, 0) for jc in cached_codes], max_age))
+        new_records = fetched()
+        try:
+            for _, skill_json in _merge_in_order(job_codes, cached, resumed, new_records):
+                skill_json.setdefault('complete', True)
+                yield compact_skill_record(skill_json)
+        finally:
+            new_records.close()
+        journal.complete()
+
+    logger.info(f"技能資料有 {changed} 筆新增或變更")
+    if incomplete:
+        logger.warning(f"{incomplete} 個職務的技能資料只取得一部分（complete=False），"
+                       f"下次執行只會重新擷取缺少的部分")
+    if failed:
+        logger.warning(f"{failed} 個職務的技能資料重試後仍擷取失敗，下次執行會重新擷取")
+
+def _expand_salaries(job_code: str, type_id: int, salary_list: List[Dict]) -> List[Dict]:
+    """將單一職務的 salaryList 加上職務代碼與薪資類型
+
+    各職務共通的年資區間說明（desc）會 intern，不為每筆紀錄各保留一份。
+    """
+    salary_type = ALL_SALARY_TYPES[type_id]
+    return [
+        {**salary, 'desc': intern_str(salary.get('desc')),
+         'job_code': job_code, 'salary_type': salary_type}
+        for salary in salary_list
+    ]
+
+def normalize_salary_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """將一批薪資紀錄的數值欄位轉為固定的數值型別"""
+    coerce_numeric_columns(df, SALARY_INT_COLUMNS, 'Int64')
+    return coerce_numeric_columns(df, SALARY_FLOAT_COLUMNS, 'Float64')
+
+def iter_salary_records(job_codes: List[str], max_age: float = SALARY_MAX_AGE,
+                        resume: bool = False) -> Iterator[Dict]:
+    """以串流方式產出多個職務的薪資紀錄
+
+    仍在有效期限內的 (job_code, type_id) 直接取用結果儲存中的資料，
+    只擷取過期或缺少的組合，新取得的結果會分批寫回儲存。每筆結果完成時
+    即寫入檢查點紀錄，`resume=True` 時會沿用上次中斷前已完成的組合。
+    擷取以有界視窗進行，記憶體用量與職務及薪資類型的數量無關。
+    不論來源為儲存結果、檢查點或新擷取，紀錄一律依 (job_code, type_id) 的順序產出。
+
+    Args:
+        job_codes: 職務代碼列表
+        max_age: 儲存結果的有效秒數，0 表示全部重新擷取
+        resume: 是否從上次中斷的檢查點繼續
+
+    Yields:
+        Dict: 單筆薪資紀錄（含 job_code 與 salary_type）
+    """
+    store = get_result_store()
+    keys = [(job_code, type_id)
+            for job_code in dict.fromkeys(job_codes)
+            for type_id in ALL_SALARY_TYPES]
+    fresh = store.fresh_keys('salary', max_age)
+    cached_keys = [key for key in keys if key in fresh]
+
+    with Journal('salaries', resume) as journal:
+        resumed = [(key, journal.entries[key]) for key in keys
+                   if key not in fresh and key in journal.entries]
+        store.save_many('salary', resumed)
+        pending_keys = [key for key in keys
+                        if key not in fresh and key not in journal.entries]
+        logger.info(f"準備並行獲取 {len(pending_keys)} 筆職務薪資資料"
+                    f"（{len(cached_keys)} 筆沿用儲存結果，{len(resumed)} 筆沿用檢查點）...")
+
+        changed = 0
+        failed = 0
+
+        def fetched() -> Iterator[Tuple[ResultKey, List[Dict]]]:
+            nonlocal changed, failed
+            to_store = []
+            try:
+                # 為每個職務和薪資類型建立請求，共用 HTTP 引擎的連線池與並發上限
+                results = get_metrics().timed_iter(get_engine().map_ordered(
+                    lambda key: fetch_single_salary_async(*key), pending_keys, REORDER_WINDOW
+                ), "fetch.salaries")
+                for job_code, type_id, salary_list in tqdm(results,
+                                                           total=len(pending_keys),
+                                                           desc="獲取薪資資料"):
+                    if salary_list is None:
+                        failed += 1
+                        continue
+                    # 空列表也是有效結果，一併儲存以免下次重複擷取
+                    journal.append((job_code, type_id), salary_list)
+                    to_store.append(((job_code, type_id), salary_list))
+                    if len(to_store) >= STORE_BATCH_SIZE:
+                        changed += store.save_many('salary', to_store)
+                        to_store.clear()
+                    yield (job_code, type_id), salary_list
+            finally:
+                changed += store.save_many('salary', to_store)
+
+        cached = store.iter_fresh('salary', cached_keys, max_age)
+        new_records = fetched()
+        try:
+            for (job_code, type_id), salary_list in _merge_in_order(keys, cached, resumed,
+                                                                    new_records):
+                yield from _expand_salaries(job_code, type_id, salary_list)
+        finally:
+            new_records.close()
+        journal.complete()
+
+    logger.info(f"薪資資料有 {changed} 筆新增或變更")
+    if failed:
+        logger.warning(f"{failed} 筆職務薪資資料重試後仍擷取失敗，下次執行會重新擷取")
+
+def _join_descriptions(items: Optional[List[Any]], key: str = 'description') -> str:
+    """將 [{'description': ...}, ...] 或字串列表合併為單一字串"""
+    if not items:
+        return ''
+    values = [item.get(key, '') if isinstance(item, dict) else str(item)
+              for item in items]
+    return '、'.join(v for v in values if v)
+
+def flatten_job_detail(job_id: str, data: Dict) -> Dict[str, Any]:
+    """將職缺詳細資訊 API 的 `data` 欄位扁平化為單一紀錄
+
+    Args:
+        job_id: 職缺識別碼
+        data: 詳細資訊 API 回應中的 `data` 欄位
+
+    Returns:
+        Dict[str, Any]: 扁平化後的職缺紀錄
+    """
+    header = safe_get(data, 'header', default={}) or {}
+    detail = safe_get(data, 'jobDetail', default={}) or {}
+    condition = safe_get(data, 'condition', default={}) or {}
+    welfare = safe_get(data, 'welfare', default={}) or {}
+
+    return {
+        'job_id': job_id,
+        'job_name': header.get('jobName'),
+        'appear_date': header.get('appearDate'),
+        'cust_name': header.get('custName'),
+        'cust_no': data.get('custNo'),
+        'industry': data.get('industry'),
+        'job_category': _join_descriptions(detail.get('jobCategory')),
+        'job_description': detail.get('jobDescription'),
+        'salary': detail.get('salary'),
+        'salary_min': detail.get('salaryMin'),
+        'salary_max': detail.get('salaryMax'),
+        'salary_type': detail.get('salaryType'),
+        'address_region': detail.get('addressRegion'),
+        'address_detail': detail.get('addressDetail'),
+        'work_period': detail.get('workPeriod'),
+        'vacation_policy': detail.get('vacationPolicy'),
+        'need_emp': detail.get('needEmp'),
+        'accept_role': _join_descriptions(safe_get(condition, 'acceptRole', 'role')),
+        'work_exp': condition.get('workExp'),
+        'edu': condition.get('edu'),
+        'major': _join_descriptions(condition.get('major')),
+        'language': _join_descriptions(condition.get('language'), 'language'),
+        'specialty': _join_descriptions(condition.get('specialty')),
+        'skill': _join_descriptions(condition.get('skill')),
+        'certificate': _join_descriptions(condition.get('certificate')),
+        'other_requirements': condition.get('other'),
+        'welfare_tags': _join_descriptions(welfare.get('tag')),
+        'welfare': welfare.get('welfare'),
+    }
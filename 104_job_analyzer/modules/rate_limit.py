@@ -0,0 +1,169 @@
+# modules/rate_limit.py
+
+"""流量控制模組：自適應速率限制與重試退避
+
+`AdaptiveRateLimiter` 是以 AIMD（加法增加、乘法減少）調整速率的 token bucket：
+- 慢啟動：第一次壅塞前，每個正常回應使速率加 1，約每秒倍增
+- 之後回應正常時速率緩慢上升
+- 收到 429/503 或平均延遲明顯升高時速率減半
+- 基準延遲是時間常數 RATE_LIMIT_BASELINE_WINDOW 秒的長期平均延遲，每次因延遲降速後
+  重設為目前的平均延遲；延遲的隨機抖動或停在新的水準時不會反覆降速
+- 伺服器提供 Retry-After 時，在指定時間前暫停發送（最多 RETRY_BACKOFF_MAX 秒）
+
+此模組的物件皆在 HTTP 引擎的事件迴圈內使用。
+"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from config import (
+    RATE_LIMIT_INITIAL,
+    RATE_LIMIT_MIN,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_INCREASE,
+    RATE_LIMIT_DECREASE,
+    RATE_LIMIT_LATENCY_FACTOR,
+    RATE_LIMIT_BASELINE_WINDOW,
+    RATE_LIMIT_SLOW_START,
+    RETRY_BACKOFF_BASE,
+    RETRY_BACKOFF_MAX,
+)
+from .logger_setup import logger
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """解析 Retry-After 標頭（秒數或 HTTP 日期）
+
+    Returns:
+        Optional[float]: 需等待的秒數，無法解析時回傳 None
+    """
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int,
+                  base: float = RETRY_BACKOFF_BASE,
+                  cap: float = RETRY_BACKOFF_MAX) -> float:
+    """計算第 attempt 次重試前的等待秒數（指數退避 + full jitter）"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """以 AIMD 調整速率的 token bucket"""
+
+    def __init__(self, name: str,
+                 rate: float = RATE_LIMIT_INITIAL,
+                 min_rate: float = RATE_LIMIT_MIN,
+                 max_rate: float = RATE_LIMIT_MAX,
+                 increase: float = RATE_LIMIT_INCREASE,
+                 decrease: float = RATE_LIMIT_DECREASE,
+                 latency_factor: float = RATE_LIMIT_LATENCY_FACTOR,
+                 baseline_window: float = RATE_LIMIT_BASELINE_WINDOW,
+                 slow_start: bool = RATE_LIMIT_SLOW_START):
+        """初始化速率限制器
+
+        Args:
+            name: 名稱（通常為主機名稱），用於日誌
+            rate: 初始每秒請求數
+            min_rate: 速率下限
+            max_rate: 速率上限
+            increase: 回應正常時，每秒約增加的請求數
+            decrease: 壅塞時速率乘上的係數
+            latency_factor: 平均延遲超過基準延遲幾倍時視為壅塞
+            baseline_window: 基準延遲（長期平均延遲）的時間常數秒數
+            slow_start: 第一次壅塞前是否以慢啟動（約每秒倍增）提高速率
+        """
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.baseline_window = baseline_window
+        self.slow_start = slow_start
+
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency: Optional[float] = None
+        self._baseline: Optional[float] = None
+        self._latency_updated = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """取得一個 token，必要時等待"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                # 容許最多一秒份量的突發請求
+                burst = max(self.rate, 1.0)
+                self._tokens = min(burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+    def on_success(self, latency: float) -> None:
+        """回報一次成功的請求，依延遲變化調整速率"""
+        now = time.monotonic()
+        if self._latency is None:
+            self._latency = self._baseline = latency
+        else:
+            self._latency = 0.8 * self._latency + 0.2 * latency
+            # 基準延遲依經過的時間緩慢跟上平均延遲，不會停在抖動造成的最低值
+            weight = min(1.0, (now - self._latency_updated) / self.baseline_window)
+            self._baseline += (self._latency - self._baseline) * weight
+        self._latency_updated = now
+
+        if self._latency > self.latency_factor * self._baseline:
+            self._slow_down(f"平均延遲升高至 {self._latency:.2f}s（基準 {self._baseline:.2f}s）")
+            # 以目前的平均延遲為新的基準，延遲停在新的水準時不再繼續降速
+            self._baseline = self._latency
+        elif self.slow_start:
+            # 每秒約有 rate 個回應，每個加 1 即約每秒倍增
+            self.rate = min(self.max_rate, self.rate + 1.0)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """回報伺服器限流（429/503），降低速率並視需要暫停
+
+        Args:
+            retry_after: 伺服器要求等待的秒數，超過 RETRY_BACKOFF_MAX 時以 RETRY_BACKOFF_MAX 計
+        """
+        if retry_after:
+            retry_after = min(retry_after, RETRY_BACKOFF_MAX)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._slow_down("伺服器要求降速")
+
+    def _slow_down(self, reason: str) -> None:
+        """乘法減少並結束慢啟動；同一秒內的多次壅塞訊號只計一次"""
+        self.slow_start = False
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        logger.debug(f"{self.name}: {reason}，速率降至 {self.rate:.1f} req/s")
@@ -0,0 +1,196 @@
+# modules/result_store.py
+
+"""結果儲存模組：以 SQLite 保存每個職務最近一次的擷取結果
+
+每筆結果以 (kind, job_code, type_id) 為鍵，記錄原始 JSON、內容雜湊、
+最後擷取時間與最後變更時間。技能資料的 type_id 固定為 0。
+增量執行時只需重新擷取超過有效期限的項目，其餘直接取用儲存的結果。
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from itertools import islice
+
+from .common import (
+    json, logger, Path, get_metrics,
+    Optional, Dict, List, Set, Any, Tuple, Iterable, Iterator
+)
+from config import CACHE_DIR, RESULT_STORE_FILE, SQLITE_BUSY_TIMEOUT
+
+ResultKey = Tuple[str, int]
+
+# iter_fresh 每次查詢的鍵數（低於 SQLite 舊版的 999 個參數上限）
+_READ_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind         TEXT    NOT NULL,
+    job_code     TEXT    NOT NULL,
+    type_id      INTEGER NOT NULL DEFAULT 0,
+    payload      TEXT    NOT NULL,
+    content_hash TEXT    NOT NULL,
+    fetched_at   REAL    NOT NULL,
+    changed_at   REAL    NOT NULL,
+    PRIMARY KEY (kind, job_code, type_id)
+)
+"""
+
+def content_hash(payload: Any) -> str:
+    """計算 JSON 內容的雜湊值（鍵排序後序列化）"""
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class ResultStore:
+    """職務擷取結果的持久化儲存"""
+
+    def __init__(self, db_path: Path):
+        """開啟（或建立）結果資料庫
+
+        Args:
+            db_path: SQLite 檔案路徑
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False,
+                                     timeout=SQLITE_BUSY_TIMEOUT)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def fresh_keys(self, kind: str, max_age: float) -> Set[ResultKey]:
+        """取得仍在有效期限內的結果鍵（不載入內容）
+
+        Args:
+            kind: 資料種類（'skill' 或 'salary'）
+            max_age: 有效秒數，0 表示全部視為過期
+        """
+        if max_age <= 0:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT job_code, type_id FROM results WHERE kind = ? AND fetched_at >= ?",
+                (kind, time.time() - max_age)
+            ).fetchall()
+        return set(rows)
+
+    def iter_fresh(self, kind: str, keys: Iterable[ResultKey],
+                   max_age: float) -> Iterator[Tuple[ResultKey, Any]]:
+        """依 keys 的順序逐筆產出仍在有效期限內的結果
+
+        使用獨立的唯讀連線、每次查詢 _READ_CHUNK 個鍵，內容不會一次全部載入記憶體，
+        迭代期間主連線仍可寫入。
+
+        Args:
+            kind: 資料種類
+            keys: 要查詢的 (job_code, type_id) 列表
+            max_age: 有效秒數，0 表示全部視為過期
+
+        Yields:
+            Tuple[ResultKey, Any]: ((job_code, type_id), 內容)
+        """
+        if max_age <= 0:
+            return
+        keys = iter(keys)
+        since = time.time() - max_age
+        conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_BUSY_TIMEOUT)
+        try:
+            while chunk := list(islice(keys, _READ_CHUNK)):
+                job_codes = list(dict.fromkeys(job_code for job_code, _ in chunk))
+                placeholders = ', '.join('?' * len(job_codes))
+                rows = conn.execute(
+                    "SELECT job_code, type_id, payload FROM results "
+                    f"WHERE kind = ? AND fetched_at >= ? AND job_code IN ({placeholders})",
+                    (kind, since, *job_codes)
+                ).fetchall()
+                payloads = {(job_code, type_id): payload for job_code, type_id, payload in rows}
+                for key in chunk:
+                    if key in payloads:
+                        yield key, json.loads(payloads[key])
+        finally:
+            conn.close()
+
+    def load_fresh(self, kind: str, keys: Iterable[ResultKey],
+                   max_age: float) -> Dict[ResultKey, Any]:
+        """取得仍在有效期限內的結果
+
+        Args:
+            kind: 資料種類（'skill' 或 'salary'）
+            keys: 要查詢的 (job_code, type_id) 列表
+            max_age: 有效秒數，0 表示全部視為過期
+
+        Returns:
+            Dict[ResultKey, Any]: 有效結果，鍵為 (job_code, type_id)
+        """
+        return dict(self.iter_fresh(kind, keys, max_age))
+
+    def save_many(self, kind: str, items: List[Tuple[ResultKey, Any]],
+                  discard: Iterable[Tuple[str, ResultKey]] = ()) -> int:
+        """寫入多筆結果；內容未變更時只更新擷取時間
+
+        Args:
+            kind: 資料種類
+            items: [((job_code, type_id), payload), ...]
+            discard: [(kind, (job_code, type_id)), ...]，在同一交易中刪除的項目，
+                例如被完整紀錄取代的部分資料
+
+        Returns:
+            int: 內容有變更（含新增）的筆數
+        """
+        discard = [(k, job_code, type_id) for k, (job_code, type_id) in discard]
+        if not items and not discard:
+            return 0
+        now = time.time()
+        rows = []
+        for (job_code, type_id), payload in items:
+            rows.append((
+                kind, job_code, type_id,
+                json.dumps(payload, ensure_ascii=False),
+                content_hash(payload), now, now
+            ))
+
+        with self._lock, get_metrics().span(f"store.{kind}"):
+            before = self._conn.total_changes
+            # 先更新內容相同的項目，只刷新擷取時間
+            self._conn.executemany(
+                "UPDATE results SET fetched_at = ? "
+                "WHERE kind = ? AND job_code = ? AND type_id = ? AND content_hash = ?",
+                [(now, r[0], r[1], r[2], r[4]) for r in rows]
+            )
+            unchanged = self._conn.total_changes - before
+            # 新增或內容有變更的項目
+            self._conn.executemany(
+                "INSERT INTO results "
+                "(kind, job_code, type_id, payload, content_hash, fetched_at, changed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (kind, job_code, type_id) DO UPDATE SET "
+                "payload = excluded.payload, content_hash = excluded.content_hash, "
+                "fetched_at = excluded.fetched_at, changed_at = excluded.changed_at "
+                "WHERE results.content_hash != excluded.content_hash",
+                rows
+            )
+            self._conn.executemany(
+                "DELETE FROM results WHERE kind = ? AND job_code = ? AND type_id = ?",
+                discard
+            )
+            self._conn.commit()
+        return len(rows) - unchanged
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+_store: Optional[ResultStore] = None
+_store_lock = threading.Lock()
+
+def get_result_store() -> ResultStore:
+    """取得整個行程共用的結果儲存"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(Path(CACHE_DIR) / RESULT_STORE_FILE)
+            logger.debug(f"結果儲存已開啟: {_store.db_path}")
+        return _store
@@ -1,49 +1,57 @@
 """薪資分析模組：負責分析職缺的薪資資訊"""
 
 from .common import (
-    pd, datetime, logger, OUTPUT_DIR, save_to_csv
-)
-from .fetcher import (
-    fetch_job_categories_json,
-    fetch_single_salary_request
-)
-from .processor import (
-    flatten_job_categories,
-    process_all_salaries
+    logger, write_records, Optional
 )
+from .category_cache import get_job_categories
+from .processor import iter_salary_records, normalize_salary_frame
+from .salary_stats import run_salary_stats
+from config import SALARY_MAX_AGE, OUTPUT_BATCH_SIZE
 
-def run_salary_analysis() -> None:
+def run_salary_analysis(max_age: Optional[float] = None, resume: bool = False,
+                        category: Optional[str] = None,
+                        category_depth: Optional[int] = None) -> None:
     """執行薪資分析
     
     流程:
-    1. 獲取職務類別資料
-    2. 扁平化處理類別
-    3. 獲取薪資資料
-    4. 輸出結果
+    1. 獲取扁平化的職務類別資料（指定 category 時只取其子樹）
+    2. 串流獲取薪資資料
+    3. 分批轉換數值型別並輸出結果
+    4. 彙整歷次薪資快照，輸出加權統計與變化
+
+    Args:
+        max_age: 儲存結果的有效秒數，未提供時使用 SALARY_MAX_AGE
+        resume: 是否從上次中斷的檢查點繼續
+        category: 只分析這些職務類別（以逗號分隔）及其子類別，未提供時分析所有職務
+        category_depth: 只分析到指定類別以下第幾層
     """
     logger.info("===== 開始執行薪資資料分析 =====")
     
     try:
-        # 1. 獲取並處理職務類別
-        categories_json = fetch_job_categories_json()
-        if not categories_json:
+        # 1. 獲取扁平化的職務類別（行程內與磁碟快取）
+        df_jobcat = get_job_categories(root=category, max_depth=category_depth)
+        if df_jobcat is None or df_jobcat.empty:
             logger.error("無法獲取職務類別資料")
             return
-
-        # 2. 扁平化類別資料
-        flattened_cats = flatten_job_categories(categories_json)
-        df_jobcat = pd.DataFrame(flattened_cats)
-        df_jobcat = df_jobcat.sort_values(by='job_code').reset_index(drop=True)
+        if category or category_depth is not None:
+            logger.info(f"只分析選取的 {len(df_jobcat)} 個職務類別")
         job_codes = df_jobcat['job_code'].tolist()
 
-        # 3. 處理薪資資料
-        df_salaries = process_all_salaries(job_codes)
-        if df_salaries is not None and not df_salaries.empty:
-            # 儲存資料
-            save_to_csv(df_salaries, "104_salaries")
-            logger.info(f"已處理 {len(df_salaries)} 筆薪資資料")
+        # 2. 串流處理薪資資料
+        salaries = iter_salary_records(job_codes, SALARY_MAX_AGE if max_age is None else max_age,
+                                       resume=resume)
+
+        # 3. 分批儲存資料
+        rows = write_records(salaries, "104_salaries", OUTPUT_BATCH_SIZE,
+                             transform=normalize_salary_frame)
+        if rows:
+            logger.info(f"已處理 {rows} 筆薪資資料")
         else:
             logger.error("薪資資料處理失敗")
+            return
+
+        # 4. 薪資統計
+        run_salary_stats(df_jobcat)
             
     except Exception as e:
         logger.error(f"薪資分析過程中發生錯誤: {str(e)}")
@@ -0,0 +1,251 @@
+# modules/salary_stats.py
+
+"""薪資統計模組：以向量化運算彙整每日薪資快照
+
+每天的 `104_salaries_YYYYMMDD` 是一份薪資快照。本模組將多天的快照載入為
+固定型別的 NumPy 陣列（`SalaryTable`），再以 `np.unique` 分組、`np.bincount`
+加權加總，計算：
+- 依 (日期, 父類別, 年資區間, 薪資類型) 分組、以 sampleCount 加權的
+  平均薪資與 25/50/75 百分位
+- 年薪除以 SALARY_MONTHS_PER_YEAR 換算為月薪，使月薪與年薪可直接比較
+- 同一組別與前一份快照相比的變化量
+
+整個計算沒有逐列的 Python 迴圈，一年份的每日快照（約 2 百萬列）可在數秒內完成。
+"""
+
+from dataclasses import dataclass
+
+from .common import (
+    pd, np, datetime, logger, Path, save_dataframe, get_metrics,
+    Optional, Dict, Tuple, Iterable
+)
+from .processor import SALARY_FLOAT_COLUMNS
+from config import (
+    OUTPUT_DIR, ALL_SALARY_TYPES, SALARY_MONTHS_PER_YEAR, SALARY_HISTORY_DAYS
+)
+
+SALARY_SNAPSHOT_PREFIX = "104_salaries"
+SNAPSHOT_COLUMNS = ['job_code', 'salary_type', 'analyzeCode', 'desc', 'sampleCount',
+                    *SALARY_FLOAT_COLUMNS]
+YEARLY_TYPE_ID = 2  # ALL_SALARY_TYPES 中年薪的代碼
+
+@dataclass
+class SalaryTable:
+    """多天薪資快照的欄式資料
+
+    每個陣列長度相同，一個位置對應快照中的一列；
+    薪資已換算為月薪，無父類別的職務不會載入。
+    """
+
+    day: np.ndarray           # datetime64[D]，快照日期
+    parent: np.ndarray        # int32，parent_codes 的索引
+    band: np.ndarray          # int8，年資區間（analyzeCode）
+    salary_type: np.ndarray   # int8，薪資類型代碼（ALL_SALARY_TYPES 的鍵）
+    values: np.ndarray        # float64 (列數, 4)，依 SALARY_FLOAT_COLUMNS 順序的月薪
+    samples: np.ndarray       # float64，樣本數（sampleCount）
+    parent_codes: np.ndarray  # 父類別代碼
+    parent_names: np.ndarray  # 父類別名稱
+    band_labels: Dict[int, str]
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+def salary_snapshot_files(output_dir: Optional[Path] = None,
+                          days: int = SALARY_HISTORY_DAYS) -> Dict[str, Path]:
+    """找出輸出目錄中最近幾天的薪資快照
+
+    同一天同時有 Parquet 與 CSV 時使用 Parquet。
+
+    Returns:
+        Dict[str, Path]: 以日期（YYYYMMDD）排序的快照檔
+    """
+    output_dir = output_dir or Path(OUTPUT_DIR)
+    files: Dict[str, Path] = {}
+    for fmt in ('csv', 'parquet'):
+        for path in output_dir.glob(f"{SALARY_SNAPSHOT_PREFIX}_*.{fmt}"):
+            date = path.stem.rsplit('_', 1)[-1]
+            if len(date) == 8 and date.isdigit():
+                files[date] = path
+    return dict(sorted(files.items())[-days:] if days else sorted(files.items()))
+
+def read_salary_snapshot(path: Path) -> pd.DataFrame:
+    """只讀取薪資統計需要的欄位"""
+    if path.suffix == '.parquet':
+        return pd.read_parquet(path, columns=SNAPSHOT_COLUMNS)
+    return pd.read_csv(path, usecols=SNAPSHOT_COLUMNS, encoding='utf-8-sig', engine='pyarrow')
+
+def build_salary_table(snapshots: Iterable[Tuple[str, pd.DataFrame]],
+                       df_jobcat: pd.DataFrame) -> SalaryTable:
+    """將多天的薪資快照轉為 SalaryTable
+
+    Args:
+        snapshots: (日期 YYYYMMDD, 快照 DataFrame) 的序列
+        df_jobcat: 扁平化的職務類別，用於對應父類別
+
+    Returns:
+        SalaryTable: 合併後的欄式資料
+    """
+    # 職務代碼 → 父類別索引的查詢表（依職務代碼排序後以二分搜尋對應）
+    job_codes = pd.to_numeric(df_jobcat['job_code'], errors='coerce').to_numpy('float64')
+    parent_codes, parent_index = np.unique(df_jobcat['parent_code'].astype(str).to_numpy(),
+                                           return_inverse=True)
+    parent_names = (df_jobcat.assign(parent_code=df_jobcat['parent_code'].astype(str))
+                    .drop_duplicates('parent_code').set_index('parent_code')
+                    .loc[parent_codes, 'parent_name'].to_numpy())
+    order = np.argsort(job_codes)
+    sorted_codes, sorted_parents = job_codes[order], parent_index[order].astype(np.int32)
+
+    dates, frames = [], []
+    for date, df in snapshots:
+        dates.append(np.full(len(df), np.datetime64(f"{date[:4]}-{date[4:6]}-{date[6:]}", 'D')))
+        frames.append(df[SNAPSHOT_COLUMNS])
+    if not frames:
+        return SalaryTable(np.array([], 'datetime64[D]'), np.array([], np.int32),
+                           np.array([], np.int8), np.array([], np.int8),
+                           np.empty((0, len(SALARY_FLOAT_COLUMNS))), np.array([]),
+                           parent_codes, parent_names, {})
+    df = pd.concat(frames, ignore_index=True)
+
+    # 對應父類別與薪資類型，丟棄無法對應的列
+    codes = pd.to_numeric(df['job_code'], errors='coerce').to_numpy('float64')
+    pos = np.minimum(np.searchsorted(sorted_codes, codes), len(sorted_codes) - 1)
+    salary_type = np.zeros(len(df), dtype=np.int8)
+    labels = df['salary_type'].to_numpy()
+    for type_id, label in ALL_SALARY_TYPES.items():
+        salary_type[labels == label] = type_id
+    keep = (sorted_codes[pos] == codes) & (salary_type > 0)
+
+    band = pd.to_numeric(df['analyzeCode'], errors='coerce').fillna(0).to_numpy('int8')
+    bands, first = np.unique(band, return_index=True)
+    band_labels = dict(zip(bands.tolist(), df['desc'].to_numpy()[first].tolist()))
+
+    values = np.column_stack([
+        pd.to_numeric(df[column], errors='coerce').to_numpy('float64', na_value=np.nan)
+        for column in SALARY_FLOAT_COLUMNS
+    ])[keep]
+    salary_type = salary_type[keep]
+    # 年薪換算為月薪
+    values[salary_type == YEARLY_TYPE_ID] /= SALARY_MONTHS_PER_YEAR
+
+    return SalaryTable(
+        day=np.concatenate(dates)[keep],
+        parent=sorted_parents[pos[keep]],
+        band=band[keep],
+        salary_type=salary_type,
+        values=values,
+        samples=pd.to_numeric(df['sampleCount'], errors='coerce').fillna(0).to_numpy('float64')[keep],
+        parent_codes=parent_codes,
+        parent_names=parent_names,
+        band_labels=band_labels,
+    )
+
+def load_salary_table(df_jobcat: pd.DataFrame, output_dir: Optional[Path] = None,
+                      days: int = SALARY_HISTORY_DAYS) -> SalaryTable:
+    """讀取最近幾天的薪資快照
+
+    Args:
+        df_jobcat: 扁平化的職務類別
+        output_dir: 快照所在目錄，未提供時為 OUTPUT_DIR
+        days: 最多讀取的快照天數，0 表示全部
+
+    Returns:
+        SalaryTable: 合併後的欄式資料
+    """
+    files = salary_snapshot_files(output_dir, days)
+    with get_metrics().span("load.salary_snapshots"):
+        snapshots = ((date, read_salary_snapshot(path)) for date, path in files.items())
+        return build_salary_table(snapshots, df_jobcat)
+
+def aggregate_salaries(table: SalaryTable) -> pd.DataFrame:
+    """依 (日期, 父類別, 年資區間, 薪資類型) 計算以樣本數加權的薪資統計
+
+    各薪資欄位分別只計入該欄有值且樣本數大於 0 的列。每一組另計算與
+    前一份快照中同一組別相比的 salary50 與樣本數變化。
+
+    Returns:
+        pd.DataFrame: 依組別、日期排序的統計結果
+    """
+    if not len(table):
+        return pd.DataFrame()
+
+    # 組成單一整數鍵：日期放在最低位，排序後同一組別的各天相鄰
+    days, day_index = np.unique(table.day, return_inverse=True)
+    n_days, n_bands, n_types = len(days), 256, len(ALL_SALARY_TYPES) + 1
+    series_key = ((table.parent.astype(np.int64) * n_bands + table.band.astype(np.uint8))
+                  * n_types + table.salary_type)
+    keys, group = np.unique(series_key * n_days + day_index, return_inverse=True)
+    n_groups = len(keys)
+
+    weights = np.where(table.samples > 0, table.samples, 0.0)
+    job_count = np.bincount(group, minlength=n_groups)
+    sample_count = np.bincount(group, weights=weights, minlength=n_groups)
+
+    stats = {}
+    for i, column in enumerate(SALARY_FLOAT_COLUMNS):
+        values = table.values[:, i]
+        valid = np.isfinite(values) & (weights > 0)
+        w = np.where(valid, weights, 0.0)
+        total = np.bincount(group, weights=w * np.where(valid, values, 0.0), minlength=n_groups)
+        weight = np.bincount(group, weights=w, minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            stats[column] = np.where(weight > 0, total / weight, np.nan)
+
+    # 拆解鍵值
+    day_of = keys % n_days
+    series = keys // n_days
+    salary_type = series % n_types
+    band = (series // n_types) % n_bands
+    parent = series // (n_types * n_bands)
+
+    # 與前一份快照比較（同一組別的前一列）
+    same_series = np.zeros(n_groups, dtype=bool)
+    same_series[1:] = series[1:] == series[:-1]
+    prev = np.maximum(np.arange(n_groups) - 1, 0)
+    median = stats['salary50']
+    with np.errstate(invalid='ignore', divide='ignore'):
+        median_change = np.where(same_series, median - median[prev], np.nan)
+        median_pct = np.where(same_series, median_change / median[prev] * 100, np.nan)
+    sample_change = np.where(same_series, sample_count - sample_count[prev], np.nan)
+
+    type_labels = np.array([ALL_SALARY_TYPES.get(i, '') for i in range(n_types)], dtype=object)
+    band_labels = np.array([table.band_labels.get(i, '') for i in range(n_bands)], dtype=object)
+    return pd.DataFrame({
+        'date': days[day_of],
+        'parent_code': table.parent_codes[parent],
+        'parent_name': table.parent_names[parent],
+        'analyzeCode': band.astype(np.int16),
+        'desc': band_labels[band],
+        'salary_type': type_labels[salary_type],
+        'job_count': job_count,
+        'sample_count': sample_count,
+        **stats,
+        'prev_date': np.where(same_series, days[day_of[prev]], np.datetime64('NaT')),
+        'salary50_change': median_change,
+        'salary50_pct_change': median_pct,
+        'sample_count_change': sample_change,
+    })
+
+def run_salary_stats(df_jobcat: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """彙整薪資快照並輸出最新一天的統計與變化
+
+    結果寫入 `104_salary_stats_YYYYMMDD`。
+
+    Args:
+        df_jobcat: 扁平化的職務類別
+
+    Returns:
+        Optional[pd.DataFrame]: 所有快照的統計結果；沒有快照時為 None
+    """
+    start = datetime.now()
+    table = load_salary_table(df_jobcat)
+    if not len(table):
+        logger.warning("沒有可供統計的薪資快照")
+        return None
+
+    with get_metrics().span("aggregate.salaries"):
+        df_stats = aggregate_salaries(table)
+    latest = df_stats[df_stats['date'] == df_stats['date'].max()]
+    save_dataframe(latest, "104_salary_stats")
+    logger.info(f"已彙整 {np.unique(table.day).size} 天、{len(table)} 筆薪資資料為 "
+                f"{len(df_stats)} 組統計（{(datetime.now() - start).total_seconds():.1f}s）")
+    return df_stats
@@ -0,0 +1,123 @@
+# modules/scheduler.py
+
+"""階段排程模組：依相依關係並行執行各分析階段
+
+各階段在獨立執行緒中執行，某階段的所有相依階段成功完成後才會開始；
+相依階段失敗時，後續階段會被略過。網路請求仍由共用的 HTTP 引擎處理，
+因此所有階段共用同一個並發上限 (MAX_CONCURRENCY) 與各主機的速率限制，
+同時執行多個階段不會增加對伺服器的總請求壓力。
+
+使用範例：
+    scheduler = PhaseScheduler()
+    scheduler.add('categories', load_categories, label='職務類別載入')
+    scheduler.add('skill', run_skill_analysis, depends=['categories'], label='技能分析')
+    results = scheduler.run()
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .logger_setup import logger
+from .metrics import get_metrics
+
+
+@dataclass
+class Phase:
+    """單一分析階段"""
+
+    name: str
+    func: Callable[[], Any]
+    depends: Tuple[str, ...] = ()
+    label: str = ''
+
+
+@dataclass
+class PhaseResult:
+    """階段執行結果；status 為 'ok'、'failed' 或 'skipped'"""
+
+    name: str
+    status: str
+    elapsed: float = 0.0
+    error: Optional[BaseException] = None
+
+
+class PhaseScheduler:
+    """以相依關係圖排程分析階段"""
+
+    def __init__(self):
+        self.phases: Dict[str, Phase] = {}
+
+    def add(self, name: str, func: Callable[[], Any],
+            depends: Iterable[str] = (), label: Optional[str] = None) -> None:
+        """加入一個階段
+
+        Args:
+            name: 階段名稱（唯一）
+            func: 階段主體，不接受參數
+            depends: 必須先完成的階段名稱
+            label: 日誌中顯示的名稱，未提供時使用 name
+
+        Raises:
+            ValueError: 名稱重複，或相依階段尚未加入（因此相依關係不會形成循環）
+        """
+        if name in self.phases:
+            raise ValueError(f"階段名稱重複: {name}")
+        depends = tuple(depends)
+        unknown = [dep for dep in depends if dep not in self.phases]
+        if unknown:
+            raise ValueError(f"階段 {name} 的相依階段尚未加入: {', '.join(unknown)}")
+        self.phases[name] = Phase(name, func, depends, label or name)
+
+    def _execute(self, phase: Phase) -> PhaseResult:
+        """在工作執行緒中執行單一階段"""
+        logger.info(f"===== 開始執行{phase.label} =====")
+        start = time.perf_counter()
+        try:
+            with get_metrics().span(f"phase.{phase.name}"):
+                phase.func()
+        except Exception as e:
+            logger.error(f"{phase.label}過程中發生錯誤: {str(e)}")
+            return PhaseResult(phase.name, 'failed', time.perf_counter() - start, e)
+        elapsed = time.perf_counter() - start
+        logger.info(f"===== {phase.label}執行完畢（{elapsed:.1f}s） =====")
+        return PhaseResult(phase.name, 'ok', elapsed)
+
+    def run(self) -> Dict[str, PhaseResult]:
+        """執行所有階段並等待完成
+
+        Returns:
+            Dict[str, PhaseResult]: 各階段的執行結果，依加入順序排列
+        """
+        results: Dict[str, PhaseResult] = {}
+        waiting: List[Phase] = list(self.phases.values())
+        running: Dict[Future, Phase] = {}
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(len(waiting), 1),
+                                thread_name_prefix="phase") as executor:
+            while waiting or running:
+                for phase in list(waiting):
+                    statuses = [results[dep].status if dep in results else None
+                                for dep in phase.depends]
+                    if any(status in ('failed', 'skipped') for status in statuses):
+                        logger.warning(f"相依階段未成功完成，略過{phase.label}")
+                        results[phase.name] = PhaseResult(phase.name, 'skipped')
+                        waiting.remove(phase)
+                    elif all(status == 'ok' for status in statuses):
+                        running[executor.submit(self._execute, phase)] = phase
+                        waiting.remove(phase)
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    phase = running.pop(future)
+                    results[phase.name] = future.result()
+
+        total = time.perf_counter() - start
+        summary = '、'.join(f"{self.phases[name].label} {result.elapsed:.1f}s"
+                           for name, result in results.items() if result.status == 'ok')
+        logger.info(f"所有階段執行完畢，總耗時 {total:.1f}s" + (f"（{summary}）" if summary else ''))
+        return {name: results[name] for name in self.phases}
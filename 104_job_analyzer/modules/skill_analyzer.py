@@ -1,60 +1,88 @@
 """技能分析模組：負責分析職缺所需的技能資訊"""
 
 from .common import (
-    pd, datetime, logger, OUTPUT_DIR, save_to_csv
-)
-from .fetcher import (
-    fetch_job_categories_json,
-    fetch_single_skill_request
-)
-from .processor import (
-    flatten_job_categories,
-    process_all_skills
+    pd, logger, write_records, get_metrics,
+    Optional, Dict, List, Iterable, Iterator
 )
+from .category_cache import get_job_categories
+from .processor import iter_skill_records
+from .skill_index import SkillIndexBuilder, save_skill_index, rebuild_skill_index
+from config import SKILL_MAX_AGE, OUTPUT_BATCH_SIZE
+
+def join_categories(df_jobcat: pd.DataFrame, skills: Iterable[Dict]) -> Iterator[Dict]:
+    """逐筆將技能紀錄與所屬職務類別合併（等同以 job_code 做 inner join）
+
+    輸出依技能紀錄的順序，同一職務的多個類別依職務類別表的順序。
+
+    Args:
+        df_jobcat: 扁平化的職務類別
+        skills: 技能紀錄的迭代器
+
+    Yields:
+        Dict: 職務類別欄位在前、技能欄位在後的合併紀錄
+    """
+    # 職務代碼一律以字串比對與輸出
+    categories: Dict[str, List[Dict]] = {}
+    for row in df_jobcat.to_dict('records'):
+        row['job_code'] = str(row['job_code'])
+        categories.setdefault(row['job_code'], []).append(row)
+
+    metrics = get_metrics()
+    for skill_json in skills:
+        with metrics.span("merge.skills"):
+            job_code = str(skill_json.get('jobCode'))
+            merged = [{**category, **skill_json, 'jobCode': job_code}
+                      for category in categories.get(job_code, ())]
+        yield from merged
 
-def run_skill_analysis() -> None:
+def run_skill_analysis(max_age: Optional[float] = None, resume: bool = False,
+                       category: Optional[str] = None,
+                       category_depth: Optional[int] = None) -> None:
     """執行技能分析
     
     流程:
-    1. 獲取職務類別資料
-    2. 扁平化處理類別
-    3. 獲取技能資料
-    4. 合併並輸出結果
+    1. 獲取扁平化的職務類別資料（指定 category 時只取其子樹）
+    2. 串流獲取技能資料
+    3. 逐筆合併職務類別並分批輸出結果，同時收集技能反向索引
+    4. 寫入技能反向索引
+
+    Args:
+        max_age: 儲存結果的有效秒數，未提供時使用 SKILL_MAX_AGE
+        resume: 是否從上次中斷的檢查點繼續
+        category: 只分析這些職務類別（以逗號分隔）及其子類別，未提供時分析所有職務
+        category_depth: 只分析到指定類別以下第幾層
     """
     logger.info("===== 開始執行技能資料分析 =====")
     
     try:
-        # 1. 獲取並處理職務類別
-        categories_json = fetch_job_categories_json()
-        if not categories_json:
+        # 1. 獲取扁平化的職務類別（行程內與磁碟快取）
+        df_jobcat = get_job_categories(root=category, max_depth=category_depth)
+        if df_jobcat is None or df_jobcat.empty:
             logger.error("無法獲取職務類別資料")
             return
-            
-        # 2. 扁平化類別資料
-        flattened_cats = flatten_job_categories(categories_json)
-        df_jobcat = pd.DataFrame(flattened_cats)
-        df_jobcat = df_jobcat.sort_values(by='job_code').reset_index(drop=True)
+        if category or category_depth is not None:
+            logger.info(f"只分析選取的 {len(df_jobcat)} 個職務類別")
         job_codes = df_jobcat['job_code'].tolist()
-        
-        # 3. 處理技能資料
-        df_skills = process_all_skills(job_codes)
-        if df_skills is not None and not df_skills.empty:
-            # 將 job_code 設為 object 類型以利合併
-            df_jobcat['job_code'] = df_jobcat['job_code'].astype(str)
-            df_skills['jobCode'] = df_skills['jobCode'].astype(str)
-            
-            # 合併資料並儲存
-            final_df = pd.merge(
-                df_jobcat,
-                df_skills,
-                left_on='job_code',
-                right_on='jobCode',
-                how='inner'
-            )
-            save_to_csv(final_df, "104_skills")
-            logger.info(f"已處理 {len(final_df)} 筆技能資料")
+
+        # 2. 串流處理技能資料
+        skills = iter_skill_records(job_codes, SKILL_MAX_AGE if max_age is None else max_age,
+                                    resume=resume)
+
+        # 3. 合併資料並分批儲存
+        index_builder = SkillIndexBuilder()
+        rows = write_records(join_categories(df_jobcat, index_builder.collect(skills)),
+                             "104_skills", OUTPUT_BATCH_SIZE)
+        if rows:
+            logger.info(f"已處理 {rows} 筆技能資料")
         else:
             logger.error("技能資料處理失敗")
+            return
+
+        # 4. 技能反向索引；只分析部分類別時改以結果儲存中所有職務重建，索引才不會只剩子樹
+        if category or category_depth is not None:
+            rebuild_skill_index()
+        else:
+            save_skill_index(index_builder.build())
             
     except Exception as e:
         logger.error(f"技能分析過程中發生錯誤: {str(e)}")
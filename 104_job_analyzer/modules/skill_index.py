@@ -0,0 +1,295 @@
+# modules/skill_index.py
+
+"""技能反向索引模組：預先計算技能與職務的對應與技能共現次數
+
+索引包含三個以 CSR（壓縮列）格式保存的稀疏結構：
+- 技能 → 需要此技能的職務
+- 職務 → 職務所需的技能
+- 技能 × 技能的共現次數（同一職務同時需要兩項技能的職務數）
+
+技能涵蓋 hardSkillList、hardToolList、hardCertList 三類，以 104 的技能 id 識別。
+索引以 `.npz` 存於 CACHE_DIR，載入後每次查詢只需一次字典查詢與陣列切片。
+
+命令列查詢：
+    python -m modules.skill_index jobs Python
+    python -m modules.skill_index skills 2007001004
+    python -m modules.skill_index cooccur Python --top 10
+    python -m modules.skill_index build
+"""
+
+import threading
+import time
+from array import array
+
+from .common import (
+    np, argparse, sys, logger, Path, get_metrics,
+    Optional, Dict, List, Tuple, Any, Iterable, Iterator
+)
+from config import CACHE_DIR, SKILL_INDEX_FILE
+
+# 技能類別：(技能資料中的欄位, 輸出的類別名稱)
+SKILL_KINDS = (
+    ('hardSkillList', 'skill'),
+    ('hardToolList', 'tool'),
+    ('hardCertList', 'cert'),
+)
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """將 (列, 欄) 配對轉為依列排序的 CSR 索引 (indptr, indices)"""
+    order = np.lexsort((cols, rows))
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+class SkillIndexBuilder:
+    """逐筆收集技能資料並建立 SkillIndex"""
+
+    def __init__(self):
+        self._jobs: Dict[str, str] = {}
+        self._skills: Dict[str, Tuple[str, str]] = {}
+        # 每個代碼只保存一次，(職務, 技能) 配對以整數編號存於 array 中
+        self._job_no: Dict[str, int] = {}
+        self._skill_no: Dict[str, int] = {}
+        self._pair_jobs = array('i')
+        self._pair_skills = array('i')
+
+    def add(self, skill_json: Dict[str, Any]) -> None:
+        """加入單一職務的技能資料（含 jobCode 與三類技能列表）"""
+        job_code = str(skill_json.get('jobCode') or '')
+        if not job_code or job_code in self._jobs:
+            return
+        self._jobs[job_code] = skill_json.get('jobName') or ''
+        job_no = self._job_no.setdefault(job_code, len(self._job_no))
+        for field, kind in SKILL_KINDS:
+            for item in skill_json.get(field) or ():
+                skill_id = str(item.get('id') or '')
+                if not skill_id:
+                    continue
+                self._skills.setdefault(skill_id, (item.get('name') or '', kind))
+                self._pair_jobs.append(job_no)
+                self._pair_skills.append(self._skill_no.setdefault(skill_id, len(self._skill_no)))
+
+    def collect(self, skills: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """原樣產出技能資料，同時加入索引；可直接串接在擷取流程中"""
+        for skill_json in skills:
+            self.add(skill_json)
+            yield skill_json
+
+    def build(self) -> "SkillIndex":
+        """建立索引
+
+        共現次數以職務為單位展開每一對技能後一次計數，不逐職務迴圈。
+        """
+        job_codes = np.array(sorted(self._jobs), dtype=str)
+        skill_ids = np.array(sorted(self._skills), dtype=str)
+        job_names = np.array([self._jobs[code] for code in job_codes.tolist()], dtype=str)
+        skill_names = np.array([self._skills[sid][0] for sid in skill_ids.tolist()], dtype=str)
+        skill_kinds = np.array([self._skills[sid][1] for sid in skill_ids.tolist()], dtype=str)
+
+        if self._pair_jobs:
+            # 收集時的編號 → 排序後的位置
+            job_rank = np.searchsorted(job_codes, np.array(list(self._job_no), dtype=str))
+            skill_rank = np.searchsorted(skill_ids, np.array(list(self._skill_no), dtype=str))
+            jobs = job_rank[np.frombuffer(self._pair_jobs, dtype=np.int32)]
+            skills = skill_rank[np.frombuffer(self._pair_skills, dtype=np.int32)]
+            # 同一職務重複列出的技能只計一次
+            unique = np.unique(jobs.astype(np.int64) * len(skill_ids) + skills)
+            jobs, skills = unique // len(skill_ids), unique % len(skill_ids)
+        else:
+            jobs = skills = np.array([], dtype=np.int64)
+
+        job_indptr, job_skills = _csr(jobs, skills, len(job_codes))
+        skill_indptr, skill_jobs = _csr(skills, jobs, len(skill_ids))
+
+        # 展開每個職務的技能配對：第 i 筆 (職務, 技能) 與同職務的每一筆配對
+        per_job = np.diff(job_indptr)
+        repeats = per_job[jobs] if len(jobs) else np.array([], dtype=np.int64)
+        left = np.repeat(job_skills, repeats)
+        starts = np.repeat(job_indptr[:-1][jobs], repeats)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        right = job_skills[starts + offsets] if len(left) else left
+        distinct = left != right
+        pair_keys, counts = np.unique(left[distinct].astype(np.int64) * len(skill_ids)
+                                      + right[distinct], return_counts=True)
+        co_rows, co_cols = pair_keys // len(skill_ids), pair_keys % len(skill_ids)
+        co_indptr = np.zeros(len(skill_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(co_rows, minlength=len(skill_ids)), out=co_indptr[1:])
+
+        return SkillIndex({
+            'job_codes': job_codes, 'job_names': job_names,
+            'skill_ids': skill_ids, 'skill_names': skill_names, 'skill_kinds': skill_kinds,
+            'job_indptr': job_indptr, 'job_skills': job_skills,
+            'skill_indptr': skill_indptr, 'skill_jobs': skill_jobs,
+            'co_indptr': co_indptr, 'co_skills': co_cols.astype(np.int32),
+            'co_counts': counts.astype(np.int32),
+        })
+
+class SkillIndex:
+    """唯讀的技能反向索引"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        """以陣列建立索引；一般應使用 SkillIndexBuilder.build() 或 SkillIndex.load()"""
+        self.arrays = arrays
+        for name, values in arrays.items():
+            setattr(self, name, values)
+        self._job_pos = {code: i for i, code in enumerate(self.job_codes.tolist())}
+        self._skill_pos = {sid: i for i, sid in enumerate(self.skill_ids.tolist())}
+        # 技能名稱不分大小寫也可查詢；同名技能以 id 較小者為準
+        self._name_pos: Dict[str, int] = {}
+        for i, name in enumerate(self.skill_names.tolist()):
+            self._name_pos.setdefault(name.casefold(), i)
+
+    @classmethod
+    def load(cls, path: Path) -> "SkillIndex":
+        """讀取索引檔"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls({name: data[name] for name in data.files})
+
+    def save(self, path: Path) -> None:
+        """寫入索引檔（先寫暫存檔再改名，查詢端不會讀到寫到一半的檔案）"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.stem + '.tmp.npz')
+        np.savez(tmp_path, **self.arrays)
+        tmp_path.replace(path)
+
+    def __len__(self) -> int:
+        return len(self.skill_ids)
+
+    def _skill(self, skill: str) -> Optional[int]:
+        """以技能 id 或名稱取得技能位置"""
+        pos = self._skill_pos.get(skill)
+        return pos if pos is not None else self._name_pos.get(skill.casefold())
+
+    def _skill_info(self, pos: int) -> Dict[str, str]:
+        return {'id': str(self.skill_ids[pos]), 'name': str(self.skill_names[pos]),
+                'kind': str(self.skill_kinds[pos])}
+
+    def jobs_for_skill(self, skill: str) -> List[Dict[str, str]]:
+        """需要某項技能的職務
+
+        Args:
+            skill: 技能 id 或名稱（不分大小寫）
+
+        Returns:
+            List[Dict[str, str]]: 含 job_code 與 job_name，依職務代碼排序；查無技能時為空列表
+        """
+        pos = self._skill(skill)
+        if pos is None:
+            return []
+        jobs = self.skill_jobs[self.skill_indptr[pos]:self.skill_indptr[pos + 1]]
+        return [{'job_code': code, 'job_name': name} for code, name in
+                zip(self.job_codes[jobs].tolist(), self.job_names[jobs].tolist())]
+
+    def skills_for_job(self, job_code: str) -> List[Dict[str, str]]:
+        """職務所需的技能
+
+        Returns:
+            List[Dict[str, str]]: 含 id、name、kind；查無職務時為空列表
+        """
+        pos = self._job_pos.get(str(job_code))
+        if pos is None:
+            return []
+        return [self._skill_info(i) for i in
+                self.job_skills[self.job_indptr[pos]:self.job_indptr[pos + 1]].tolist()]
+
+    def cooccurring(self, skill: str, top: int = 20) -> List[Dict[str, Any]]:
+        """與某項技能最常同時出現的技能
+
+        Args:
+            skill: 技能 id 或名稱（不分大小寫）
+            top: 最多回傳的筆數
+
+        Returns:
+            List[Dict[str, Any]]: 含 id、name、kind 與 count（同時需要兩者的職務數），依次數由多到少排序
+        """
+        pos = self._skill(skill)
+        if pos is None:
+            return []
+        start, end = self.co_indptr[pos], self.co_indptr[pos + 1]
+        counts = self.co_counts[start:end]
+        order = np.argsort(-counts, kind='stable')[:top]
+        return [{**self._skill_info(int(self.co_skills[start + i])), 'count': int(counts[i])}
+                for i in order.tolist()]
+
+_index: Optional[SkillIndex] = None
+_index_lock = threading.Lock()
+
+def skill_index_path() -> Path:
+    """索引檔路徑"""
+    return Path(CACHE_DIR) / SKILL_INDEX_FILE
+
+def save_skill_index(index: SkillIndex) -> None:
+    """寫入索引檔並取代行程內已載入的索引"""
+    global _index
+    with get_metrics().span("store.skill_index"):
+        index.save(skill_index_path())
+    with _index_lock:
+        _index = index
+    logger.info(f"技能索引已更新：{len(index.skill_ids)} 項技能、{len(index.job_codes)} 個職務、"
+                f"{len(index.co_skills)} 組共現")
+
+def get_skill_index() -> Optional[SkillIndex]:
+    """取得整個行程共用的技能索引；索引檔不存在時回傳 None"""
+    global _index
+    with _index_lock:
+        if _index is None and skill_index_path().exists():
+            _index = SkillIndex.load(skill_index_path())
+        return _index
+
+def rebuild_skill_index() -> Optional[SkillIndex]:
+    """以結果儲存中所有的技能資料重建索引"""
+    from .result_store import get_result_store
+
+    store = get_result_store()
+    keys = store.fresh_keys('skill', float('inf'))
+    if not keys:
+        logger.warning("結果儲存中沒有技能資料，請先執行 --mode skill")
+        return None
+    builder = SkillIndexBuilder()
+    for _, skill_json in store.iter_fresh('skill', keys, float('inf')):
+        builder.add(skill_json)
+    index = builder.build()
+    save_skill_index(index)
+    return index
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """技能索引查詢的命令列介面"""
+    parser = argparse.ArgumentParser(prog='python -m modules.skill_index',
+                                     description='查詢技能反向索引')
+    commands = parser.add_subparsers(dest='command', required=True)
+    jobs = commands.add_parser('jobs', help='需要某項技能的職務')
+    jobs.add_argument('skill', help='技能 id 或名稱')
+    skills = commands.add_parser('skills', help='職務所需的技能')
+    skills.add_argument('job_code', help='職務代碼')
+    cooccur = commands.add_parser('cooccur', help='與某項技能最常同時出現的技能')
+    cooccur.add_argument('skill', help='技能 id 或名稱')
+    cooccur.add_argument('--top', type=int, default=20, help='最多列出的筆數')
+    commands.add_parser('build', help='以結果儲存中的技能資料重建索引')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        return 0 if rebuild_skill_index() is not None else 1
+
+    index = get_skill_index()
+    if index is None:
+        print(f"找不到技能索引 {skill_index_path()}，請先執行 --mode skill 或 build", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    if args.command == 'jobs':
+        rows = index.jobs_for_skill(args.skill)
+        lines = [f"{row['job_code']}\t{row['job_name']}" for row in rows]
+    elif args.command == 'skills':
+        rows = index.skills_for_job(args.job_code)
+        lines = [f"{row['id']}\t{row['kind']}\t{row['name']}" for row in rows]
+    else:
+        rows = index.cooccurring(args.skill, args.top)
+        lines = [f"{row['count']}\t{row['id']}\t{row['kind']}\t{row['name']}" for row in rows]
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print('\n'.join(lines) if lines else '查無資料')
+    print(f"{len(rows)} 筆（{elapsed:.3f} ms）", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
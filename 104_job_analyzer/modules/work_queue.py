@@ -0,0 +1,254 @@
+# modules/work_queue.py
+
+"""工作佇列模組：以 SQLite 保存可由多個行程共同領取的擷取工作
+
+每筆工作以 (佇列名稱, 鍵) 識別，狀態依序為 pending → leased → done，
+失敗時退回 pending，嘗試超過 WORK_QUEUE_MAX_ATTEMPTS 次即標記為 failed。
+
+工作者以 lease() 一次領取一批工作並取得 WORK_QUEUE_LEASE_SECONDS 秒的租約；
+工作者中斷時租約到期，工作會由其他工作者重新領取。領取以 BEGIN IMMEDIATE
+交易進行，多個行程（或共用同一個 cache 目錄的多個容器）同時領取也不會重複。
+complete()/release() 只更新仍由該工作者持有租約的工作：租約到期並被他人
+接手後，原工作者遲來的結果不會覆寫新的租約。
+"""
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from .common import (
+    json, logger, Path,
+    Optional, Dict, List, Any, Tuple, Iterable, Iterator
+)
+from config import (
+    CACHE_DIR, WORK_QUEUE_FILE, WORK_QUEUE_LEASE_SECONDS, WORK_QUEUE_MAX_ATTEMPTS,
+    SQLITE_BUSY_TIMEOUT
+)
+
+STATUS_PENDING = 'pending'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    queue         TEXT    NOT NULL,
+    key           TEXT    NOT NULL,
+    payload       TEXT    NOT NULL,
+    status        TEXT    NOT NULL,
+    owner         TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    result        TEXT,
+    updated_at    REAL    NOT NULL,
+    PRIMARY KEY (queue, key)
+)
+"""
+
+# 重新加入的工作回到 pending；已被領取、租約未到期的工作不受影響
+_ENQUEUE = """
+INSERT INTO tasks (queue, key, payload, status, attempts, updated_at)
+VALUES (?, ?, ?, 'pending', 0, ?)
+ON CONFLICT (queue, key) DO UPDATE SET
+    payload = excluded.payload,
+    status = 'pending',
+    owner = NULL,
+    lease_expires = NULL,
+    attempts = 0,
+    result = NULL,
+    updated_at = excluded.updated_at
+WHERE tasks.status != 'leased' OR tasks.lease_expires < excluded.updated_at
+"""
+
+@dataclass
+class Task:
+    """領取到的一筆工作"""
+
+    key: str
+    payload: Any
+    attempts: int
+
+class WorkQueue:
+    """多行程共用的持久化工作佇列"""
+
+    def __init__(self, db_path: Path,
+                 lease_seconds: float = WORK_QUEUE_LEASE_SECONDS,
+                 max_attempts: int = WORK_QUEUE_MAX_ATTEMPTS):
+        """開啟（或建立）工作佇列
+
+        Args:
+            db_path: SQLite 檔案路徑
+            lease_seconds: 領取的租約秒數
+            max_attempts: 同一工作的最大嘗試次數
+        """
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # 自動提交模式，交易一律明確以 BEGIN IMMEDIATE 開始
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False,
+                                     timeout=SQLITE_BUSY_TIMEOUT, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (queue, status)")
+
+    def _write(self, sql: str, rows: List[Tuple]) -> int:
+        """在 BEGIN IMMEDIATE 交易中執行批次寫入
+
+        Returns:
+            int: 異動的列數
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                before = self._conn.total_changes
+                self._conn.executemany(sql, rows)
+                changed = self._conn.total_changes - before
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def enqueue(self, queue: str, tasks: Iterable[Tuple[str, Any]]) -> int:
+        """加入工作；鍵已存在時重設為 pending
+
+        Args:
+            queue: 佇列名稱
+            tasks: (鍵, 可序列化為 JSON 的內容) 的序列
+
+        Returns:
+            int: 加入或重設的工作數
+        """
+        now = time.time()
+        rows = [(queue, str(key), json.dumps(payload, ensure_ascii=False), now)
+                for key, payload in tasks]
+        return self._write(_ENQUEUE, rows)
+
+    def lease(self, queue: str, owner: str, limit: int) -> List[Task]:
+        """領取一批待處理或租約已到期的工作
+
+        Args:
+            queue: 佇列名稱
+            owner: 工作者識別名稱
+            limit: 最多領取的工作數
+
+        Returns:
+            List[Task]: 領取到的工作，佇列中已無可領取的工作時為空列表
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT key, payload, attempts FROM tasks WHERE queue = ? "
+                    "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                    "ORDER BY rowid LIMIT ?",
+                    (queue, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE queue = ? AND key = ?",
+                    [(owner, now + self.lease_seconds, now, queue, key) for key, _, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [Task(key, json.loads(payload), attempts + 1) for key, payload, attempts in rows]
+
+    def complete(self, queue: str, owner: str, results: Iterable[Tuple[str, Any]]) -> int:
+        """將仍由 owner 持有的工作標記為完成，並保存其結果
+
+        Args:
+            queue: 佇列名稱
+            owner: 領取時的工作者識別名稱
+            results: (鍵, 可序列化為 JSON 的結果) 的序列，結果可為 None
+
+        Returns:
+            int: 標記為完成的工作數；租約已被他人接手的工作不計入
+        """
+        now = time.time()
+        rows = [(None if result is None else json.dumps(result, ensure_ascii=False), now,
+                 queue, key, owner)
+                for key, result in results]
+        return self._write("UPDATE tasks SET status = 'done', result = ?, owner = NULL, "
+                           "lease_expires = NULL, updated_at = ? "
+                           "WHERE queue = ? AND key = ? AND owner = ? AND status = 'leased'", rows)
+
+    def release(self, queue: str, owner: str, keys: Iterable[str]) -> int:
+        """歸還仍由 owner 持有、處理失敗的工作：未達嘗試上限時退回 pending，否則標記為 failed
+
+        Returns:
+            int: 歸還的工作數；租約已被他人接手的工作不計入
+        """
+        now = time.time()
+        return self._write(
+            "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE queue = ? AND key = ? AND owner = ? AND status = 'leased'",
+            [(self.max_attempts, now, queue, key, owner) for key in keys]
+        )
+
+    def counts(self, queue: str) -> Dict[str, int]:
+        """各狀態的工作數"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE queue = ? GROUP BY status", (queue,)
+            ).fetchall()
+        counts = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_FAILED)}
+        counts.update(rows)
+        return counts
+
+    def is_drained(self, queue: str) -> bool:
+        """佇列中是否已沒有待處理或處理中的工作"""
+        counts = self.counts(queue)
+        return counts[STATUS_PENDING] == 0 and counts[STATUS_LEASED] == 0
+
+    def iter_tasks(self, queue: str,
+                   status: Optional[str] = None) -> Iterator[Tuple[str, Any, str, Any]]:
+        """逐筆產出佇列中的工作
+
+        Args:
+            queue: 佇列名稱
+            status: 只產出此狀態的工作，未提供時全部產出
+
+        Yields:
+            Tuple[str, Any, str, Any]: (鍵, 內容, 狀態, 結果)
+        """
+        conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_BUSY_TIMEOUT)
+        try:
+            cursor = conn.execute(
+                "SELECT key, payload, status, result FROM tasks "
+                "WHERE queue = ? AND (? IS NULL OR status = ?) ORDER BY rowid",
+                (queue, status, status)
+            )
+            for key, payload, task_status, result in cursor:
+                yield (key, json.loads(payload), task_status,
+                       None if result is None else json.loads(result))
+        finally:
+            conn.close()
+
+    def clear(self, queue: str) -> None:
+        """刪除佇列中的所有工作"""
+        with self._lock:
+            self._conn.execute("DELETE FROM tasks WHERE queue = ?", (queue,))
+
+    def close(self) -> None:
+        """關閉資料庫連線"""
+        with self._lock:
+            self._conn.close()
+
+_queue: Optional[WorkQueue] = None
+_queue_lock = threading.Lock()
+
+def get_work_queue() -> WorkQueue:
+    """取得整個行程共用的工作佇列"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WorkQueue(Path(CACHE_DIR) / WORK_QUEUE_FILE)
+            logger.debug(f"工作佇列已開啟: {_queue.db_path}")
+        return _queue
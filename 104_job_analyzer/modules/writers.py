@@ -0,0 +1,201 @@
+# modules/writers.py
+
+"""輸出格式模組：提供可替換的 DataFrame 輸出後端
+
+支援的格式：
+- csv：utf-8-sig 編碼，可直接以 Excel 開啟；巢狀欄位以 Python repr 字串呈現
+- parquet：欄式儲存，巢狀列表保留為 list<struct> 型別，並可壓縮
+
+每種格式皆提供可分批寫入的 Sink（`open_sink`），以及一次寫入整個
+DataFrame 的 `write_frame`。`BackgroundWriter` 可將 Sink 的寫入移到背景執行緒。
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Type
+
+if TYPE_CHECKING:
+    import pandas as pd  # 只用於型別標註；DataFrame 由呼叫端傳入，本模組不必在匯入時載入 pandas
+
+from config import OUTPUT_FORMATS, PARQUET_COMPRESSION
+from .logger_setup import logger
+from .metrics import get_metrics
+
+_default_formats: List[str] = list(OUTPUT_FORMATS)
+
+
+class CsvSink:
+    """CSV 輸出：第一批決定欄位並寫入標頭，後續批次以附加方式寫入"""
+
+    suffix = 'csv'
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._columns: Optional[List[str]] = None
+
+    def write(self, df: 'pd.DataFrame') -> None:
+        """寫入一批資料"""
+        write_header = self._columns is None
+        if write_header:
+            self._columns = list(df.columns)
+        else:
+            df = df.reindex(columns=self._columns)
+        df.to_csv(self._file, index=False, header=write_header)
+        self._file.flush()
+
+    def close(self) -> None:
+        """關閉檔案"""
+        self._file.close()
+
+
+class ParquetSink:
+    """Parquet 輸出：每批寫成一個 row group
+
+    第一批資料決定檔案的 schema（全為空值的欄位視為字串），
+    後續批次會轉換為相同的 schema 後寫入。
+    """
+
+    suffix = 'parquet'
+
+    def __init__(self, path: Path, compression: str = PARQUET_COMPRESSION):
+        self.path = path
+        self.compression = compression
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: 'pd.DataFrame') -> None:
+        """寫入一批資料（一個 row group）"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self._schema = _fill_null_types(table.schema)
+            self._writer = pq.ParquetWriter(self.path, self._schema,
+                                            compression=self.compression)
+        else:
+            df = df.reindex(columns=self._schema.names)
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        """寫入檔尾並關閉檔案"""
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _fill_null_types(schema):
+    """將推斷為 null 的欄位（含 list<null>）改為字串，以容納後續批次的值"""
+    import pyarrow as pa
+
+    fields = []
+    for field in schema:
+        if pa.types.is_null(field.type):
+            field = field.with_type(pa.string())
+        elif pa.types.is_list(field.type) and pa.types.is_null(field.type.value_type):
+            field = field.with_type(pa.list_(pa.string()))
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+class BackgroundWriter:
+    """在背景執行緒中寫入 Sink
+
+    呼叫端只需將 DataFrame 放入有界佇列即可返回，磁碟 I/O 不會阻塞擷取流程；
+    佇列已滿時才會等待，避免寫入速度跟不上時無限制佔用記憶體。
+    """
+
+    _STOP = object()
+
+    def __init__(self, sink, max_pending: int = 64, name: Optional[str] = None):
+        """啟動背景寫入執行緒
+
+        Args:
+            sink: 任一 Sink（需提供 write/close）
+            max_pending: 佇列中最多等待寫入的批次數
+            name: 量測資料中的名稱（span 為 `write.{name}`），未提供時使用檔名
+        """
+        self.sink = sink
+        self.name = name or Path(sink.path).stem
+        self.batches_written = 0
+        self.rows_written = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"writer-{Path(sink.path).name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        """背景執行緒：依序寫入佇列中的批次，收到結束訊號後關閉 Sink"""
+        try:
+            while True:
+                df = self._queue.get()
+                if df is self._STOP:
+                    break
+                try:
+                    with get_metrics().span(f"write.{self.name}"):
+                        self.sink.write(df)
+                    self.batches_written += 1
+                    self.rows_written += len(df)
+                except Exception as e:
+                    logger.error(f"寫入 {self.sink.path} 時發生錯誤: {str(e)}")
+        finally:
+            self.sink.close()
+
+    def submit(self, df: 'pd.DataFrame') -> None:
+        """將一批資料排入寫入佇列"""
+        self._queue.put(df)
+
+    def close(self) -> None:
+        """等待佇列中的資料寫完並關閉 Sink"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+
+SINKS: Dict[str, Type] = {
+    'csv': CsvSink,
+    'parquet': ParquetSink,
+}
+
+
+def open_sink(path: Path, fmt: str):
+    """開啟指定格式的 Sink
+
+    Raises:
+        ValueError: 不支援的格式
+    """
+    try:
+        return SINKS[fmt](path)
+    except KeyError:
+        raise ValueError(f"不支援的輸出格式: {fmt}") from None
+
+
+def write_frame(df: 'pd.DataFrame', path: Path, fmt: str) -> None:
+    """一次寫入整個 DataFrame"""
+    if fmt == 'parquet':
+        df.to_parquet(path, index=False, compression=PARQUET_COMPRESSION)
+        return
+    sink = open_sink(path, fmt)
+    try:
+        sink.write(df)
+    finally:
+        sink.close()
+
+
+def set_default_formats(formats: Iterable[str]) -> None:
+    """設定本次執行預設的輸出格式"""
+    formats = list(formats)
+    unknown = [fmt for fmt in formats if fmt not in SINKS]
+    if unknown:
+        raise ValueError(f"不支援的輸出格式: {', '.join(unknown)}")
+    _default_formats[:] = formats
+
+
+def get_default_formats() -> List[str]:
+    """取得本次執行預設的輸出格式"""
+    return list(_default_formats)
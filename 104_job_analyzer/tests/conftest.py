@@ -0,0 +1,77 @@
+# tests/conftest.py
+
+"""測試共用設定
+
+各模組在匯入時即讀取設定值，因此在收集測試前先將 104_job_analyzer 加入匯入路徑，
+並將網址與輸出、快取、日誌目錄指向模擬伺服器（benchmarks.mock_server）與暫存目錄。
+"""
+
+import asyncio
+import shutil
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Awaitable, Callable, Dict
+
+import pytest
+from aiohttp import web
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR))
+
+from benchmarks.mock_server import MockServer, MockSettings  # noqa: E402
+from benchmarks.target import point_config_at  # noqa: E402
+
+_server = MockServer(MockSettings(latency=0.0, jitter=0.0))
+_workdir = Path(tempfile.mkdtemp(prefix='104-tests-'))
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+def pytest_configure(config):
+    urls = _server.start()
+    point_config_at(urls['static'], urls['guide'], urls['www'], _workdir)
+
+
+def pytest_unconfigure(config):
+    _server.stop()
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture(scope='session')
+def mock_server() -> MockServer:
+    """整個測試階段共用的模擬伺服器（無延遲、無錯誤）"""
+    return _server
+
+
+@pytest.fixture
+def serve():
+    """在背景執行緒啟動本機 aiohttp 伺服器
+
+    serve({'/path': handler}) 回傳伺服器的基底網址，測試結束時關閉伺服器。
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    runners = []
+
+    async def start(routes: Dict[str, Handler]) -> str:
+        app = web.Application()
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        runners.append(runner)
+        port = runner.addresses[0][1]
+        return f'http://127.0.0.1:{port}'
+
+    yield lambda routes: asyncio.run_coroutine_threadsafe(start(routes), loop).result()
+
+    for runner in runners:
+        asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
@@ -0,0 +1,144 @@
+# tests/test_category_cache.py
+
+import sys
+
+import pandas as pd
+import pytest
+from aiohttp import web
+
+import modules.category_cache as category_cache
+from modules.category_cache import select_categories
+from modules.http_client import get_engine
+from modules.processor import flatten_job_categories, iter_job_categories
+
+CATEGORIES = [
+    {'no': '2007000000', 'des': '資訊軟體系統類', 'n': [
+        {'no': '2007001000', 'des': '軟體／工程類人員', 'n': [
+            {'no': '2007001004', 'des': '軟體工程師'},
+            {'no': '2007001012', 'des': '韌體工程師'},
+        ]},
+    ]},
+]
+ETAG = '"v1"'
+
+
+@pytest.fixture
+def job_cat(serve, tmp_path, monkeypatch):
+    """模擬職務類別 API（支援 If-None-Match），回傳收到的請求標頭"""
+    requests = []
+
+    async def handler(request):
+        requests.append(dict(request.headers))
+        if request.headers.get('If-None-Match') == ETAG:
+            return web.Response(status=304, headers={'ETag': ETAG})
+        return web.json_response(CATEGORIES, headers={'ETag': ETAG})
+
+    base = serve({'/JobCat.json': handler})
+    monkeypatch.setattr(category_cache, 'URL_JOB_CAT', base + '/JobCat.json')
+    monkeypatch.setattr(category_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(category_cache, '_categories', None)
+    return requests
+
+
+def new_process(monkeypatch):
+    """清除行程內快取，模擬下一次執行"""
+    monkeypatch.setattr(category_cache, '_categories', None)
+
+
+def test_download_flattens_and_sorts(job_cat):
+    df = category_cache.get_job_categories()
+
+    assert list(df.columns) == ['parent_code', 'parent_name', 'job_code', 'job_name']
+    assert list(df['job_code']) == sorted(df['job_code'])
+    assert '2007001004' in set(df['job_code'])
+    assert len(job_cat) == 1
+
+
+def test_process_cache_returns_copies(job_cat):
+    first = category_cache.get_job_categories()
+    first.drop(first.index, inplace=True)
+
+    assert len(category_cache.get_job_categories()) == 3
+    assert len(job_cat) == 1
+
+
+def test_disk_cache_within_ttl_skips_request(job_cat, monkeypatch):
+    category_cache.get_job_categories()
+    new_process(monkeypatch)
+
+    assert len(category_cache.get_job_categories()) == 3
+    assert len(job_cat) == 1
+
+
+def test_expired_cache_revalidates_with_etag(job_cat, monkeypatch):
+    expected = category_cache.get_job_categories()
+    new_process(monkeypatch)
+    monkeypatch.setattr(category_cache, 'CATEGORY_CACHE_TTL', 0)
+
+    df = category_cache.get_job_categories()
+
+    assert len(job_cat) == 2
+    assert job_cat[1]['If-None-Match'] == ETAG
+    assert df.equals(expected)
+
+
+def test_fetch_failure_falls_back_to_cache(job_cat, monkeypatch):
+    expected = category_cache.get_job_categories()
+    new_process(monkeypatch)
+    monkeypatch.setattr(category_cache, 'URL_JOB_CAT', 'http://127.0.0.1:9/JobCat.json')
+    monkeypatch.setattr(get_engine(), 'max_retries', 0)
+
+    assert category_cache.get_job_categories(force_refresh=True).equals(expected)
+
+
+def test_fetch_failure_without_cache_returns_none(job_cat, monkeypatch):
+    monkeypatch.setattr(category_cache, 'URL_JOB_CAT', 'http://127.0.0.1:9/JobCat.json')
+    monkeypatch.setattr(get_engine(), 'max_retries', 0)
+
+    assert category_cache.get_job_categories() is None
+
+
+def test_walker_matches_preorder_and_handles_deep_trees():
+    assert [c.job_code for c in iter_job_categories(CATEGORIES)] == \
+        ['2007001000', '2007001004', '2007001012']
+
+    depth = sys.getrecursionlimit() * 2
+    node = {'no': str(depth), 'des': 'leaf'}
+    for level in range(depth - 1, -1, -1):
+        node = {'no': str(level), 'des': f"level {level}", 'n': [node]}
+    flat = flatten_job_categories([node])
+    assert len(flat) == depth
+    assert flat[-1].parent_code == str(depth - 1)
+
+
+TREE = pd.DataFrame([
+    {'parent_code': 'A', 'parent_name': 'a', 'job_code': 'A1', 'job_name': 'a1'},
+    {'parent_code': 'A1', 'parent_name': 'a1', 'job_code': 'A11', 'job_name': 'a11'},
+    {'parent_code': 'A11', 'parent_name': 'a11', 'job_code': 'A111', 'job_name': 'a111'},
+    {'parent_code': 'B', 'parent_name': 'b', 'job_code': 'B1', 'job_name': 'b1'},
+    {'parent_code': 'B1', 'parent_name': 'b1', 'job_code': 'B11', 'job_name': 'b11'},
+])
+
+
+@pytest.mark.parametrize('root, max_depth, expected', [
+    (None, None, ['A1', 'A11', 'A111', 'B1', 'B11']),
+    ('A1', None, ['A1', 'A11', 'A111']),
+    ('A1', 1, ['A1', 'A11']),
+    ('A1, B1', 0, ['A1', 'B1']),
+    (None, 1, ['A1', 'B1']),
+    ('B', None, ['B1', 'B11']),
+])
+def test_select_categories(root, max_depth, expected):
+    selected = select_categories(TREE, root, max_depth)
+    assert list(selected['job_code']) == expected
+
+
+def test_select_unknown_category_warns(caplog):
+    assert select_categories(TREE, 'Z9').empty
+    assert 'Z9' in caplog.text
+
+
+def test_get_job_categories_selects_subtree(job_cat):
+    df = category_cache.get_job_categories(root='2007001000')
+    assert sorted(df['job_code']) == ['2007001000', '2007001004', '2007001012']
+    assert len(category_cache.get_job_categories()) == 3
@@ -0,0 +1,46 @@
+# tests/test_checkpoint.py
+
+from modules.checkpoint import Journal
+
+
+def test_resume_loads_completed_entries():
+    with Journal('test_resume') as journal:
+        journal.append('jc0', {'skills': []})
+        journal.append(['jc1', 2], [{'salary': 30000}])
+
+    with Journal('test_resume', resume=True) as journal:
+        assert journal.entries == {'jc0': {'skills': []}, ('jc1', 2): [{'salary': 30000}]}
+        journal.complete()
+
+
+def test_partial_last_line_is_truncated():
+    with Journal('test_truncate') as journal:
+        journal.append('jc0', 1)
+        journal.append('jc1', 2)
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"key": "jc2", "val')  # 中斷時寫到一半的紀錄
+
+    with Journal('test_truncate', resume=True) as journal:
+        assert journal.entries == {'jc0': 1, 'jc1': 2}
+        journal.append('jc2', 3)
+
+    with Journal('test_truncate', resume=True) as journal:
+        assert journal.entries == {'jc0': 1, 'jc1': 2, 'jc2': 3}
+        journal.complete()
+
+
+def test_without_resume_starts_over():
+    with Journal('test_restart') as journal:
+        journal.append('jc0', 1)
+    with Journal('test_restart') as journal:
+        assert journal.entries == {}
+    with Journal('test_restart', resume=True) as journal:
+        assert journal.entries == {}
+        journal.complete()
+
+
+def test_complete_removes_file():
+    with Journal('test_complete') as journal:
+        journal.append('jc0', 1)
+        journal.complete()
+    assert not journal.path.exists()
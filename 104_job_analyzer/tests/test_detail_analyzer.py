@@ -0,0 +1,91 @@
+# tests/test_detail_analyzer.py
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from aiohttp import web
+
+import config
+import modules.fetcher
+from modules.detail_analyzer import run_detail_analysis
+from modules.fetcher import build_detail_url, extract_job_id
+
+JOB_IDS = [f"job{i}" for i in range(25)]
+MISSING_ID = 'job7'
+
+
+@pytest.fixture
+def job_site(serve, monkeypatch):
+    """模擬搜尋與職缺詳細資訊 API，回傳收到的詳細資訊請求 Referer"""
+    referers = []
+
+    async def search_list(request):
+        page = int(request.query['page'])
+        jobs = [{'link': {'job': f"//www.104.com.tw/job/{job_id}?jobsource=n104bank2"}}
+                for job_id in JOB_IDS[(page - 1) * 10:page * 10]]
+        return web.json_response({'data': {'totalPage': 3, 'list': jobs}})
+
+    async def detail(request):
+        job_id = request.match_info['job_id']
+        referers.append(request.headers.get('Referer'))
+        if job_id == MISSING_ID:
+            return web.Response(status=404)
+        return web.json_response({'data': {
+            'header': {'jobName': f"工程師 {job_id}", 'custName': '公司'},
+            'jobDetail': {'jobCategory': [{'description': '軟體工程師'}, {'description': '韌體工程師'}]},
+            'condition': {'skill': [{'description': 'Python'}]},
+        }})
+
+    base = serve({'/jobs/search/list': search_list, '/job/ajax/content/{job_id}': detail})
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_SEARCH', base + '/jobs/search/list?ro=0')
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_DETAIL_BASE', base + '/job/ajax/content/')
+    return referers
+
+
+def test_extract_job_id():
+    assert extract_job_id('//www.104.com.tw/job/8pyre?jobsource=n104bank2') == '8pyre'
+    assert extract_job_id('https://www.104.com.tw/job/8pyre/') == '8pyre'
+
+
+def test_build_detail_url(monkeypatch):
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_DETAIL_BASE', 'https://example/content/')
+    assert build_detail_url('//www.104.com.tw/job/8pyre?x=1') == 'https://example/content/8pyre'
+
+
+def test_detail_crawl_writes_flattened_records(job_site):
+    run_detail_analysis(keywords='python')
+
+    [output] = Path(config.OUTPUT_DIR).glob('104_job_details_*.csv')
+    df = pd.read_csv(output)
+    assert sorted(df['job_id']) == sorted(set(JOB_IDS) - {MISSING_ID})
+    assert set(df['job_category']) == {'軟體工程師、韌體工程師'}
+    # 詳細資訊 API 需以職缺頁面作為 Referer
+    assert sorted(job_site) == sorted(config.URL_JOB_PAGE.format(job_id=job_id) for job_id in JOB_IDS)
+
+
+
+def test_unfiltered_crawl_requires_all_jobs(job_site, tmp_path, monkeypatch):
+    monkeypatch.setattr('modules.common.OUTPUT_DIR', str(tmp_path))
+    with pytest.raises(ValueError, match='--all-jobs'):
+        run_detail_analysis()
+    with pytest.raises(ValueError, match='--all-jobs'):
+        run_detail_analysis(changes_only=True)
+    assert job_site == []
+
+    run_detail_analysis(all_jobs=True)
+    assert len(job_site) == len(JOB_IDS)
+
+def test_batch_writer_writes_every_format(tmp_path, monkeypatch):
+    from modules.common import BatchWriter
+
+    monkeypatch.setattr('modules.common.OUTPUT_DIR', str(tmp_path))
+    with BatchWriter('batch_test', batch_size=2, formats=['csv', 'parquet']) as writer:
+        for i in range(5):
+            writer.write({'job_id': f"job{i}", 'salary': i})
+
+    assert writer.rows_written == 5
+    [csv_file] = tmp_path.glob('batch_test_*.csv')
+    [parquet_file] = tmp_path.glob('batch_test_*.parquet')
+    assert list(pd.read_csv(csv_file)['salary']) == list(range(5))
+    assert list(pd.read_parquet(parquet_file)['job_id']) == [f"job{i}" for i in range(5)]
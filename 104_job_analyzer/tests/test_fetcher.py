@@ -0,0 +1,156 @@
+# tests/test_fetcher.py
+
+import json
+from collections import Counter
+
+import pytest
+from aiohttp import web
+
+import modules.fetcher
+from benchmarks.mock_server import FIXTURE_DIR, MockServer, MockSettings
+from config import SEARCH_PAGE_LIMIT, SEARCH_SPLIT_AREAS
+from modules.fetcher import (
+    JobURLFetcher, SearchQuery, fetch_single_salary_request, load_queries, load_search_results
+)
+
+TOTAL_PAGES = 6
+
+
+@pytest.fixture
+def search_pages(serve, monkeypatch):
+    """模擬搜尋 API：每頁 3 筆職缺，相鄰頁面重複 1 筆，回傳各頁的請求次數"""
+    requests = Counter()
+
+    async def search_list(request):
+        page = int(request.query['page'])
+        requests[page] += 1
+        jobs = [{'jobNo': str(page * 2 + i), 'link': {'job': f"//www.104.com.tw/job/{page * 2 + i}"},
+                 'salaryLow': str(30000 + i), 'lat': '25.03', 'tags': []}
+                for i in range(3)]
+        return web.json_response({'data': {'totalPage': TOTAL_PAGES, 'list': jobs}})
+
+    base = serve({'/jobs/search/list': search_list})
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_SEARCH', base + '/jobs/search/list?ro=0')
+    return requests
+
+
+def test_iter_urls_fetches_every_page_once(search_pages):
+    with JobURLFetcher() as fetcher:
+        urls = list(fetcher.iter_urls(keywords='python', window=2))
+
+    assert search_pages == Counter({page: 1 for page in range(1, TOTAL_PAGES + 1)})
+    assert len(urls) == len(set(urls)) == TOTAL_PAGES * 2 + 1
+
+
+def test_fetch_urls_writes_url_list_and_search_dataset(search_pages, tmp_path, monkeypatch):
+    monkeypatch.setattr('modules.common.OUTPUT_DIR', str(tmp_path))
+    with JobURLFetcher() as fetcher:
+        monkeypatch.setattr(fetcher, 'output_dir', tmp_path)
+        urls = fetcher.fetch_urls(keywords='python')
+
+    assert len(urls) == TOTAL_PAGES * 2 + 1
+    assert len(list(tmp_path.glob('all_job_urls_*.csv'))) == 1
+    assert not list(tmp_path.glob('jobs_page_*.csv'))
+
+    df = load_search_results()
+    assert len(df) == TOTAL_PAGES * 3
+    assert sorted(set(df['page'])) == list(range(1, TOTAL_PAGES + 1))
+    assert str(df['salaryLow'].dtype) == 'Int64'
+    assert str(df['lat'].dtype) == 'Float64'
+    assert json.loads(df['link'].iloc[0])['job'].startswith('//www.104.com.tw/job/')
+
+
+def test_search_dataset_is_partitioned_by_date(search_pages, tmp_path, monkeypatch):
+    monkeypatch.setattr('modules.common.OUTPUT_DIR', str(tmp_path))
+    for _ in range(2):
+        with JobURLFetcher() as fetcher:
+            list(fetcher.iter_urls(keywords='python'))
+
+    [day_dir] = (tmp_path / 'search_results').iterdir()
+    assert day_dir.name.startswith('date=')
+    assert len(list(day_dir.glob('run_*.parquet'))) == 2
+    assert len(load_search_results()) == 2 * TOTAL_PAGES * 3
+    assert load_search_results('19700101').empty
+
+
+def test_load_queries(tmp_path):
+    path = tmp_path / 'queries.csv'
+    path.write_text('keywords,category,name\npython,,py\n,2007001000,\n', encoding='utf-8')
+    assert load_queries(path) == [SearchQuery('py', None, 'python'),
+                                  SearchQuery('|2007001000', '2007001000', None)]
+
+    path.write_text('keywords,category\npython,\npython,\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='重複'):
+        load_queries(path)
+
+
+def test_batch_search_deduplicates_across_queries(search_pages, tmp_path, monkeypatch):
+    monkeypatch.setattr('modules.common.OUTPUT_DIR', str(tmp_path))
+    queries = [SearchQuery('py', keywords='python'), SearchQuery('java', keywords='java')]
+    with JobURLFetcher() as fetcher:
+        monkeypatch.setattr(fetcher, 'output_dir', tmp_path)
+        matches = fetcher.fetch_batch(queries)
+
+    assert len(matches) == TOTAL_PAGES * 2 + 1
+    assert all(sorted(names) == ['java', 'py'] for names in matches.values())
+    assert sum(search_pages.values()) == 2 * TOTAL_PAGES
+    assert len(load_search_results()) == TOTAL_PAGES * 2 + 1
+
+
+@pytest.fixture
+def truncated_search(mock_server, monkeypatch):
+    """整體搜尋與一條職務類別路徑（大類 → 中類 → 細類）的結果皆超過頁數上限的模擬伺服器
+
+    Returns:
+        dict: 職務類別樹及超過上限的各層類別
+    """
+    categories = json.loads((FIXTURE_DIR / 'job_cat.json').read_text(encoding='utf-8'))
+    top = categories[0]
+    middle = top['n'][0]
+    leaf = middle['n'][0]
+    truncated = {None, top['no'], middle['no'], leaf['no']}
+
+    server = MockServer(MockSettings(latency=0.0, jitter=0.0))
+    template = server.api.search_page['data']
+
+    async def search_list(request: web.Request) -> web.Response:
+        category, area = request.query.get('jobcat'), request.query.get('area')
+        pages = SEARCH_PAGE_LIMIT + 50 if category in truncated and not area else 2
+        data = dict(template, totalPage=pages, totalCount=pages * 5, list=template['list'][:5])
+        return web.json_response({'data': data})
+
+    server.api.search_list = search_list
+    urls = server.start()
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_SEARCH', f"{urls['www']}/jobs/search/list?ro=0")
+    yield {'categories': categories, 'top': top, 'middle': middle}
+    server.stop()
+
+
+def test_split_queries_until_within_page_limit(truncated_search):
+    fetcher = JobURLFetcher()
+    slices = fetcher.split_queries([SearchQuery(name='all')])
+
+    expected = (len(truncated_search['categories']) - 1 + len(truncated_search['top']['n']) - 1
+                + len(truncated_search['middle']['n']) - 1 + len(SEARCH_SPLIT_AREAS))
+    assert len(slices) == expected
+    assert all(query.origin == 'all' for query in slices)
+    assert len({query.name for query in slices}) == len(slices)
+
+
+def test_split_queries_keeps_only_slice_first_pages(truncated_search):
+    fetcher = JobURLFetcher()
+    slices = fetcher.split_queries([SearchQuery(name='all')])
+
+    slice_urls = {fetcher.build_url(query.category, query.keywords, area=query.area)
+                  for query in slices}
+    assert set(fetcher._first_pages) == slice_urls
+
+
+@pytest.mark.parametrize('body', [None, [], {'salaryList': None}])
+def test_non_object_salary_response_is_missing(serve, monkeypatch, body):
+    async def salary(request):
+        return web.json_response(body)
+
+    base = serve({'/salary': salary})
+    monkeypatch.setattr(modules.fetcher, 'URL_SALARY', base + '/salary?jobCode={job_code}&type={type_id}')
+    assert fetch_single_salary_request('2007001000', 1) == ('2007001000', 1, None)
@@ -0,0 +1,165 @@
+# tests/test_http_cache.py
+
+import os
+import sqlite3
+import time
+from email.utils import formatdate
+
+import pytest
+from aiohttp import web
+
+from modules.http_cache import HttpCache, cache_key, freshness_lifetime, is_cacheable_request
+from modules.http_client import HttpEngine
+
+URL = 'https://www.104.com.tw/jobs/search/list?ro=0&page=1'
+FRESH = {'Cache-Control': 'max-age=600'}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HttpCache(tmp_path / 'http_cache.sqlite3')
+    yield cache
+    cache.close()
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({}, 0.0),
+    ({'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}, 0.0),
+    ({'Cache-Control': 'no-store'}, None),
+    ({'Cache-Control': 'no-cache, max-age=600'}, 0.0),
+    ({'Cache-Control': 'max-age=600'}, 600.0),
+    ({'Cache-Control': 'max-age=600', 'Age': '100'}, 500.0),
+    ({'Cache-Control': 'public, s-maxage=60, max-age=600'}, 60.0),
+    ({'Cache-Control': 'max-age=abc'}, 0.0),
+    ({'Expires': 'not a date'}, 0.0),
+])
+def test_freshness_lifetime(headers, expected):
+    assert freshness_lifetime(headers, time.time()) == expected
+
+
+def test_freshness_lifetime_from_expires():
+    now = time.time()
+    lifetime = freshness_lifetime({'Expires': formatdate(now + 120, usegmt=True)}, now)
+    assert 110 <= lifetime <= 120
+
+
+def test_cache_key_varies_on_configured_headers():
+    assert cache_key(URL, {'Accept': 'application/json'}) != cache_key(URL, {'Accept': 'text/html'})
+    assert cache_key(URL, {'User-Agent': 'a'}) == cache_key(URL, {'User-Agent': 'b'})
+
+
+def test_conditional_requests_bypass_cache():
+    assert is_cacheable_request({'Accept': 'application/json'})
+    assert not is_cacheable_request({'if-none-match': '"v1"'})
+
+
+def test_response_without_freshness_headers_is_stored_but_stale(cache):
+    headers = {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+    assert cache.store(URL, None, 200, headers, b'{"data": 1}')
+
+    entry = cache.lookup(URL, None)
+    assert entry.body == b'{"data": 1}'
+    assert not entry.is_fresh()
+    assert entry.validators() == {'If-None-Match': '"v1"',
+                                  'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT'}
+
+
+def test_no_store_response_is_not_saved(cache):
+    assert not cache.store(URL, None, 200, {'Cache-Control': 'no-store'}, b'{}')
+    assert cache.lookup(URL, None) is None
+
+
+@pytest.mark.parametrize('headers', [{}, {'Cache-Control': 'no-cache'}, {'Cache-Control': 'max-age=0'}])
+def test_response_without_lifetime_or_validator_is_not_saved(cache, headers):
+    assert not cache.store(URL, None, 200, headers, b'{}')
+    assert cache.lookup(URL, None) is None
+
+
+def test_refresh_extends_lifetime(cache):
+    cache.store(URL, None, 200, {'ETag': '"v1"'}, b'{}')
+    entry = cache.lookup(URL, None)
+    assert not entry.is_fresh()
+
+    cache.refresh(entry, {'Cache-Control': 'max-age=600', 'ETag': '"v2"'})
+    entry = cache.lookup(URL, None)
+    assert entry.is_fresh()
+    assert entry.headers['ETag'] == '"v2"'
+
+
+def test_revalidate_all_marks_entries_stale(cache):
+    cache.store(URL, None, 200, {'Cache-Control': 'max-age=600'}, b'{}')
+    assert cache.lookup(URL, None).is_fresh()
+    cache.revalidate_all = True
+    assert not cache.lookup(URL, None).is_fresh()
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    # 隨機內容無法壓縮，每筆約 1000 bytes；上限只容得下兩筆
+    cache = HttpCache(tmp_path / 'http_cache.sqlite3', max_bytes=2500)
+    urls = [f"{URL}&n={i}" for i in range(3)]
+    try:
+        cache.store(urls[0], None, 200, FRESH, os.urandom(1000))
+        time.sleep(0.01)
+        cache.store(urls[1], None, 200, FRESH, os.urandom(1000))
+        time.sleep(0.01)
+        cache.lookup(urls[0], None)  # 第一筆最近使用過，第二筆成為最久未使用
+        time.sleep(0.01)
+        cache.store(urls[2], None, 200, FRESH, os.urandom(1000))
+
+        assert cache.lookup(urls[0], None) is not None
+        assert cache.lookup(urls[1], None) is None
+        assert cache.lookup(urls[2], None) is not None
+    finally:
+        cache.close()
+
+
+def last_access(cache):
+    with sqlite3.connect(str(cache.db_path)) as conn:
+        return conn.execute("SELECT last_access FROM responses").fetchone()[0]
+
+
+def test_lookup_defers_last_access_write(cache):
+    cache.store(URL, None, 200, FRESH, b'{}')
+    stored = last_access(cache)
+    time.sleep(0.01)
+
+    cache.lookup(URL, None)
+    assert last_access(cache) == stored
+
+    cache.store(f"{URL}&n=1", None, 200, FRESH, b'{}')
+    assert last_access(cache) > stored
+
+
+@pytest.fixture
+def cached_engine(cache):
+    engine = HttpEngine(cache=cache)
+    yield engine
+    engine.close()
+
+
+def test_engine_serves_fresh_responses_from_cache(serve, cached_engine):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        return web.json_response({'n': len(requests)}, headers={'Cache-Control': 'max-age=600'})
+
+    url = serve({'/fresh': handler}) + '/fresh'
+    first = cached_engine.run(cached_engine.get_json(url))
+    assert cached_engine.run(cached_engine.get_json(url)) == first == {'n': 1}
+    assert len(requests) == 1
+
+
+def test_engine_revalidates_stale_responses(serve, cached_engine):
+    conditional = []
+
+    async def handler(request):
+        conditional.append(request.headers.get('If-None-Match'))
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304, headers={'ETag': '"v1"'})
+        return web.json_response({'v': 1}, headers={'ETag': '"v1"'})
+
+    url = serve({'/stale': handler}) + '/stale'
+    assert cached_engine.run(cached_engine.get_json(url)) == {'v': 1}
+    assert cached_engine.run(cached_engine.get_json(url)) == {'v': 1}
+    assert conditional == [None, '"v1"']
@@ -0,0 +1,160 @@
+# tests/test_http_client.py
+
+import asyncio
+import random
+
+import pytest
+from aiohttp import web
+
+from modules.http_client import FetchError, HttpEngine, get_engine
+
+
+async def hello(request):
+    return web.json_response({'path': request.path})
+
+
+async def missing(request):
+    return web.Response(status=404)
+
+
+async def not_json(request):
+    return web.Response(text='<html></html>')
+
+
+def test_get_json(serve):
+    base = serve({'/hello': hello})
+    data = get_engine().run(get_engine().get_json(base + '/hello'))
+    assert data == {'path': '/hello'}
+
+
+def test_error_status_raises_fetch_error(serve):
+    base = serve({'/missing': missing})
+    with pytest.raises(FetchError) as excinfo:
+        get_engine().run(get_engine().get_json(base + '/missing'))
+    assert excinfo.value.status == 404
+
+
+def test_invalid_json_raises_fetch_error(serve):
+    base = serve({'/page': not_json})
+    with pytest.raises(FetchError, match='JSON'):
+        get_engine().run(get_engine().get_json(base + '/page'))
+
+
+def test_connection_error_raises_fetch_error(monkeypatch):
+    monkeypatch.setattr(get_engine(), 'max_retries', 0)
+    with pytest.raises(FetchError):
+        get_engine().run(get_engine().get_json('http://127.0.0.1:9/'))
+
+
+def test_semaphore_limits_concurrency(serve):
+    state = {'active': 0, 'peak': 0}
+
+    async def slow(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.2)
+        state['active'] -= 1
+        return web.json_response({})
+
+    base = serve({'/slow': slow})
+    engine = HttpEngine(max_concurrency=3)
+    try:
+        futures = [engine.submit(engine.get_json(base + '/slow')) for _ in range(12)]
+        for future in futures:
+            future.result()
+    finally:
+        engine.close()
+    assert state['peak'] == 3
+
+
+def test_close_allows_restart(serve):
+    base = serve({'/hello': hello})
+    engine = HttpEngine()
+    engine.run(engine.get_json(base + '/hello'))
+    engine.close()
+    assert engine.run(engine.get_json(base + '/hello')) == {'path': '/hello'}
+    engine.close()
+
+
+def tracked(delays):
+    """回傳依 delays 等待後回傳輸入值的協程函數，並記錄同時進行中的最大數量"""
+    state = {'active': 0, 'peak': 0, 'started': 0}
+
+    async def func(i):
+        state['active'] += 1
+        state['started'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        try:
+            await asyncio.sleep(delays[i])
+            return i
+        finally:
+            state['active'] -= 1
+
+    return func, state
+
+
+def test_map_ordered_yields_in_input_order():
+    rng = random.Random(0)
+    func, state = tracked([rng.uniform(0, 0.01) for _ in range(60)])
+
+    assert list(get_engine().map_ordered(func, range(60), 8)) == list(range(60))
+    assert state['peak'] <= 8
+
+
+def test_map_unordered_yields_every_result():
+    rng = random.Random(1)
+    func, state = tracked([rng.uniform(0, 0.01) for _ in range(60)])
+
+    assert sorted(get_engine().map_unordered(func, range(60), 8)) == list(range(60))
+    assert state['peak'] <= 8
+
+
+def test_map_unordered_close_cancels_pending():
+    func, state = tracked([0.0] + [5.0] * 99)
+    results = get_engine().map_unordered(func, range(100), 5)
+
+    assert next(results) == 0
+    results.close()
+    assert state['started'] <= 6
+
+
+def test_map_ordered_close_cancels_pending():
+    func, state = tracked([0.0] + [5.0] * 99)
+    results = get_engine().map_ordered(func, range(100), 5)
+
+    assert next(results) == 0
+    results.close()
+    assert state['started'] <= 6
+
+
+def test_throttled_request_is_retried(serve):
+    attempts = []
+
+    async def flaky(request):
+        attempts.append(request.path)
+        if len(attempts) < 3:
+            return web.Response(status=503, headers={'Retry-After': '0'})
+        return web.json_response({'ok': True})
+
+    base = serve({'/flaky': flaky})
+    engine = HttpEngine()
+    try:
+        assert engine.run(engine.get_json(base + '/flaky')) == {'ok': True}
+        [limiter] = engine.limiters.values()
+    finally:
+        engine.close()
+    assert len(attempts) == 3
+    assert limiter.rate < 20.0
+
+
+def test_client_error_is_not_retried(serve):
+    attempts = []
+
+    async def forbidden(request):
+        attempts.append(request.path)
+        return web.Response(status=403)
+
+    base = serve({'/forbidden': forbidden})
+    with pytest.raises(FetchError):
+        get_engine().run(get_engine().get_json(base + '/forbidden'))
+    assert len(attempts) == 1
@@ -0,0 +1,107 @@
+# tests/test_log_pipeline.py
+
+import json
+import logging
+import os
+import queue
+import time
+
+from modules.log_pipeline import (
+    JsonFormatter, NonBlockingQueueHandler, RepeatFilter, RotatingLogFileHandler
+)
+
+
+def make_record(created=0.0, level=logging.WARNING, lineno=10, msg='逾時', args=None, **extra):
+    """建立指定時間、等級與呼叫位置的紀錄"""
+    return logging.makeLogRecord(dict(
+        name='test', levelno=level, levelname=logging.getLevelName(level),
+        pathname='fetcher.py', lineno=lineno, msg=msg, args=args, created=created, **extra
+    ))
+
+
+def test_repeat_filter_suppresses_burst_and_reports_count():
+    repeat_filter = RepeatFilter(window=60, burst=2)
+
+    assert [repeat_filter.filter(make_record(created=t)) for t in range(5)] == \
+        [True, True, False, False, False]
+    assert repeat_filter.filter(make_record(created=1, lineno=11))
+    assert repeat_filter.filter(make_record(created=2, level=logging.INFO))
+
+    summary = make_record(created=61)
+    assert repeat_filter.filter(summary)
+    assert summary.suppressed == 3
+    assert '3 筆' in summary.getMessage()
+
+
+
+def test_repeat_filter_never_suppresses_errors():
+    repeat_filter = RepeatFilter(window=60, burst=1)
+    records = [make_record(created=t, level=logging.ERROR, msg=f"例外 {t}") for t in range(5)]
+
+    assert all(repeat_filter.filter(record) for record in records)
+    assert repeat_filter.pop_suppressed() == []
+
+def test_repeat_filter_pops_pending_suppressed():
+    repeat_filter = RepeatFilter(window=60, burst=1)
+    for t in range(3):
+        repeat_filter.filter(make_record(created=t, msg=f"逾時 {t}"))
+
+    [(record, count)] = repeat_filter.pop_suppressed()
+    assert count == 2
+    assert record.getMessage() == '逾時 2'
+    assert repeat_filter.pop_suppressed() == []
+
+
+def test_repeat_filter_disabled_with_zero_window():
+    repeat_filter = RepeatFilter(window=0, burst=1)
+    assert all(repeat_filter.filter(make_record(created=0)) for _ in range(5))
+
+
+def test_json_formatter_includes_extra_fields():
+    record = make_record(msg='逾時 %s', args=('a',), job_code='2007001000', latency=0.5)
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry['message'] == '逾時 a'
+    assert entry['level'] == 'WARNING'
+    assert entry['job_code'] == '2007001000'
+    assert entry['latency'] == 0.5
+    assert 'run' in entry
+
+
+def test_queue_handler_drops_when_full():
+    handler = NonBlockingQueueHandler(queue.Queue(2))
+    for _ in range(5):
+        handler.handle(make_record())
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_file_handler_opens_lazily_and_rotates_by_size(tmp_path):
+    path = tmp_path / 'logs' / 'analysis.log'
+    handler = RotatingLogFileHandler(path, max_bytes=200, backup_count=2, daily=False)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    assert not path.parent.exists()
+
+    for i in range(10):
+        handler.emit(make_record(msg='x' * 60 + str(i)))
+    handler.close()
+
+    assert sorted(p.name for p in path.parent.iterdir()) == \
+        ['analysis.log', 'analysis.log.1', 'analysis.log.2']
+    assert path.read_text(encoding='utf-8').splitlines()[-1].endswith('9')
+
+
+def test_file_handler_rotates_when_day_changes(tmp_path):
+    path = tmp_path / 'analysis.log'
+    path.write_text('昨天的紀錄\n', encoding='utf-8')
+    yesterday = time.time() - 86400
+    os.utime(path, (yesterday, yesterday))
+
+    handler = RotatingLogFileHandler(path, max_bytes=0, backup_count=2, daily=True)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.emit(make_record(created=time.time(), msg='今天的紀錄'))
+    handler.close()
+
+    assert (tmp_path / 'analysis.log.1').read_text(encoding='utf-8') == '昨天的紀錄\n'
+    assert path.read_text(encoding='utf-8') == '今天的紀錄\n'
@@ -0,0 +1,87 @@
+# tests/test_metrics.py
+
+import json
+
+from modules.http_client import get_engine
+from modules.metrics import Histogram, MetricsRegistry, endpoint_name, get_metrics
+
+
+def test_endpoint_name_replaces_id_segments():
+    assert endpoint_name('https://be.guide.104.com.tw/api/job/seniority/2007001004?type=1') == \
+        'be.guide.104.com.tw/api/job/seniority/{id}'
+    assert endpoint_name('https://www.104.com.tw/job/ajax/content/8pyre') == \
+        'www.104.com.tw/job/ajax/content/{id}'
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for value in (0.05, 0.05, 0.3, 0.8, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.6) == 0.5
+    assert histogram.quantile(0.99) == 2.0
+    assert histogram.summary()['count'] == 5
+
+
+def test_registry_tracks_inflight_statuses_and_errors():
+    metrics = MetricsRegistry()
+    metrics.request_started('a')
+    metrics.request_started('a')
+    metrics.request_finished('a', 200, {'total': 0.02}, size=100)
+    metrics.request_finished('a', None, {'total': 1.0})
+    metrics.record_retry('a')
+
+    [stats] = metrics.snapshot()['endpoints'].values()
+    assert stats['requests'] == 2
+    assert stats['statuses'] == {'200': 1}
+    assert stats['errors'] == 1
+    assert stats['retries'] == 1
+    assert stats['bytes'] == 100
+    assert stats['peak_inflight'] == 2
+    assert metrics.inflight == 0
+
+
+def test_spans_and_timed_iter():
+    metrics = MetricsRegistry()
+    with metrics.span('write'):
+        pass
+    assert list(metrics.timed_iter(range(3), 'fetch')) == [0, 1, 2]
+
+    spans = metrics.snapshot()['spans']
+    assert spans['write']['count'] == 1
+    assert spans['fetch']['count'] == 4  # 含最後一次 StopIteration
+
+
+def test_prometheus_export(tmp_path):
+    metrics = MetricsRegistry()
+    metrics.request_started('host/path')
+    metrics.request_finished('host/path', 200, {'total': 0.02, 'ttfb': 0.01})
+    metrics.set_gauge('rate_limit', 'host', 12.5)
+    path = tmp_path / 'metrics.prom'
+
+    metrics.write_prometheus(path)
+
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert 'job_analyzer_http_requests_total{endpoint="host/path"} 1' in lines
+    assert 'job_analyzer_http_responses_total{endpoint="host/path",status="200"} 1' in lines
+    assert ('job_analyzer_http_request_duration_seconds_bucket'
+            '{endpoint="host/path",stage="total",le="0.025"} 1') in lines
+    assert 'job_analyzer_rate_limit{key="host"} 12.5' in lines
+    assert not path.with_name('metrics.prom.tmp').exists()
+
+
+def test_engine_records_request_timings(mock_server, tmp_path):
+    url = mock_server.base_urls['guide'] + '/api/job/seniority/2007001004?type=1'
+    endpoint = endpoint_name(url)
+    before = get_metrics().snapshot()['endpoints'].get(endpoint, {}).get('requests', 0)
+
+    get_engine().run(get_engine().get_json(url))
+
+    path = tmp_path / 'summary.json'
+    get_metrics().write_summary(path)
+    stats = json.loads(path.read_text(encoding='utf-8'))['endpoints'][endpoint]
+    assert stats['requests'] == before + 1
+    assert stats['statuses']['200'] >= 1
+    assert stats['timings']['ttfb']['count'] == stats['requests']
@@ -0,0 +1,66 @@
+# tests/test_mock_server.py
+
+import json
+import urllib.error
+import urllib.request
+
+from benchmarks.mock_server import CATEGORY_ETAG, MockServer, MockSettings
+
+
+def get(url, headers=None):
+    """以標準函式庫送出請求，不經過 HTTP 引擎的重試與速率限制"""
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def test_recorded_responses_are_stable_per_key(mock_server):
+    guide = mock_server.base_urls['guide']
+    first = get(f"{guide}/api/job/seniority/2007001004?type=1")[2]
+    again = get(f"{guide}/api/job/seniority/2007001004?type=1")[2]
+
+    assert first == again
+    assert 'salaryList' in json.loads(first)
+
+
+def test_search_pages_have_unique_job_links(mock_server):
+    www = mock_server.base_urls['www']
+    links = set()
+    for page in (1, 2):
+        data = json.loads(get(f"{www}/jobs/search/list?ro=0&page={page}")[2])['data']
+        assert data['totalPage'] == mock_server.settings.total_pages
+        links |= {job['link']['job'] for job in data['list']}
+
+    assert len(links) == 2 * len(data['list'])
+
+
+def test_job_cat_supports_conditional_requests(mock_server):
+    url = mock_server.base_urls['static'] + '/category-tool/json/JobCat.json'
+    status, headers, _ = get(url)
+    assert status == 200 and headers['ETag'] == CATEGORY_ETAG
+
+    assert get(url, {'If-None-Match': CATEGORY_ETAG})[0] == 304
+
+
+def test_rate_limit_returns_429_with_retry_after():
+    with MockServer(MockSettings(latency=0.0, jitter=0.0, rate_limit=3, retry_after=2)) as server:
+        url = server.base_urls['guide'] + '/wow/jobCard/job?jobCode=2007001004'
+        responses = [get(url) for _ in range(10)]
+
+    throttled = [headers for status, headers, _ in responses if status == 429]
+    assert throttled and all(headers['Retry-After'] == '2' for headers in throttled)
+    assert server.api.stats['status:429'] == len(throttled)
+
+
+def test_error_rate_is_reproducible_with_seed():
+    def statuses():
+        with MockServer(MockSettings(latency=0.0, jitter=0.0, error_rate=0.5, seed=7)) as server:
+            url = server.base_urls['www'] + '/job/ajax/content/abc'
+            return [get(url)[0] for _ in range(20)]
+
+    first = statuses()
+    assert first == statuses()
+    assert {200} < set(first)
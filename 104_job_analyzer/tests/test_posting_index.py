@@ -0,0 +1,66 @@
+# tests/test_posting_index.py
+
+import pytest
+
+from modules.posting_index import PostingIndex, posting_fingerprint
+
+SCOPE = 'https://www.104.com.tw/jobs/search/list?ro=0&keyword=Python&page='
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = PostingIndex(tmp_path / 'postings.sqlite3')
+    yield index
+    index.close()
+
+
+def posting(job_no: str, fingerprint: str = 'f1'):
+    return job_no, f"id{job_no}", f"https://www.104.com.tw/job/id{job_no}", fingerprint
+
+
+def changes(index, day, kinds=None):
+    return {(row['change'], row['job_no']) for row in index.iter_changes(SCOPE, day, kinds)}
+
+
+def test_first_run_reports_everything_as_new(index):
+    assert index.observe(SCOPE, [posting('1'), posting('2')], '2024-01-01') == {'1', '2'}
+    assert changes(index, '2024-01-01') == {('new', '1'), ('new', '2')}
+
+
+def test_unchanged_postings_are_not_reported(index):
+    index.observe(SCOPE, [posting('1'), posting('2')], '2024-01-01')
+    assert index.observe(SCOPE, [posting('1'), posting('2')], '2024-01-02') == set()
+    assert index.mark_removed(SCOPE, '2024-01-02') == 0
+    assert changes(index, '2024-01-02') == set()
+
+
+def test_new_changed_and_removed(index):
+    index.observe(SCOPE, [posting('1'), posting('2'), posting('3')], '2024-01-01')
+
+    observed = index.observe(SCOPE, [posting('1'), posting('2', 'f2'), posting('4')], '2024-01-02')
+    assert observed == {'2', '4'}
+    assert index.mark_removed(SCOPE, '2024-01-02') == 1
+    assert changes(index, '2024-01-02') == {('changed', '2'), ('new', '4'), ('removed', '3')}
+    assert changes(index, '2024-01-02', kinds=['removed']) == {('removed', '3')}
+
+
+def test_reappearing_posting_counts_as_changed(index):
+    index.observe(SCOPE, [posting('1'), posting('2')], '2024-01-01')
+    index.observe(SCOPE, [posting('1')], '2024-01-02')
+    index.mark_removed(SCOPE, '2024-01-02')
+
+    assert index.observe(SCOPE, [posting('1'), posting('2')], '2024-01-03') == {'2'}
+    assert changes(index, '2024-01-03') == {('changed', '2')}
+
+
+def test_scopes_are_independent(index):
+    index.observe(SCOPE, [posting('1')], '2024-01-01')
+    index.observe('other', [posting('2')], '2024-01-02')
+    assert index.mark_removed('other', '2024-01-02') == 0
+    assert changes(index, '2024-01-02') == set()
+
+
+def test_fingerprint_only_uses_configured_fields():
+    job = {'jobNo': '1', 'jobName': 'Python 工程師', 'appearDate': '20240101'}
+    assert posting_fingerprint(job) == posting_fingerprint(dict(job, applyCnt='11~30人'))
+    assert posting_fingerprint(job) != posting_fingerprint(dict(job, salaryLow=50000))
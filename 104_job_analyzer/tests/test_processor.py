@@ -0,0 +1,125 @@
+# tests/test_processor.py
+
+import random
+from collections import Counter
+
+import pytest
+from aiohttp import web
+
+import modules.fetcher
+from config import ALL_SALARY_TYPES
+from modules.processor import iter_salary_records, iter_skill_records, merge_skill_parts
+from modules.result_store import get_result_store
+
+JOB_CODES = [f"20070010{i:02d}" for i in range(1, 31)]
+
+
+def shuffled_codes(seed: int):
+    codes = list(JOB_CODES)
+    random.Random(seed).shuffle(codes)
+    return codes
+
+
+def distinct_keys(records):
+    """依出現順序取得不重複的 (job_code, salary_type)"""
+    return list(dict.fromkeys((record['job_code'], record['salary_type']) for record in records))
+
+
+@pytest.fixture
+def job_card(serve, monkeypatch):
+    """模擬 jobCard/job 與 jobCard/cert；failing 中的端點回傳 404，回傳 (請求次數, failing)"""
+    requests, failing = Counter(), set()
+
+    def endpoint(part, payload):
+        async def handler(request):
+            job_code = request.query['jobCode']
+            requests[(job_code, part)] += 1
+            if part in failing:
+                return web.Response(status=404)
+            return web.json_response(dict(payload, jobCode=job_code))
+        return handler
+
+    base = serve({
+        '/wow/jobCard/job': endpoint('job', {'jobName': '軟體工程師', 'description': '開發'}),
+        '/wow/jobCard/cert': endpoint('cert', {'hardSkillList': [{'id': '1', 'name': 'Python'}],
+                                               'hardToolList': [], 'hardCertList': []}),
+    })
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_CARD_SKILL', base + '/wow/jobCard/job?jobCode={job_code}')
+    monkeypatch.setattr(modules.fetcher, 'URL_JOB_CERT_SKILL', base + '/wow/jobCard/cert?jobCode={job_code}')
+    return requests, failing
+
+
+def test_merge_skill_parts():
+    record = merge_skill_parts('A', None, {'hardSkillList': [{'id': '1'}]})
+    assert record == {'jobCode': 'A', 'hardSkillList': [{'id': '1'}],
+                      'hardToolList': [], 'hardCertList': [], 'complete': False}
+    assert merge_skill_parts('A', {'jobCode': 'A'}, {})['complete']
+
+
+def test_partial_skill_record_fetches_only_missing_half_next_time(job_card):
+    requests, failing = job_card
+    failing.add('cert')
+
+    [partial] = iter_skill_records(['P000000001'], max_age=3600)
+    assert not partial['complete']
+    assert partial['jobName'] == '軟體工程師'
+
+    failing.clear()
+    [record] = iter_skill_records(['P000000001'], max_age=3600)
+    assert record['complete']
+    assert record['hardSkillList'] == [{'id': '1', 'name': 'Python'}]
+    assert requests == Counter({('P000000001', 'job'): 1, ('P000000001', 'cert'): 2})
+
+    # 完整的紀錄已寫入結果儲存，第三次執行不再送出請求
+    assert list(iter_skill_records(['P000000001'], max_age=3600)) == [record]
+    assert sum(requests.values()) == 3
+
+
+def test_both_halves_failing_yields_nothing(job_card):
+    requests, failing = job_card
+    failing.update({'job', 'cert'})
+
+    assert list(iter_skill_records(['P000000002'], max_age=3600)) == []
+    assert requests == Counter({('P000000002', 'job'): 1, ('P000000002', 'cert'): 1})
+
+
+def test_salary_records_follow_input_order(mock_server):
+    codes = shuffled_codes(0)
+    fetched = list(iter_salary_records(codes, max_age=0))
+    cached = list(iter_salary_records(codes, max_age=3600))
+
+    order = {(code, ALL_SALARY_TYPES[type_id]): i for i, (code, type_id) in
+             enumerate((code, type_id) for code in codes for type_id in ALL_SALARY_TYPES)}
+    positions = [order[key] for key in distinct_keys(fetched)]
+    assert positions == sorted(positions)
+    assert cached == fetched
+
+
+def test_skill_records_follow_input_order(mock_server):
+    codes = shuffled_codes(1)
+    fetched = list(iter_skill_records(codes, max_age=0))
+    cached = list(iter_skill_records(codes, max_age=3600))
+
+    assert [record['jobCode'] for record in fetched] == codes
+    assert all(record['complete'] for record in fetched)
+    assert [record['jobCode'] for record in cached] == codes
+
+
+def test_mixed_sources_keep_input_order(mock_server):
+    codes = shuffled_codes(2)
+    list(iter_skill_records(codes[::2], max_age=0))  # 一半已在結果儲存中
+
+    records = list(iter_skill_records(codes + codes[:3], max_age=3600))
+
+    assert [record['jobCode'] for record in records] == codes
+
+
+def test_complete_skill_record_discards_parts(mock_server):
+    store = get_result_store()
+    code = JOB_CODES[0]
+    store.save_many('skill_part', [((code, 1), {'jobCode': code})])
+
+    list(iter_skill_records([code], max_age=0))
+
+    assert store.load_fresh('skill_part', [(code, 1), (code, 2)], 3600) == {}
+    assert (code, 0) in store.fresh_keys('skill', 3600)
@@ -0,0 +1,137 @@
+# tests/test_rate_limit.py
+
+import asyncio
+import random
+import time
+from email.utils import formatdate
+
+import pytest
+
+from config import RETRY_BACKOFF_MAX
+from modules.rate_limit import AdaptiveRateLimiter, backoff_delay, parse_retry_after
+
+
+def make_limiter(**kwargs) -> AdaptiveRateLimiter:
+    options = dict(rate=10.0, min_rate=1.0, max_rate=100.0, increase=1.0,
+                   decrease=0.5, latency_factor=3.0)
+    options.update(kwargs)
+    return AdaptiveRateLimiter('test', **options)
+
+
+def test_slow_start_adds_one_per_success():
+    limiter = make_limiter()
+    for _ in range(10):
+        limiter.on_success(0.05)
+    assert limiter.rate == pytest.approx(20.0)
+    assert limiter.slow_start
+
+
+def test_slow_start_is_capped_by_max_rate():
+    limiter = make_limiter(max_rate=15.0)
+    for _ in range(50):
+        limiter.on_success(0.05)
+    assert limiter.rate == 15.0
+
+
+def test_throttle_halves_rate_and_ends_slow_start():
+    limiter = make_limiter()
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(5.0)
+    assert not limiter.slow_start
+
+    # 之後改為加法增加：每個成功回應增加 increase / rate
+    limiter.on_success(0.05)
+    assert limiter.rate == pytest.approx(5.2)
+
+
+def test_repeated_throttle_within_a_second_counts_once():
+    limiter = make_limiter()
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(5.0)
+
+
+def test_rate_never_drops_below_min_rate():
+    limiter = make_limiter(rate=1.5)
+    limiter.on_throttle()
+    assert limiter.rate == 1.0
+
+
+def test_latency_increase_slows_down():
+    limiter = make_limiter()
+    limiter.on_success(0.05)
+    for _ in range(20):
+        limiter.on_success(1.0)
+    assert not limiter.slow_start
+    assert limiter.rate < 11.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """以手動前進的時鐘取代 time.monotonic，回傳 [目前時間]"""
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+    return now
+
+
+def respond(limiter, clock, latencies):
+    """依目前速率的間隔依序回報成功的回應"""
+    for latency in latencies:
+        clock[0] += 1.0 / limiter.rate
+        limiter.on_success(latency)
+
+
+def test_rate_recovers_when_latency_rises_then_holds(clock):
+    limiter = make_limiter()
+    respond(limiter, clock, [0.05] * 5)
+    respond(limiter, clock, [0.5] * 10)
+    assert limiter.rate < 10.0
+
+    # 延遲停在新的水準：基準已重設，不再每秒減半，速率逐步回升
+    respond(limiter, clock, [0.5] * 600)
+    assert limiter.rate > 15.0
+
+
+def test_latency_jitter_does_not_collapse_rate(clock):
+    rng = random.Random(0)
+    limiter = make_limiter(max_rate=200.0)
+    respond(limiter, clock, [0.005 + rng.expovariate(1 / 0.08) for _ in range(20000)])
+    assert limiter.rate > 20.0
+
+
+def test_retry_after_is_capped(clock):
+    limiter = make_limiter()
+    limiter.on_throttle(retry_after=3600)
+    assert limiter._paused_until - clock[0] == RETRY_BACKOFF_MAX
+
+
+def test_slow_start_can_be_disabled():
+    limiter = make_limiter(slow_start=False)
+    limiter.on_success(0.05)
+    assert limiter.rate == pytest.approx(10.1)
+
+
+def test_retry_after_pauses_acquire():
+    limiter = make_limiter(rate=1000.0)
+
+    async def run() -> float:
+        await limiter.acquire()
+        limiter.on_throttle(retry_after=0.2)
+        start = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.19
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({'Retry-After': '3'}) == 3.0
+    assert parse_retry_after({'Retry-After': '-1'}) == 0.0
+    assert parse_retry_after({}) is None
+    assert parse_retry_after({'Retry-After': 'soon'}) is None
+    assert 25 <= parse_retry_after({'Retry-After': formatdate(time.time() + 30, usegmt=True)}) <= 30
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4.0) <= min(4.0, 0.5 * 2 ** attempt)
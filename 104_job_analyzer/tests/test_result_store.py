@@ -0,0 +1,59 @@
+# tests/test_result_store.py
+
+import time
+
+import pytest
+
+from modules.result_store import ResultStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(tmp_path / 'results.sqlite3')
+    yield store
+    store.close()
+
+
+def test_save_many_counts_new_and_changed(store):
+    assert store.save_many('salary', [(('A', 1), [1]), (('A', 2), [2])]) == 2
+    assert store.save_many('salary', [(('A', 1), [1]), (('A', 2), [3])]) == 1
+    assert store.load_fresh('salary', [('A', 1), ('A', 2)], 60) == {('A', 1): [1], ('A', 2): [3]}
+
+
+def test_load_fresh_filters_kind_and_keys(store):
+    store.save_many('skill', [(('A', 0), {'s': 1}), (('B', 0), {'s': 2})])
+    store.save_many('salary', [(('A', 0), [])])
+
+    assert store.load_fresh('skill', [('A', 0)], 60) == {('A', 0): {'s': 1}}
+    assert store.load_fresh('skill', [('C', 0)], 60) == {}
+
+
+def test_zero_max_age_treats_everything_as_stale(store):
+    store.save_many('skill', [(('A', 0), {})])
+    assert store.load_fresh('skill', [('A', 0)], 0) == {}
+
+
+def test_expired_results_are_not_returned(store):
+    store.save_many('skill', [(('A', 0), {})])
+    time.sleep(0.05)
+    assert store.load_fresh('skill', [('A', 0)], 0.01) == {}
+
+
+def test_fresh_keys(store):
+    store.save_many('salary', [(('A', 1), []), (('A', 2), [])])
+    store.save_many('skill', [(('B', 0), {})])
+
+    assert store.fresh_keys('salary', 60) == {('A', 1), ('A', 2)}
+    assert store.fresh_keys('salary', 0) == set()
+
+
+def test_iter_fresh_allows_writes_while_iterating(store):
+    store.save_many('skill', [((f"J{i}", 0), {'i': i}) for i in range(10)])
+
+    seen = []
+    for (job_code, _), payload in store.iter_fresh('skill', [(f"J{i}", 0) for i in range(5)], 60):
+        seen.append(payload['i'])
+        store.save_many('skill', [((job_code, 0), {'i': payload['i'] + 100})])
+
+    assert sorted(seen) == list(range(5))
+    assert store.load_fresh('skill', [('J0', 0)], 60) == {('J0', 0): {'i': 100}}
@@ -0,0 +1,100 @@
+# tests/test_salary_stats.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.salary_stats import (
+    aggregate_salaries, build_salary_table, load_salary_table, salary_snapshot_files
+)
+
+JOBCAT = pd.DataFrame([
+    {'parent_code': '2007001000', 'parent_name': '軟體／工程類人員', 'job_code': '2007001004', 'job_name': '軟體工程師'},
+    {'parent_code': '2007001000', 'parent_name': '軟體／工程類人員', 'job_code': '2007001012', 'job_name': '韌體工程師'},
+    {'parent_code': '2008001000', 'parent_name': '財務會計類人員', 'job_code': '2008001001', 'job_name': '會計'},
+])
+
+
+def snapshot(rows):
+    """rows: (job_code, salary_type, analyzeCode, sampleCount, salary50)"""
+    return pd.DataFrame([
+        {'job_code': code, 'salary_type': salary_type, 'analyzeCode': band, 'desc': f"年資{band}",
+         'sampleCount': samples, 'salary': median, 'salary25': median - 5000,
+         'salary50': median, 'salary75': median + 5000}
+        for code, salary_type, band, samples, median in rows
+    ])
+
+
+def test_weighted_mean_per_parent_band_and_type():
+    table = build_salary_table([('20260101', snapshot([
+        ('2007001004', '月薪', 1, 30, 40000),
+        ('2007001012', '月薪', 1, 10, 60000),
+        ('2008001001', '月薪', 1, 5, 35000),
+        ('9999999999', '月薪', 1, 5, 99999),  # 不在職務類別表中
+    ]))], JOBCAT)
+    df = aggregate_salaries(table)
+
+    assert len(table) == 3
+    row = df[df['parent_code'] == '2007001000'].iloc[0]
+    assert row['salary50'] == pytest.approx((30 * 40000 + 10 * 60000) / 40)
+    assert row['job_count'] == 2
+    assert row['sample_count'] == 40
+    assert row['desc'] == '年資1'
+
+
+def test_yearly_salaries_are_converted_to_monthly():
+    table = build_salary_table([('20260101', snapshot([
+        ('2007001004', '年薪', 2, 10, 840000),
+    ]))], JOBCAT)
+    [row] = aggregate_salaries(table).to_dict('records')
+
+    assert row['salary_type'] == '年薪'
+    assert row['salary50'] == pytest.approx(70000)
+
+
+def test_rows_without_samples_are_ignored_in_means():
+    table = build_salary_table([('20260101', snapshot([
+        ('2007001004', '月薪', 1, 0, 99000),
+        ('2007001012', '月薪', 1, 4, 50000),
+    ]))], JOBCAT)
+    [row] = aggregate_salaries(table).to_dict('records')
+
+    assert row['salary50'] == pytest.approx(50000)
+    assert row['job_count'] == 2
+
+
+def test_change_against_previous_snapshot():
+    table = build_salary_table([
+        ('20260101', snapshot([('2007001004', '月薪', 1, 10, 40000)])),
+        ('20260102', snapshot([('2007001004', '月薪', 1, 12, 44000),
+                               ('2008001001', '月薪', 1, 3, 30000)])),
+    ], JOBCAT)
+    df = aggregate_salaries(table).set_index(['parent_code', 'date'])
+
+    latest = df.loc[('2007001000', np.datetime64('2026-01-02'))]
+    assert latest['salary50_change'] == pytest.approx(4000)
+    assert latest['salary50_pct_change'] == pytest.approx(10.0)
+    assert latest['sample_count_change'] == 2
+    assert np.isnan(df.loc[('2008001000', np.datetime64('2026-01-02')), 'salary50_change'])
+
+
+def test_snapshot_files_prefer_parquet_and_limit_days(tmp_path):
+    for date in ('20260101', '20260102', '20260103'):
+        snapshot([('2007001004', '月薪', 1, 10, 40000)]).to_csv(
+            tmp_path / f"104_salaries_{date}.csv", index=False, encoding='utf-8-sig')
+    snapshot([('2007001004', '月薪', 1, 10, 50000)]).to_parquet(
+        tmp_path / "104_salaries_20260103.parquet", index=False)
+
+    files = salary_snapshot_files(tmp_path, days=2)
+    assert list(files) == ['20260102', '20260103']
+    assert files['20260103'].suffix == '.parquet'
+
+    table = load_salary_table(JOBCAT, tmp_path, days=0)
+    assert len(table) == 3
+    assert sorted(table.values[:, 2]) == [40000, 40000, 50000]
+
+
+def test_empty_input():
+    table = build_salary_table([], JOBCAT)
+    assert len(table) == 0
+    assert aggregate_salaries(table).empty
@@ -0,0 +1,71 @@
+# tests/test_scheduler.py
+
+import threading
+
+import pytest
+
+from modules.scheduler import PhaseScheduler
+
+
+def test_dependencies_run_first():
+    order = []
+    scheduler = PhaseScheduler()
+    scheduler.add('categories', lambda: order.append('categories'))
+    scheduler.add('skill', lambda: order.append('skill'), depends=['categories'])
+    scheduler.add('salary', lambda: order.append('salary'), depends=['categories'])
+
+    results = scheduler.run()
+
+    assert order[0] == 'categories'
+    assert sorted(order[1:]) == ['salary', 'skill']
+    assert {name: result.status for name, result in results.items()} == {
+        'categories': 'ok', 'skill': 'ok', 'salary': 'ok'}
+
+
+def test_independent_phases_run_concurrently():
+    # 兩個階段都到達 barrier 才會完成；依序執行時會逾時而失敗
+    barrier = threading.Barrier(2, timeout=5)
+    scheduler = PhaseScheduler()
+    scheduler.add('skill', barrier.wait)
+    scheduler.add('salary', barrier.wait)
+
+    results = scheduler.run()
+
+    assert [result.status for result in results.values()] == ['ok', 'ok']
+
+
+def test_failure_skips_dependents_only():
+    def fail():
+        raise RuntimeError('boom')
+
+    ran = []
+    scheduler = PhaseScheduler()
+    scheduler.add('categories', fail)
+    scheduler.add('job', lambda: ran.append('job'))
+    scheduler.add('skill', lambda: ran.append('skill'), depends=['categories'])
+    scheduler.add('index', lambda: ran.append('index'), depends=['skill'])
+
+    results = scheduler.run()
+
+    assert results['categories'].status == 'failed'
+    assert isinstance(results['categories'].error, RuntimeError)
+    assert results['job'].status == 'ok'
+    assert results['skill'].status == 'skipped'
+    assert results['index'].status == 'skipped'
+    assert ran == ['job']
+
+
+def test_results_follow_insertion_order():
+    scheduler = PhaseScheduler()
+    for name in ('c', 'a', 'b'):
+        scheduler.add(name, lambda: None)
+    assert list(scheduler.run()) == ['c', 'a', 'b']
+
+
+def test_add_rejects_duplicate_and_unknown_dependencies():
+    scheduler = PhaseScheduler()
+    scheduler.add('categories', lambda: None)
+    with pytest.raises(ValueError):
+        scheduler.add('categories', lambda: None)
+    with pytest.raises(ValueError):
+        scheduler.add('skill', lambda: None, depends=['missing'])
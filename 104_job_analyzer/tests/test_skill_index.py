@@ -0,0 +1,108 @@
+# tests/test_skill_index.py
+
+from collections import Counter
+from itertools import permutations
+
+import pytest
+
+import modules.skill_index as skill_index
+from modules.skill_index import SkillIndex, SkillIndexBuilder
+
+
+def skill_json(job_code, job_name, skills=(), tools=(), certs=()):
+    return {
+        'jobCode': job_code, 'jobName': job_name,
+        'hardSkillList': [{'id': sid, 'name': name} for sid, name in skills],
+        'hardToolList': [{'id': sid, 'name': name} for sid, name in tools],
+        'hardCertList': [{'id': sid, 'name': name} for sid, name in certs],
+    }
+
+
+PYTHON, SQL, GIT, LINUX = ('1', 'Python'), ('2', 'SQL'), ('10', 'Git'), ('20', 'Linux')
+JOBS = [
+    skill_json('2007001004', '軟體工程師', [PYTHON, SQL, PYTHON], [GIT]),
+    skill_json('2007001012', '韌體工程師', [PYTHON], [GIT, LINUX]),
+    skill_json('2007001020', '資料庫管理', [SQL], [LINUX]),
+    skill_json('2008001001', '會計'),
+]
+
+
+@pytest.fixture
+def index():
+    builder = SkillIndexBuilder()
+    assert list(builder.collect(JOBS)) == JOBS
+    return builder.build()
+
+
+def test_jobs_for_skill_by_id_or_name(index):
+    expected = [{'job_code': '2007001004', 'job_name': '軟體工程師'},
+                {'job_code': '2007001012', 'job_name': '韌體工程師'}]
+    assert index.jobs_for_skill('1') == expected
+    assert index.jobs_for_skill('python') == expected
+    assert index.jobs_for_skill('Rust') == []
+
+
+def test_skills_for_job_lists_each_skill_once(index):
+    skills = index.skills_for_job('2007001004')
+    assert sorted((s['id'], s['kind']) for s in skills) == [('1', 'skill'), ('10', 'tool'), ('2', 'skill')]
+    assert index.skills_for_job('2008001001') == []
+    assert index.skills_for_job('0000000000') == []
+
+
+def test_cooccurrence_matches_brute_force(index):
+    expected = Counter()
+    for job in JOBS:
+        ids = {item['id'] for field in ('hardSkillList', 'hardToolList', 'hardCertList')
+               for item in job[field]}
+        expected.update(permutations(sorted(ids), 2))
+
+    for skill_id in ('1', '2', '10', '20'):
+        result = {row['id']: row['count'] for row in index.cooccurring(skill_id)}
+        assert result == {b: n for (a, b), n in expected.items() if a == skill_id}
+
+
+def test_cooccurring_is_sorted_and_limited(index):
+    rows = index.cooccurring('Git', top=1)
+    assert rows == [{'id': '1', 'name': 'Python', 'kind': 'skill', 'count': 2}]
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = tmp_path / 'skill_index.npz'
+    index.save(path)
+    loaded = SkillIndex.load(path)
+
+    assert len(loaded) == len(index) == 4
+    assert loaded.cooccurring('SQL') == index.cooccurring('SQL')
+    assert not list(tmp_path.glob('*.tmp.npz'))
+
+
+def test_empty_builder():
+    index = SkillIndexBuilder().build()
+    assert len(index) == 0
+    assert index.cooccurring('Python') == []
+
+
+def test_rebuild_and_query_from_command_line(tmp_path, monkeypatch, capsys):
+    from modules.result_store import ResultStore
+
+    store = ResultStore(tmp_path / 'results.sqlite3')
+    store.save_many('skill', [((job['jobCode'], 0), job) for job in JOBS])
+    monkeypatch.setattr('modules.result_store._store', store)
+    monkeypatch.setattr(skill_index, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(skill_index, '_index', None)
+
+    assert skill_index.main(['build']) == 0
+    assert skill_index.skill_index_path().exists()
+    monkeypatch.setattr(skill_index, '_index', None)
+
+    assert skill_index.main(['jobs', 'SQL']) == 0
+    assert capsys.readouterr().out.splitlines() == ['2007001004\t軟體工程師', '2007001020\t資料庫管理']
+    store.close()
+
+
+def test_query_without_index_fails(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(skill_index, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(skill_index, '_index', None)
+
+    assert skill_index.main(['jobs', 'SQL']) == 1
+    assert '找不到技能索引' in capsys.readouterr().err
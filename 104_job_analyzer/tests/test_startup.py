@@ -0,0 +1,40 @@
+# tests/test_startup.py
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+
+def run_python(args, cwd):
+    """在 cwd 中以全新的子行程執行，專案目錄加入 PYTHONPATH"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_DIR))
+    return subprocess.run([sys.executable, *args], cwd=cwd, env=env,
+                          capture_output=True, text=True, timeout=60)
+
+
+def test_help_creates_no_log_files(tmp_path):
+    proc = run_python([str(PROJECT_DIR / 'main.py'), '--help'], tmp_path)
+
+    assert proc.returncode == 0, proc.stderr
+    assert '--mode' in proc.stdout
+    assert not (tmp_path / 'logs').exists()
+
+
+def test_argument_error_creates_no_log_files(tmp_path):
+    proc = run_python([str(PROJECT_DIR / 'main.py'), '--mode', 'unknown'], tmp_path)
+
+    assert proc.returncode == 2
+    assert not (tmp_path / 'logs').exists()
+
+
+def test_main_import_defers_heavy_packages(tmp_path):
+    code = ("import sys, main; "
+            "print(','.join(m for m in ('pandas', 'aiohttp') if m in sys.modules))")
+    proc = run_python(['-c', code], tmp_path)
+
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ''
+    assert not (tmp_path / 'logs').exists()
@@ -0,0 +1,107 @@
+# tests/test_work_queue.py
+
+import time
+
+import pytest
+
+from modules.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(tmp_path / 'work_queue.sqlite3', lease_seconds=60, max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def test_lease_hands_out_each_task_once(queue):
+    queue.enqueue('skill', [(f"jc{i}", {'job_code': f"jc{i}"}) for i in range(5)])
+
+    first = queue.lease('skill', 'worker-a', 3)
+    second = queue.lease('skill', 'worker-b', 3)
+
+    assert [task.key for task in first] == ['jc0', 'jc1', 'jc2']
+    assert [task.key for task in second] == ['jc3', 'jc4']
+    assert first[0].payload == {'job_code': 'jc0'}
+    assert first[0].attempts == 1
+    assert queue.lease('skill', 'worker-c', 3) == []
+    assert queue.counts('skill')['leased'] == 5
+
+
+def test_expired_lease_is_handed_out_again(tmp_path):
+    queue = WorkQueue(tmp_path / 'work_queue.sqlite3', lease_seconds=0.05)
+    try:
+        queue.enqueue('salary', [('jc0:1', None)])
+        assert len(queue.lease('salary', 'crashed-worker', 10)) == 1
+        assert queue.lease('salary', 'worker-b', 10) == []
+
+        time.sleep(0.1)
+        retaken = queue.lease('salary', 'worker-b', 10)
+        assert [task.key for task in retaken] == ['jc0:1']
+        assert retaken[0].attempts == 2
+    finally:
+        queue.close()
+
+
+
+def test_stale_worker_cannot_complete_or_release_taken_over_tasks(tmp_path):
+    queue = WorkQueue(tmp_path / 'work_queue.sqlite3', lease_seconds=0.05)
+    try:
+        queue.enqueue('skill', [('jc0', None), ('jc1', None)])
+        queue.lease('skill', 'stale-worker', 10)
+        time.sleep(0.1)
+        assert len(queue.lease('skill', 'worker-b', 10)) == 2
+
+        # 原工作者遲來的結果與歸還不影響 worker-b 的租約
+        assert queue.complete('skill', 'stale-worker', [('jc0', 'old')]) == 0
+        assert queue.release('skill', 'stale-worker', ['jc1']) == 0
+        assert queue.counts('skill')['leased'] == 2
+
+        assert queue.complete('skill', 'worker-b', [('jc0', 'new'), ('jc1', None)]) == 2
+        assert queue.complete('skill', 'worker-b', [('jc0', 'again')]) == 0
+        assert [result for *_, result in queue.iter_tasks('skill')] == ['new', None]
+    finally:
+        queue.close()
+
+def test_release_retries_until_max_attempts(queue):
+    queue.enqueue('skill', [('jc0', None)])
+
+    queue.lease('skill', 'worker', 1)
+    queue.release('skill', 'worker', ['jc0'])
+    assert queue.counts('skill')['pending'] == 1
+
+    queue.lease('skill', 'worker', 1)
+    queue.release('skill', 'worker', ['jc0'])
+    assert queue.counts('skill')['failed'] == 1
+    assert queue.lease('skill', 'worker', 1) == []
+    assert queue.is_drained('skill')
+
+
+def test_complete_keeps_results(queue):
+    queue.enqueue('job', [('p1', {'page': 1}), ('p2', {'page': 2})])
+    queue.lease('job', 'worker', 10)
+    queue.complete('job', 'worker', [('p1', ['a', 'b']), ('p2', None)])
+
+    assert queue.is_drained('job')
+    assert list(queue.iter_tasks('job', status='done')) == [
+        ('p1', {'page': 1}, 'done', ['a', 'b']),
+        ('p2', {'page': 2}, 'done', None),
+    ]
+
+
+def test_enqueue_does_not_reset_active_lease(queue):
+    queue.enqueue('skill', [('jc0', None), ('jc1', None)])
+    queue.lease('skill', 'worker', 1)
+    queue.complete('skill', 'worker', [])
+
+    # jc0 仍在租約內，重新加入不影響；jc1 重設為 pending
+    assert queue.enqueue('skill', [('jc0', None), ('jc1', None)]) == 1
+    assert queue.counts('skill') == {'pending': 1, 'leased': 1, 'done': 0, 'failed': 0}
+
+
+def test_queues_are_independent(queue):
+    queue.enqueue('skill', [('jc0', None)])
+    queue.enqueue('salary', [('jc0:1', None)])
+    queue.clear('skill')
+    assert queue.counts('skill')['pending'] == 0
+    assert queue.counts('salary')['pending'] == 1
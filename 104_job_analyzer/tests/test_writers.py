@@ -0,0 +1,57 @@
+# tests/test_writers.py
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from modules.writers import (
+    get_default_formats, open_sink, set_default_formats, write_frame
+)
+
+
+def test_csv_sink_keeps_first_batch_columns(tmp_path):
+    path = tmp_path / 'out.csv'
+    sink = open_sink(path, 'csv')
+    sink.write(pd.DataFrame([{'a': 1, 'b': 'x'}]))
+    sink.write(pd.DataFrame([{'b': 'y', 'c': 3}]))
+    sink.close()
+
+    df = pd.read_csv(path)
+    assert list(df.columns) == ['a', 'b']
+    assert list(df['b']) == ['x', 'y']
+
+
+def test_parquet_sink_writes_one_row_group_per_batch(tmp_path):
+    path = tmp_path / 'out.parquet'
+    sink = open_sink(path, 'parquet')
+    # 第一批全為空值的欄位視為字串，後續批次才有值
+    sink.write(pd.DataFrame([{'job': 'a', 'note': None}]))
+    sink.write(pd.DataFrame([{'note': 'remote', 'job': 'b'}]))
+    sink.close()
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+    table = pq.read_table(path)
+    assert table.column_names == ['job', 'note']
+    assert table.column('note').to_pylist() == [None, 'remote']
+
+
+def test_parquet_keeps_nested_lists(tmp_path):
+    path = tmp_path / 'skills.parquet'
+    skills = [{'code': '1', 'description': 'Python'}, {'code': '2', 'description': 'SQL'}]
+    write_frame(pd.DataFrame([{'jobCode': 'A', 'hardSkillList': skills}]), path, 'parquet')
+
+    [row] = pq.read_table(path).to_pylist()
+    assert row['hardSkillList'] == skills
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(tmp_path / 'out.xlsx', 'xlsx')
+    with pytest.raises(ValueError):
+        set_default_formats(['csv', 'xlsx'])
+
+
+def test_default_formats(monkeypatch):
+    monkeypatch.setattr('modules.writers._default_formats', ['csv'])
+    set_default_formats(['csv', 'parquet'])
+    assert get_default_formats() == ['csv', 'parquet']